@@ -0,0 +1,115 @@
+"""
+Cálculo analítico e vetorizado (NumPy) das esperas no cruzamento.
+
+Com um único recurso (o Semaphore(1) de `simular`), as esperas saem direto
+dos tempos de chegada e de travessia, sem simular evento a evento:
+
+- FCFS: na ordem de chegada, entrada_i = max(chegada_i, saida_{i-1}).
+  Com S_i = soma das travessias anteriores, isso vira
+  entrada_i = S_i + max_{k<=i}(chegada_k - S_k), um máximo acumulado.
+- Prioridade: todos chegam em 0; após uma ordenação estável por prioridade,
+  a espera de cada carro é a soma acumulada das travessias anteriores.
+
+Serve como oráculo rápido para `simular` (ver media_simular) e para avaliar
+milhões de carros de uma vez (ver gerar_carros).
+"""
+import random
+
+import numpy as np
+
+
+def gerar_carros(num_carros, num_semaforos=4, atraso_max=3.0, semente=None):
+    """
+    Sorteia um cenário como arrays, no mesmo espírito de gerar_cenario:
+    probabilidade por semáforo (prioridade 1 = maior probabilidade),
+    semáforo de cada carro, atraso de chegada em [0, atraso_max) e
+    travessia em [1, 2).
+
+    Retorna:
+        dict: arrays 'semaforo_id', 'delay', 'servico' e 'prioridade'.
+    """
+    rng = np.random.default_rng(semente)
+    prob = rng.random(num_semaforos)
+    # Rank 1 para a maior probabilidade, como em gerar_cenario
+    prioridade_sem = np.empty(num_semaforos, dtype=np.int64)
+    prioridade_sem[np.argsort(-prob, kind='stable')] = np.arange(1, num_semaforos + 1)
+    semaforo_id = rng.integers(0, num_semaforos, size=num_carros)
+    return {
+        'semaforo_id': semaforo_id,
+        'delay': rng.uniform(0.0, atraso_max, size=num_carros),
+        'servico': rng.uniform(1.0, 2.0, size=num_carros),
+        'prioridade': prioridade_sem[semaforo_id],
+    }
+
+
+def esperas_fcfs(chegada, servico):
+    """
+    Espera de cada carro no FCFS, na ordem original dos arrays.
+    Empates de chegada são atendidos na ordem dos arrays (ordenação estável).
+    """
+    chegada = np.asarray(chegada, dtype=np.float64)
+    servico = np.asarray(servico, dtype=np.float64)
+    ordem = np.argsort(chegada, kind='stable')
+    c = chegada[ordem]
+    s = servico[ordem]
+    # S_i: soma das travessias de quem passou antes do i-ésimo da fila
+    anteriores = np.cumsum(s) - s
+    entrada = anteriores + np.maximum.accumulate(c - anteriores)
+    esperas = np.empty_like(chegada)
+    esperas[ordem] = entrada - c
+    return esperas
+
+
+def esperas_prioridade(prioridade, servico):
+    """
+    Espera de cada carro na Prioridade (todos chegam em 0), na ordem original
+    dos arrays. Menor valor = atendido antes; empates pela ordem dos arrays.
+    """
+    servico = np.asarray(servico, dtype=np.float64)
+    ordem = np.argsort(np.asarray(prioridade), kind='stable')
+    s = servico[ordem]
+    esperas = np.empty_like(servico)
+    esperas[ordem] = np.cumsum(s) - s
+    return esperas
+
+
+def esperas(algoritmo, carros):
+    """Espera de cada carro de `carros` (dict de arrays) para o algoritmo."""
+    if algoritmo.lower() == 'fcfs':
+        return esperas_fcfs(carros['delay'], carros['servico'])
+    return esperas_prioridade(carros['prioridade'], carros['servico'])
+
+
+def de_cars_data(semaforos, cars_data):
+    """Converte semaforos/cars_data (listas de dicts) em arrays, sem 'servico'."""
+    prioridade = {s['id']: s['priority'] for s in semaforos}
+    return {
+        'semaforo_id': np.fromiter((d['semaforo_id'] for d in cars_data), dtype=np.int64,
+                                   count=len(cars_data)),
+        'delay': np.fromiter((d['delay'] for d in cars_data), dtype=np.float64,
+                             count=len(cars_data)),
+        'prioridade': np.fromiter((prioridade[d['semaforo_id']] for d in cars_data),
+                                  dtype=np.int64, count=len(cars_data)),
+    }
+
+
+def media_simular(algoritmo, semaforos, cars_data, semente):
+    """
+    Oráculo de `simular(..., motor='eventos')` após random.seed(semente):
+    reproduz os sorteios de random.uniform(1, 2), feitos na ordem em que os
+    carros entram no cruzamento, e calcula a média analiticamente.
+    """
+    carros = de_cars_data(semaforos, cars_data)
+    n = len(cars_data)
+    if n == 0:
+        return 0
+    rnd = random.Random(semente)
+    sorteios = np.array([rnd.uniform(1, 2) for _ in range(n)])
+    # O k-ésimo carro a entrar recebe o k-ésimo sorteio
+    if algoritmo.lower() == 'fcfs':
+        ordem = np.argsort(carros['delay'], kind='stable')
+    else:
+        ordem = np.argsort(carros['prioridade'], kind='stable')
+    carros['servico'] = np.empty(n)
+    carros['servico'][ordem] = sorteios
+    return float(esperas(algoritmo, carros).mean())
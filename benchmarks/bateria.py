@@ -0,0 +1,275 @@
+"""
+Bateria de benchmarks com cenários fixos, saída em JSON e comparação.
+
+Cenários, em três escalas (pequena, media, grande), todos com semente fixa:
+
+- escalonamento/ALGORITMO/MOTOR: `simular` com FCFS e Prioridade nos
+  motores 'eventos' (relógio simulado), 'threads' (uma thread por carro, o
+  padrão) e 'pool' (threads fixas), os dois últimos em tempo real com os
+  tempos encolhidos por ESCALA_TEMPO. O cenário vem de
+  escalonamento.gerar_cenario com a semente fixa. Qualidade, só no motor
+  'eventos', que é determinístico: espera média e p99 e vazão (carros por
+  segundo simulado, até a saída do último). Nos motores de tempo real as
+  esperas encolhidas medem mais o atraso do sistema operacional que o
+  escalonador.
+- controle/VARIANTE: sem_controle, com_controle e com_asyncio por alguns
+  segundos de relógio real numa rua linear. JANELA_COLISAO negativa mantém
+  a checagem de colisão sem encerrar no primeiro acidente. Qualidade:
+  vazão em carros/min.
+
+Para todos: tempo de parede e de CPU, pico de RSS, pico de threads vivas e
+eventos por segundo de parede (carros escalonados ou liberados). Cada
+cenário roda REPETICOES vezes, cada vez num subprocesso próprio (o pico de
+memória de um não contamina o outro), e cada métrica guarda o melhor valor,
+como o timeit: interferências só pioram as medidas, então o melhor de N é
+o mais estável entre execuções. Cenários de escalonamento curtos repetem a
+simulação dentro do subprocesso até somar TEMPO_MINIMO.
+
+Medidas de tempo (e a vazão dos controles, que depende do relógio real)
+variam mais que as demais entre execuções na mesma máquina; por isso a
+comparação usa para elas uma tolerância própria, mais larga.
+
+Uso:
+    python benchmarks/bateria.py executar [--escalas pequena media] [--repeticoes N] [--saida R.json]
+    python benchmarks/bateria.py comparar BASE.json NOVO.json [--tolerancia 0.1] [--tolerancia-tempo 0.3]
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import platform
+import resource
+import argparse
+import threading
+import subprocess
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+SEMENTE = 42
+REPETICOES = 3
+ESCALA_TEMPO = 1e-4      # motores 'threads' e 'pool': 1.5 s de travessia viram 150 µs
+TEMPO_MINIMO = 0.2       # segundos de parede por medida de escalonamento
+ESCALAS = {
+    # Escalonamento: até max_carros por semáforo (em média semaforos * max_carros / 2
+    # carros); controle: semáforos da rua e segundos de relógio real
+    'pequena': {'max_carros': 100, 'semaforos': 4, 'rua': 4, 'duracao': 2.0},
+    'media': {'max_carros': 500, 'semaforos': 8, 'rua': 16, 'duracao': 3.0},
+    'grande': {'max_carros': 2500, 'semaforos': 16, 'rua': 64, 'duracao': 3.0},
+}
+CONTROLES = ('sem_controle', 'com_controle', 'com_asyncio')
+# Sentido de melhora de cada métrica comparada: -1 menor é melhor, +1 maior é melhor
+METRICAS = {
+    'parede_s': -1, 'cpu_s': -1, 'rss_pico_kib': -1, 'pico_threads': -1,
+    'eventos_s': +1, 'espera_media_s': -1, 'espera_p99_s': -1, 'vazao': +1,
+}
+METRICAS_TEMPO = ('parede_s', 'cpu_s', 'eventos_s')
+
+
+def cenarios(escalas):
+    """Nomes dos cenários das escalas pedidas."""
+    nomes = []
+    for escala in escalas:
+        for algoritmo in ('fcfs', 'prioridade'):
+            for motor in ('eventos', 'threads', 'pool'):
+                nomes.append(f"escalonamento/{algoritmo}/{motor}/{escala}")
+        for variante in CONTROLES:
+            nomes.append(f"controle/{variante}/{escala}")
+    return nomes
+
+
+class _Monitor:
+    """Amostra o número de threads vivas a cada milissegundo."""
+
+    def __init__(self):
+        self.pico = threading.active_count()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, daemon=True)
+
+    def _amostrar(self):
+        while not self._parar.wait(0.001):
+            # Desconta a própria thread do monitor
+            self.pico = max(self.pico, threading.active_count() - 1)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *excecao):
+        self._parar.set()
+        self._thread.join()
+
+
+def _escalonamento(algoritmo, motor, escala):
+    import escalonamento
+    from estatisticas import Estatisticas
+
+    p = ESCALAS[escala]
+    semaforos, cars_data = escalonamento.gerar_cenario(p['semaforos'], p['max_carros'],
+                                                       random.Random(SEMENTE))
+
+    def rodar():
+        esperas = Estatisticas(agrupar=False)
+        log = []
+        random.seed(SEMENTE)
+        escalonamento.simular(algoritmo, semaforos, cars_data, motor=motor, verboso=False,
+                              log=log, escala_tempo=ESCALA_TEMPO, estatisticas=esperas)
+        return esperas, log
+
+    # Threads numa passada à parte: o monitor acordando a cada milissegundo
+    # disputa o GIL e distorce execuções de poucos milissegundos
+    with _Monitor() as monitor:
+        rodar()
+    # Como o autorange do timeit: repete até somar TEMPO_MINIMO e fica
+    # com a mais rápida; as métricas de qualidade vêm da última
+    paredes, cpus, total = [], [], 0.0
+    while total < TEMPO_MINIMO:
+        inicio, cpu = time.perf_counter(), time.process_time()
+        esperas, log = rodar()
+        paredes.append(time.perf_counter() - inicio)
+        cpus.append(time.process_time() - cpu)
+        total += paredes[-1]
+    parede = min(paredes)
+    r = {'parede_s': parede, 'cpu_s': min(cpus), 'pico_threads': monitor.pico,
+         'eventos_s': len(log) / parede}
+    if motor == 'eventos':
+        ultima_saida = max(c.tempo_saida for c, _ in log)
+        r.update(espera_media_s=esperas.media, espera_p99_s=esperas.quantil(0.99),
+                 vazao=len(log) / ultima_saida if ultima_saida else 0.0)
+    return r
+
+
+def _controle(variante, escala):
+    import importlib
+
+    p = ESCALAS[escala]
+    modulo = importlib.import_module(variante)
+    config = {'NUM_SEMAFOROS': p['rua'], 'TEMPO_SIMULACAO': p['duracao'], 'SEMENTE': SEMENTE,
+              'SAIDA_CONSOLE': False, 'RELATORIO': False, 'JANELA_COLISAO': -1.0}
+    with _Monitor() as monitor:
+        inicio, cpu = time.perf_counter(), time.process_time()
+        r = modulo.run(config)
+        parede, cpu = time.perf_counter() - inicio, time.process_time() - cpu
+    liberados = sum(r['liberados'].values())
+    return {
+        'parede_s': parede, 'cpu_s': cpu, 'pico_threads': monitor.pico,
+        'eventos_s': liberados / parede,
+        'vazao': liberados * 60 / r['duracao'],
+    }
+
+
+def medir(nome):
+    """Executa um cenário (no subprocesso) e devolve suas métricas."""
+    partes = nome.split('/')
+    if partes[0] == 'escalonamento':
+        r = _escalonamento(*partes[1:])
+    else:
+        r = _controle(*partes[1:])
+    r['rss_pico_kib'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return r
+
+
+def executar(escalas, saida=None, repeticoes=REPETICOES):
+    resultado = {
+        'semente': SEMENTE,
+        'repeticoes': repeticoes,
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'cenarios': {},
+    }
+    for nome in cenarios(escalas):
+        execucoes = []
+        for _ in range(repeticoes):
+            processo = subprocess.run([sys.executable, __file__, '--medir', nome],
+                                      capture_output=True, text=True, check=True)
+            execucoes.append(json.loads(processo.stdout.strip().splitlines()[-1]))
+        # Melhor de N, no sentido de cada métrica
+        r = {m: (max if METRICAS.get(m, -1) > 0 else min)(e[m] for e in execucoes)
+             for m in execucoes[0]}
+        resultado['cenarios'][nome] = r
+        if 'espera_media_s' in r:
+            qualidade = (f"espera {r['espera_media_s']:.3f}s p99 {r['espera_p99_s']:.3f}s "
+                         f"vazão {r['vazao']:.2f}/s")
+        else:
+            qualidade = f"vazão {r['vazao']:.1f}/min" if 'vazao' in r else ''
+        print(f"{nome:40} {r['parede_s']:7.3f}s cpu {r['cpu_s']:6.3f}s "
+              f"{r['rss_pico_kib'] / 1024:6.1f} MiB {r['pico_threads']:5d} thr "
+              f"{r['eventos_s']:9.1f} ev/s  {qualidade}", file=sys.stderr)
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if saida:
+        with open(saida, 'w', encoding='utf-8') as f:
+            f.write(texto + '\n')
+    else:
+        print(texto)
+    return resultado
+
+
+def comparar(base, novo, tolerancia, tolerancia_tempo=None):
+    """
+    Compara as métricas dos cenários presentes nos dois arquivos. Uma piora
+    relativa acima de `tolerancia` no sentido de METRICAS é regressão; para
+    METRICAS_TEMPO e a vazão dos controles vale `tolerancia_tempo` (padrão:
+    a mesma).
+
+    Retorna:
+        list: (cenário, métrica, valor base, valor novo, variação relativa)
+    """
+    if tolerancia_tempo is None:
+        tolerancia_tempo = tolerancia
+    regressoes = []
+    for nome in sorted(base['cenarios'].keys() & novo['cenarios'].keys()):
+        b, n = base['cenarios'][nome], novo['cenarios'][nome]
+        for metrica, sentido in METRICAS.items():
+            if metrica not in b or metrica not in n:
+                continue
+            if b[metrica] == 0:
+                variacao = 0.0 if n[metrica] == 0 else math.copysign(math.inf, n[metrica])
+            else:
+                variacao = (n[metrica] - b[metrica]) / abs(b[metrica])
+            temporal = metrica in METRICAS_TEMPO or (nome.startswith('controle/')
+                                                     and metrica == 'vazao')
+            marca = ''
+            if -sentido * variacao > (tolerancia_tempo if temporal else tolerancia):
+                marca = '  <- REGRESSÃO'
+                regressoes.append((nome, metrica, b[metrica], n[metrica], variacao))
+            print(f"{nome:40} {metrica:15} {b[metrica]:12.4g} -> {n[metrica]:12.4g} "
+                  f"({variacao * 100:+6.1f}%){marca}")
+    return regressoes
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3 and sys.argv[1] == '--medir':
+        print(json.dumps(medir(sys.argv[2])))
+        sys.exit()
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    comandos = parser.add_subparsers(dest='comando', required=True)
+    p = comandos.add_parser('executar', help='roda os cenários e emite JSON')
+    p.add_argument('--escalas', nargs='+', choices=list(ESCALAS), default=list(ESCALAS))
+    p.add_argument('--repeticoes', type=int, default=REPETICOES,
+                   help='execuções por cenário; cada métrica guarda o melhor valor')
+    p.add_argument('--saida', help='arquivo JSON (padrão: saída padrão)')
+    p = comandos.add_parser('comparar', help='aponta regressões entre dois resultados')
+    p.add_argument('base')
+    p.add_argument('novo')
+    p.add_argument('--tolerancia', type=float, default=0.10,
+                   help='piora relativa aceita antes de acusar regressão (padrão 0.10)')
+    p.add_argument('--tolerancia-tempo', type=float, default=0.30,
+                   help='o mesmo para tempos, eventos/s e vazão dos controles (padrão 0.30)')
+    args = parser.parse_args()
+
+    if args.comando == 'executar':
+        executar(args.escalas, args.saida, args.repeticoes)
+    else:
+        with open(args.base, encoding='utf-8') as f:
+            base = json.load(f)
+        with open(args.novo, encoding='utf-8') as f:
+            novo = json.load(f)
+        regressoes = comparar(base, novo, args.tolerancia, args.tolerancia_tempo)
+        print(f"\n{len(regressoes)} regressão(ões) acima de {args.tolerancia * 100:.0f}% "
+              f"({args.tolerancia_tempo * 100:.0f}% nas medidas de tempo)")
+        sys.exit(1 if regressoes else 0)
@@ -0,0 +1,77 @@
+"""
+Quantos semáforos e carros cada controle sustenta em tempo real.
+
+Roda com_controle (uma thread por semáforo) e com_asyncio (uma corrotina
+por semáforo) em grades cada vez maiores, no relógio real, com um carro
+liberado a cada tick de VERDE. Um modelo sustenta a grade se fizer pelo
+menos LIMIAR das liberações que caberiam no tempo: com a rede saturada os
+ticks atrasam e o VERDE, que dura o mesmo tempo de parede, libera menos.
+
+JANELA_COLISAO negativa mantém a checagem de colisão (mesmo custo), mas
+ela nunca encontra um acidente, para que a carga não pare no primeiro.
+Os carros em travessia são estimados pela lei de Little: vazão de cada
+semáforo vezes o tempo de travessia.
+
+Uso:
+    python benchmarks/capacidade_tempo_real.py [LADO1 LADO2 ...]
+"""
+import os
+import sys
+import math
+import random
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import com_controle  # noqa: E402
+import com_asyncio  # noqa: E402
+from topologia import Topologia  # noqa: E402
+
+LADOS = [4, 8, 16, 24, 32, 40, 48, 56, 64]   # grades LADO×LADO
+LIMIAR = 0.9
+TEMPO_VERDE = 1.0
+INTERVALO_TICK = 0.1
+CICLOS = 2                      # ciclos completos de fases por execução
+MODELOS = {'threads': com_controle, 'asyncio': com_asyncio}
+
+
+def medir(modulo, lado):
+    """Fração das liberações ideais atingida e carros em travessia estimados."""
+    config = {
+        'GRADE': (lado, lado), 'SEMENTE': 1, 'SAIDA_CONSOLE': False, 'RELATORIO': False,
+        'TEMPO_VERDE': TEMPO_VERDE, 'INTERVALO_TICK': INTERVALO_TICK,
+        'PROBABILIDADE_LIB': 1.0, 'JANELA_COLISAO': -1.0,
+    }
+    # Mesma semente da simulação: a grade (tempos das arestas) é a mesma
+    topologia = Topologia.grade(lado, lado, gerador=random.Random(1))
+    num_fases = len(topologia.fases)
+    config['TEMPO_SIMULACAO'] = CICLOS * num_fases * TEMPO_VERDE
+    r = modulo.run(config)
+    # Cada VERDE libera em todos os ticks menos o último, que o encerra
+    por_verde = math.ceil(TEMPO_VERDE / INTERVALO_TICK - 1e-9) - 1
+    ideal = len(topologia.nos) * CICLOS * por_verde
+    liberados = sum(r['liberados'].values())
+    em_travessia = sum(n / r['duracao'] * topologia.travessia[u] for u, n in r['liberados'].items())
+    return liberados / ideal, liberados / r['duracao'], em_travessia
+
+
+def main(lados):
+    for nome, modulo in MODELOS.items():
+        print(f"{nome}:")
+        sustentado = None
+        for lado in lados:
+            fracao, vazao, em_travessia = medir(modulo, lado)
+            ok = fracao >= LIMIAR
+            print(f"  {lado * lado:5d} semáforos: {fracao * 100:5.1f}% das liberações, "
+                  f"{vazao:8.0f} carros/s, ~{em_travessia:7.0f} em travessia {'ok' if ok else 'ATRASADO'}")
+            if not ok:
+                break
+            sustentado = (lado * lado, em_travessia)
+        if sustentado:
+            print(f"  máximo sustentado: {sustentado[0]} semáforos, ~{sustentado[1]:.0f} carros em travessia")
+        else:
+            print("  nenhuma grade sustentada")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or LADOS)
@@ -0,0 +1,59 @@
+"""
+Matriz de conflitos x Semaphore(1) único no cruzamento.
+
+Para cada semente, gera um cenário (gerar_cenario) e roda FCFS e Prioridade
+no motor de eventos duas vezes: com o cruzamento inteiro como recurso único
+(linha de base) e com a matriz de conflitos padrão (matriz_conflitos).
+Reporta a espera média e a vazão (carros por segundo simulado, do início
+até a saída do último carro).
+
+Uso:
+    python benchmarks/cruzamento_conflitos.py [REPLICACOES] [MAX_CARROS]
+"""
+import os
+import sys
+import random
+import statistics
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from escalonamento import gerar_cenario, matriz_conflitos, simular  # noqa: E402
+
+REPLICACOES = 500
+MAX_CARROS = 10
+
+
+def executar(algoritmo, semaforos, cars_data, semente, conflitos):
+    """Devolve (espera média, vazão) de uma simulação no motor de eventos."""
+    log = []
+    random.seed(semente)
+    media = simular(algoritmo, semaforos, cars_data, motor='eventos', verboso=False,
+                    log=log, conflitos=conflitos)
+    fim = max(c.tempo_saida for c, _ in log)
+    return media, len(log) / fim
+
+
+def main(replicacoes, max_carros):
+    resultados = {}
+    for semente in range(replicacoes):
+        semaforos, cars_data = gerar_cenario(max_carros=max_carros,
+                                             gerador=random.Random(semente))
+        if not cars_data:
+            continue
+        for algoritmo in ('fcfs', 'prioridade'):
+            for nome, conflitos in (('único', None), ('matriz', matriz_conflitos(semaforos))):
+                r = executar(algoritmo, semaforos, cars_data, semente, conflitos)
+                resultados.setdefault((algoritmo, nome), []).append(r)
+
+    print(f"{replicacoes} replicações, até {max_carros} carros por semáforo")
+    print(f"{'algoritmo':11} {'cruzamento':10} {'espera(s)':>10} {'vazão(carros/s)':>16}")
+    for (algoritmo, nome), valores in resultados.items():
+        espera = statistics.fmean(v[0] for v in valores)
+        vazao = statistics.fmean(v[1] for v in valores)
+        print(f"{algoritmo:11} {nome:10} {espera:10.3f} {vazao:16.3f}")
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:]]
+    main(*(args + [REPLICACOES, MAX_CARROS][len(args):]))
@@ -0,0 +1,50 @@
+"""
+Custo da instrumentação de travas.
+
+Mede o par acquire/release (via `with`) de uma threading.Lock comum, da
+trava devolvida por Instrumentacao(ativa=False) e da TravaInstrumentada,
+além do registro de um tempo em Histograma e do registrar() desligado.
+
+Uso:
+    python benchmarks/custo_instrumentacao.py [REPETICOES]
+"""
+import os
+import sys
+import time
+import threading
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from instrumentacao import Instrumentacao  # noqa: E402
+
+REPETICOES = 200_000
+
+
+def por_operacao(corpo, repeticoes):
+    """Tempo médio (ns) de uma chamada de corpo()."""
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        corpo()
+    return (time.perf_counter() - inicio) / repeticoes * 1e9
+
+
+def main(repeticoes):
+    desligada = Instrumentacao(ativa=False)
+    ligada = Instrumentacao(ativa=True)
+    travas = {
+        'threading.Lock': threading.Lock(),
+        'desligada': desligada.trava('t'),
+        'instrumentada': ligada.trava('t'),
+    }
+    for nome, trava in travas.items():
+        def com_trava(trava=trava):
+            with trava:
+                pass
+        print(f"  with {nome:15} {por_operacao(com_trava, repeticoes):8.0f} ns")
+    print(f"  registrar (desligada) {por_operacao(lambda: desligada.registrar('x', 0.5), repeticoes):8.0f} ns")
+    print(f"  registrar (ligada)    {por_operacao(lambda: ligada.registrar('x', 0.5), repeticoes):8.0f} ns")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else REPETICOES)
@@ -0,0 +1,49 @@
+"""
+Segundos simulados por segundo real conforme a grade cresce.
+
+Roda simulacao_grade.simular_grade em grades quadradas de tamanho crescente,
+com 1 processo e com blocos em vários processos, e confere que o resultado
+(carros liberados e acidentes) é o mesmo em todas as divisões. O tempo
+medido inclui a criação dos processos.
+
+Uso:
+    python benchmarks/escala_grade.py [LADO1 LADO2 ...]
+"""
+import os
+import sys
+import time
+import random
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from topologia import Topologia  # noqa: E402
+from simulacao_grade import simular_grade  # noqa: E402
+
+LADOS = [10, 32, 100]
+PROCESSOS = [1, 2, 4]
+DURACAO = 120.0   # segundos simulados por execução
+SEMENTE = 1
+
+
+def main(lados):
+    print(f"{os.cpu_count()} CPUs, {DURACAO:.0f}s simulados por execução")
+    print(f"{'cruzamentos':>11} {'processos':>9} {'real(s)':>8} {'sim/real':>9} {'liberados':>10} {'acidentes':>9}")
+    for lado in lados:
+        topologia = Topologia.grade(lado, lado, gerador=random.Random(SEMENTE))
+        referencia = None
+        for processos in PROCESSOS:
+            inicio = time.perf_counter()
+            r = simular_grade(topologia, DURACAO, SEMENTE, processos)
+            decorrido = time.perf_counter() - inicio
+            chave = (r['liberados'], r['acidentes'])
+            if referencia is None:
+                referencia = chave
+            elif chave != referencia:
+                raise SystemExit(f"resultado diverge com {processos} processos em {lado}x{lado}")
+            print(f"{len(topologia.nos):11d} {r['processos']:9d} {decorrido:8.2f} "
+                  f"{DURACAO / decorrido:9.1f} {sum(r['liberados'].values()):10d} {r['acidentes']:9d}")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or LADOS)
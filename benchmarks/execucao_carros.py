@@ -0,0 +1,111 @@
+"""
+Benchmark dos motores de execução de `escalonamento.simular`.
+
+Compara o modelo original (uma thread por Carro) com o pool fixo de
+threads: tempo de parede, custo de criação de threads, pico de threads
+vivas e memória (RSS e memória virtual de pico). Cada medição roda num
+subprocesso próprio para que o pico de memória de uma não contamine a outra.
+
+Uso:
+    python benchmarks/execucao_carros.py [N1 N2 ...]
+"""
+import os
+import sys
+import json
+import time
+import random
+import resource
+import threading
+import subprocess
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from escalonamento import gerar_cenario  # noqa: E402
+
+TAMANHOS = [500, 2000, 5000]   # número médio de carros por execução
+NUM_SEMAFOROS = 4
+ESCALA_TEMPO = 1e-4            # 1.5 s de travessia viram 150 µs
+SEMENTE = 42
+
+
+def memoria_virtual_pico():
+    """VmPeak do processo em KiB (Linux); None onde /proc não existe."""
+    try:
+        with open('/proc/self/status') as f:
+            for linha in f:
+                if linha.startswith('VmPeak:'):
+                    return int(linha.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def custo_criacao(num_threads):
+    """Tempo médio (µs) para criar, iniciar e juntar uma thread vazia."""
+    inicio = time.perf_counter()
+    threads = [threading.Thread(target=lambda: None) for _ in range(num_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return (time.perf_counter() - inicio) / num_threads * 1e6
+
+
+def medir(motor, algoritmo, num_carros):
+    """Executa uma simulação e devolve as métricas (roda no subprocesso)."""
+    import escalonamento
+
+    # Até 2 * num_carros / NUM_SEMAFOROS por semáforo: num_carros em média
+    semaforos, cars_data = gerar_cenario(NUM_SEMAFOROS, 2 * num_carros // NUM_SEMAFOROS,
+                                         random.Random(SEMENTE))
+    pico_threads = [threading.active_count()]
+    parar = threading.Event()
+
+    def monitor():
+        while not parar.wait(0.001):
+            pico_threads[0] = max(pico_threads[0], threading.active_count() - 1)
+
+    m = threading.Thread(target=monitor, daemon=True)
+    m.start()
+    random.seed(SEMENTE)
+    inicio = time.perf_counter()
+    media = escalonamento.simular(algoritmo, semaforos, cars_data, motor=motor,
+                                  verboso=False, escala_tempo=ESCALA_TEMPO)
+    parede = time.perf_counter() - inicio
+    parar.set()
+    m.join()
+    return {
+        'motor': motor,
+        'algoritmo': algoritmo,
+        'carros': len(cars_data),
+        'parede_s': round(parede, 3),
+        'pico_threads': pico_threads[0],
+        'rss_pico_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'vm_pico_kib': memoria_virtual_pico(),
+        'espera_media_s': round(media, 3),
+    }
+
+
+def main(tamanhos):
+    print(f"Criação de thread vazia: {custo_criacao(2000):.1f} µs/thread")
+    print(f"{'motor':8} {'alg':11} {'carros':>7} {'parede(s)':>10} {'threads':>8} "
+          f"{'RSS(MiB)':>9} {'VM(MiB)':>9}")
+    for n in tamanhos:
+        for algoritmo in ('fcfs', 'prioridade'):
+            for motor in ('threads', 'pool'):
+                saida = subprocess.run(
+                    [sys.executable, __file__, '--medir', motor, algoritmo, str(n)],
+                    capture_output=True, text=True, check=True
+                )
+                r = json.loads(saida.stdout.strip().splitlines()[-1])
+                vm = f"{r['vm_pico_kib'] / 1024:9.1f}" if r['vm_pico_kib'] else f"{'-':>9}"
+                print(f"{motor:8} {algoritmo:11} {r['carros']:7d} {r['parede_s']:10.3f} "
+                      f"{r['pico_threads']:8d} {r['rss_pico_kib'] / 1024:9.1f} {vm}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 5 and sys.argv[1] == '--medir':
+        print(json.dumps(medir(sys.argv[2], sys.argv[3], int(sys.argv[4]))))
+    else:
+        main([int(a) for a in sys.argv[1:]] or TAMANHOS)
@@ -0,0 +1,60 @@
+"""
+Partida a frio e execuções em lote.
+
+1. Tempo de um interpretador novo importando cada módulo (mediana de
+   REPETICOES processos), incluindo matplotlib.pyplot, que escalonamento
+   importava no topo antes de a plotagem passar a importá-lo só quando
+   chamada.
+2. N cenários de com_controle (relógio virtual, sem console): um processo
+   por cenário, como era preciso quando a simulação rodava na importação,
+   contra run(config) repetido no mesmo interpretador.
+
+Uso:
+    python benchmarks/partida_fria.py [CENARIOS]
+"""
+import os
+import sys
+import time
+import statistics
+import subprocess
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import com_controle  # noqa: E402
+
+REPETICOES = 5
+CENARIOS = 20
+MODULOS = ['escalonamento', 'com_controle', 'sem_controle', 'replicacoes', 'matplotlib.pyplot']
+CONFIG = {'TEMPO_VIRTUAL': True, 'SAIDA_CONSOLE': False, 'RELATORIO': False}
+
+
+def processo(codigo):
+    """Segundos de parede de `python -c codigo`, com RAIZ no caminho."""
+    inicio = time.perf_counter()
+    subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, check=True)
+    return time.perf_counter() - inicio
+
+
+def main(cenarios):
+    base = statistics.median(processo('pass') for _ in range(REPETICOES))
+    print(f"Interpretador vazio: {base * 1e3:.0f} ms")
+    for modulo in MODULOS:
+        t = statistics.median(processo(f'import {modulo}') for _ in range(REPETICOES))
+        print(f"  import {modulo:18} {t * 1e3:6.0f} ms ({(t - base) * 1e3:+.0f} ms)")
+
+    inicio = time.perf_counter()
+    for semente in range(cenarios):
+        processo(f"import com_controle; com_controle.run({dict(CONFIG, SEMENTE=semente)!r})")
+    frio = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    for semente in range(cenarios):
+        com_controle.run(dict(CONFIG, SEMENTE=semente))
+    quente = time.perf_counter() - inicio
+    print(f"\n{cenarios} cenários de com_controle:")
+    print(f"  um processo por cenário: {frio:.2f}s ({frio / cenarios * 1e3:.0f} ms/cenário)")
+    print(f"  run() no mesmo processo: {quente:.2f}s ({quente / cenarios * 1e3:.1f} ms/cenário)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else CENARIOS)
@@ -0,0 +1,73 @@
+"""
+Precisão e custo dos temporizadores de fim de travessia.
+
+Compara o modelo anterior de com_controle (um threading.Timer por carro)
+com o Agendador de relogio.py (uma thread + heap). Para cada quantidade de
+carros em travessia simultânea, mede o atraso de disparo (instante real do
+callback - instante pedido) e o pico de threads vivas.
+
+Uso:
+    python benchmarks/precisao_timers.py [N1 N2 ...]
+"""
+import os
+import sys
+import time
+import random
+import threading
+import statistics
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from relogio import Agendador  # noqa: E402
+
+QUANTIDADES = [100, 1000, 5000]
+ATRASO_MIN, ATRASO_MAX = 0.2, 1.0   # faixa dos tempos de travessia (s)
+
+
+def medir(agendar, quantidade, semente=1):
+    """Agenda `quantidade` callbacks e devolve (atrasos em ms, pico de threads)."""
+    rnd = random.Random(semente)
+    atrasos = []
+    trava = threading.Lock()
+    concluidos = threading.Event()
+
+    def disparo(previsto):
+        real = time.monotonic()
+        with trava:
+            atrasos.append((real - previsto) * 1e3)
+            if len(atrasos) == quantidade:
+                concluidos.set()
+
+    base = threading.active_count()
+    pico = 0
+    for _ in range(quantidade):
+        atraso = rnd.uniform(ATRASO_MIN, ATRASO_MAX)
+        agendar(atraso, disparo, (time.monotonic() + atraso,))
+        pico = max(pico, threading.active_count() - base)
+    while not concluidos.wait(0.01):
+        pico = max(pico, threading.active_count() - base)
+    return atrasos, pico
+
+
+def agendar_timer(atraso, funcao, args):
+    timer = threading.Timer(atraso, funcao, args=args)
+    timer.daemon = True
+    timer.start()
+
+
+def main(quantidades):
+    print(f"{'modelo':10} {'carros':>7} {'threads':>8} {'média(ms)':>10} "
+          f"{'p50(ms)':>8} {'p99(ms)':>8} {'máx(ms)':>8}")
+    for n in quantidades:
+        agendador = Agendador()
+        for nome, agendar in (('Timer', agendar_timer), ('Agendador', agendador.agendar)):
+            atrasos, pico = medir(agendar, n)
+            q = statistics.quantiles(atrasos, n=100)
+            print(f"{nome:10} {n:7d} {pico:8d} {statistics.fmean(atrasos):10.3f} "
+                  f"{q[49]:8.3f} {q[98]:8.3f} {max(atrasos):8.3f}")
+        agendador.parar()
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or QUANTIDADES)
@@ -0,0 +1,84 @@
+"""
+Tempo de posse de trava: print na seção crítica x fluxo de eventos.
+
+Reproduz os dois caminhos quentes que imprimiam segurando uma trava:
+- liberação em com_controle: monta a listagem da rua e imprime sob
+  trava_impressao (antes) x retrato da rua + emitir() (agora);
+- Carro.run em escalonamento: imprime a espera dentro do Semaphore(1)
+  (antes) x emitir() (agora).
+
+A saída de texto vai para os.devnull, então os números do print são um
+limite inferior: num terminal de verdade a posse da trava é maior.
+
+Uso:
+    python benchmarks/tempo_trava.py [REPETICOES]
+"""
+import os
+import sys
+import time
+import threading
+import statistics
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from registro_eventos import RegistroEventos, SaidaConsole  # noqa: E402
+
+REPETICOES = 2000
+TAMANHOS_RUA = [5, 50, 500]
+
+
+def medir(corpo, repeticoes):
+    """Executa corpo() sob uma trava e devolve as durações de posse (µs)."""
+    trava = threading.Lock()
+    duracoes = []
+    for _ in range(repeticoes):
+        with trava:
+            inicio = time.perf_counter()
+            corpo()
+            duracoes.append((time.perf_counter() - inicio) * 1e6)
+    return duracoes
+
+
+def resumo(duracoes):
+    q = statistics.quantiles(duracoes, n=100)
+    return f"média {statistics.fmean(duracoes):8.2f} µs  p99 {q[98]:8.2f} µs"
+
+
+def main(repeticoes):
+    nulo = open(os.devnull, 'w')
+    eventos = RegistroEventos([SaidaConsole(nulo)])
+    agora = 100.0
+
+    print("Liberação em com_controle (listagem da rua):")
+    for tamanho in TAMANHOS_RUA:
+        rua = [(f"carro{i}_s{i % 4 + 1}", agora - i * 0.01, i % 4 + 1) for i in range(tamanho)]
+
+        def com_print():
+            estados = [f"({c}, {(agora - tl):.2f}s)" for c, tl, _ in rua]
+            print("  • S2 liberou carro1_s2 em 0.90s do verde. Rua:", " ".join(estados),
+                  file=nulo, flush=True)
+
+        def com_eventos():
+            retrato = [(c, tl) for c, tl, _ in rua]
+            eventos.emitir('liberacao', agora, 2, 1, 0.9, retrato)
+
+        print(f"  rua={tamanho:4d}  print:   {resumo(medir(com_print, repeticoes))}")
+        print(f"  rua={tamanho:4d}  eventos: {resumo(medir(com_eventos, repeticoes))}")
+
+    print("Espera em Carro.run (Semaphore(1)):")
+
+    def espera_print():
+        print(f"Carro 3 do semáforo 1 - posição 7: esperou {1.234:.3f}s", file=nulo, flush=True)
+
+    def espera_eventos():
+        eventos.emitir('espera', agora, 1, 3, 1.234, (7, 0.5, 2, True))
+
+    print(f"  print:   {resumo(medir(espera_print, repeticoes))}")
+    print(f"  eventos: {resumo(medir(espera_eventos, repeticoes))}")
+    eventos.fechar()
+    nulo.close()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else REPETICOES)
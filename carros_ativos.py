@@ -0,0 +1,101 @@
+import heapq
+from bisect import bisect_left, bisect_right
+
+# Folga (s) aplicada nos limites da bissecção; os candidatos da borda são
+# confirmados com a mesma comparação de delta usada antes, então o resultado
+# é idêntico ao da varredura completa.
+FOLGA_JANELA = 1e-9
+
+
+class CarrosAtivos:
+    """
+    Carros em travessia, indexados por semáforo e ordenados pelo instante de
+    liberação. Substitui a lista `carros_atuais` de tuplas
+    (id_carro, fim_travessia, inicio_lib, id_semaforo).
+
+    - adicionar: O(1) (cada semáforo libera em ordem crescente de tempo)
+    - remover: O(1) amortizado; a remoção é preguiçosa e a cabeça da fila
+      avança sobre os removidos, compactando a lista de tempos em lote
+    - na_janela: O(log n) por bissecção nos tempos de liberação
+
+    Não possui trava própria: quem chama decide a sincronização (com_controle
+    usa trava_carros, sem_controle mantém o acesso sem proteção de propósito).
+    """
+
+    def __init__(self):
+        self._tempos = {}      # id_semaforo -> [inicio_lib, ...] (crescente)
+        self._carros = {}      # id_semaforo -> [tupla do carro ou None se removido]
+        self._cabeca = {}      # id_semaforo -> índice do primeiro possivelmente ativo
+        self._posicao = {}     # id_carro -> (id_semaforo, índice na lista)
+        self._total = 0
+
+    def adicionar(self, id_carro, fim_travessia, inicio_lib, id_semaforo):
+        if id_semaforo not in self._tempos:
+            self._tempos[id_semaforo] = []
+            self._carros[id_semaforo] = []
+            self._cabeca[id_semaforo] = 0
+        carros = self._carros[id_semaforo]
+        self._posicao[id_carro] = (id_semaforo, len(carros))
+        self._tempos[id_semaforo].append(inicio_lib)
+        carros.append((id_carro, fim_travessia, inicio_lib, id_semaforo))
+        self._total += 1
+
+    def remover(self, id_carro):
+        """Remove o carro, se ainda estiver na rua."""
+        pos = self._posicao.pop(id_carro, None)
+        if pos is None:
+            return
+        sid, idx = pos
+        carros = self._carros[sid]
+        carros[idx] = None
+        self._total -= 1
+
+        # Avança a cabeça sobre os já removidos (no caso comum o carro que
+        # sai é justamente o mais antigo do semáforo)
+        cabeca = self._cabeca[sid]
+        while cabeca < len(carros) and carros[cabeca] is None:
+            cabeca += 1
+        self._cabeca[sid] = cabeca
+
+        # Compacta quando metade da lista já ficou para trás
+        if cabeca > 32 and cabeca * 2 > len(carros):
+            del carros[:cabeca]
+            del self._tempos[sid][:cabeca]
+            self._cabeca[sid] = 0
+            for i, carro in enumerate(carros):
+                if carro is not None:
+                    self._posicao[carro[0]] = (sid, i)
+
+    def na_janela(self, id_semaforo, agora, atraso_min, atraso_max):
+        """
+        IDs dos carros do semáforo liberados entre `atraso_min` e `atraso_max`
+        segundos antes de `agora` (limites inclusivos).
+        """
+        tempos = self._tempos.get(id_semaforo)
+        if not tempos:
+            return []
+        carros = self._carros[id_semaforo]
+        ini = bisect_left(tempos, agora - atraso_max - FOLGA_JANELA, self._cabeca[id_semaforo])
+        fim = bisect_right(tempos, agora - atraso_min + FOLGA_JANELA, ini)
+        envolvidos = []
+        for carro in carros[ini:fim]:
+            if carro is not None and atraso_min <= agora - carro[2] <= atraso_max:
+                envolvidos.append(carro[0])
+        return envolvidos
+
+    def __iter__(self):
+        """
+        Percorre os carros ativos em ordem de liberação, como a lista antiga.
+        Sem trava (sem_controle), outra thread pode adicionar um semáforo
+        durante a iteração: as listas são copiadas antes, então a corrida só
+        deixa de fora o carro novo, como na lista antiga, sem levantar
+        RuntimeError.
+        """
+        fluxos = [
+            [c for c in carros[self._cabeca.get(sid, 0):] if c is not None]
+            for sid, carros in list(self._carros.items())
+        ]
+        return heapq.merge(*fluxos, key=lambda c: c[2])
+
+    def __len__(self):
+        return self._total
@@ -0,0 +1,238 @@
+"""
+Terceira variante do controle: semáforos e carros no laço do asyncio.
+
+Mesmo modelo de com_controle (fases VERDES em rodízio ou atuadas, um
+sorteio ou um carro da fila por tick, colisão procurada em cada aresta de
+chegada), mas sem threads: cada semáforo é uma corrotina e cada carro em
+travessia é um loop.call_later que o remove da rua ao fim da travessia.
+O VERDE passa por asyncio.Event: o último semáforo da fase a encerrar
+escolhe a próxima e sinaliza o Event de cada semáforo dela.
+
+Como tudo roda numa thread só e nenhuma corrotina é suspensa entre ler e
+atualizar carros_atuais ou a fase, as regiões que com_controle protege
+com trava_carros e condicao_verde continuam exclusivas sem travas. Os
+eventos, o relatório e os resultados de run() são os mesmos de
+com_controle (sem as métricas de travas, que aqui não existem).
+
+Uso:
+    python com_asyncio.py [--semente N] [--duracao S] [--silencioso] [--definir NOME=VALOR]
+"""
+import time
+import random
+import asyncio
+from carros_ativos import CarrosAtivos
+from topologia import Topologia
+from controle_verde import CicloFixo, VerdeAtuado, Demanda, demandas_por_fase
+from estatisticas import VazaoJanela, JANELA_VAZAO
+from registro_eventos import RegistroEventos, SaidaConsole, abrir_saida
+from parametros import analisador, executar
+import com_controle
+
+# Mesmos parâmetros e padrões de com_controle, menos os que dependem das
+# threads: o relógio virtual (TEMPO_VIRTUAL) e as métricas de travas
+PARAMETROS = tuple(nome for nome in com_controle.PARAMETROS
+                   if nome not in ('TEMPO_VIRTUAL', 'ARQUIVO_METRICAS'))
+
+
+def configuracao(config=None):
+    """Os padrões de com_controle com as chaves de `config` por cima."""
+    return com_controle.configuracao(config, PARAMETROS)
+
+
+class Simulacao:
+    """
+    Estado de uma execução. Os asyncio.Event são criados dentro do laço,
+    em _principal, para que cada execução use o seu.
+    """
+
+    def __init__(self, config=None):
+        cfg = self.cfg = configuracao(config)
+        self.gerador = random.Random(cfg['SEMENTE'])
+
+        # === Cruzamentos, controle do VERDE e demanda (como em com_controle) ===
+        self.topologia = (Topologia.grade(*cfg['GRADE'], gerador=self.gerador) if cfg['GRADE']
+                          else Topologia.linear(cfg['NUM_SEMAFOROS']))
+        nos = self.topologia.nos
+        self.controle = (VerdeAtuado(cfg['VERDE_MIN'], cfg['VERDE_MAX'])
+                         if cfg['MODO_VERDE'] == 'atuado' else CicloFixo(cfg['TEMPO_VERDE']))
+        self.demanda = None              # Demanda, sorteada em _principal (com TAXA_CHEGADA)
+        self.inicio = None               # time.time() no início do laço
+
+        # === Fluxo de eventos: a thread escritora fica fora do laço ===
+        saidas_eventos = [SaidaConsole()] if cfg['SAIDA_CONSOLE'] else []
+        if cfg['ARQUIVO_EVENTOS']:
+            saidas_eventos.append(abrir_saida(cfg['ARQUIVO_EVENTOS']))
+        self.eventos = RegistroEventos(saidas_eventos)
+
+        # === Passagem do VERDE ===
+        self.fim = None                  # asyncio.Event: fim da simulação (tempo ou acidente)
+        self.eventos_verde = None        # {id: asyncio.Event} sinalizado quando a fase do id fica VERDE
+        self.fase_verde = 0              # Índice (em topologia.fases) da fase com VERDE
+        self.pendentes_fase = len(self.topologia.fases[0])   # Semáforos da fase atual ainda VERDES
+
+        # === Estatísticas de liberação ===
+        self.carros_liberados = {i: 0 for i in nos}     # total liberado por semáforo
+        self.tempos_liberacao = ({i: [] for i in nos}   # timestamps de liberação
+                                 if cfg['GUARDAR_TEMPOS'] else None)
+        self.janela_vazao = min(JANELA_VAZAO, cfg['TEMPO_SIMULACAO'])
+        self.vazao_liberacao = {i: VazaoJanela(self.janela_vazao) for i in nos}
+        self.contagens_liberacao = {i: 0 for i in nos}  # contador sequencial de carros
+        self.semaforos_acidente = set()                 # IDs de semáforos envolvidos em colisão
+
+        # Carros em travessia; só o laço acessa, então não há trava
+        self.carros_atuais = CarrosAtivos()
+
+    def evento_travessia(self, id_carro, id_semaforo, numero):
+        """Callback de loop.call_later: o carro terminou de atravessar."""
+        self.eventos.emitir('travessia', time.time(), id_semaforo, numero)
+        self.carros_atuais.remover(id_carro)
+
+    async def semaforo(self, id_semaforo):
+        """Ciclo VERDE/VERMELHO de um semáforo, até o fim ou uma colisão."""
+        cfg = self.cfg
+        laco = asyncio.get_running_loop()
+        topologia, controle, demanda = self.topologia, self.controle, self.demanda
+        eventos, carros_atuais, fim = self.eventos, self.carros_atuais, self.fim
+        minha_vez = self.eventos_verde[id_semaforo]
+        intervalo_tick = cfg['INTERVALO_TICK']
+        probabilidade_lib = cfg['PROBABILIDADE_LIB']
+        janela_colisao = cfg['JANELA_COLISAO']
+        sorteio = self.gerador.random
+
+        while not fim.is_set():
+            # Aguarda a sua fase receber o VERDE
+            await minha_vez.wait()
+            minha_vez.clear()
+            if fim.is_set():
+                return
+
+            inicio_verde = time.time()
+            eventos.emitir('verde', inicio_verde, id_semaforo,
+                           valor=cfg['VERDE_MAX'] if cfg['MODO_VERDE'] == 'atuado' else cfg['TEMPO_VERDE'])
+
+            while not fim.is_set():
+                await asyncio.sleep(intervalo_tick)
+                agora = time.time()
+                fila = demanda.fila(id_semaforo, agora) if demanda else None
+                if controle.encerrar(agora - inicio_verde, fila):
+                    break
+
+                liberar = fila > 0 if demanda else sorteio() < probabilidade_lib
+                if liberar:
+                    self.contagens_liberacao[id_semaforo] += 1
+                    numero = self.contagens_liberacao[id_semaforo]
+                    id_carro = f"carro{numero}_s{id_semaforo}"
+                    if self.tempos_liberacao is not None:
+                        self.tempos_liberacao[id_semaforo].append(agora)
+                    self.vazao_liberacao[id_semaforo].registrar(agora)
+                    self.carros_liberados[id_semaforo] += 1
+
+                    tempo_viagem = topologia.travessia[id_semaforo]
+                    if demanda:
+                        demanda.atender(id_semaforo, agora)
+                    carros_atuais.adicionar(id_carro, agora + tempo_viagem, agora, id_semaforo)
+                    rua = ([(c, tl) for c, _, tl, _ in carros_atuais]
+                           if eventos.detalhado else None)
+                    # A remoção é um callback no laço, não uma thread por carro
+                    laco.call_later(tempo_viagem, self.evento_travessia, id_carro, id_semaforo, numero)
+                    eventos.emitir('liberacao', agora, id_semaforo, numero, agora - inicio_verde, rua)
+
+                    for sema_ante, tempo_ate_ante in topologia.entradas[id_semaforo]:
+                        envolvidos = carros_atuais.na_janela(
+                            sema_ante, agora, tempo_ate_ante, tempo_ate_ante + janela_colisao
+                        )
+                        if envolvidos:
+                            envolvidos.append(id_carro)
+                            self.semaforos_acidente.update({sema_ante, id_semaforo})
+                            eventos.emitir('acidente', agora, id_semaforo,
+                                           extra=(sorted(self.semaforos_acidente), envolvidos))
+                            fim.set()
+                            return
+
+            eventos.emitir('vermelho', time.time(), id_semaforo)
+
+            # O último da fase escolhe a próxima e entrega o VERDE a cada
+            # semáforo dela; nada é aguardado entre ler e atualizar a fase
+            self.pendentes_fase -= 1
+            if self.pendentes_fase == 0:
+                demandas = (demandas_por_fase(topologia, demanda, time.time()) if demanda
+                            else [(0, 0.0)] * len(topologia.fases))
+                self.fase_verde = controle.proxima_fase(self.fase_verde, demandas)
+                self.pendentes_fase = len(topologia.fases[self.fase_verde])
+                for u in topologia.fases[self.fase_verde]:
+                    self.eventos_verde[u].set()
+
+    async def _principal(self):
+        # As chegadas contam a partir do início do laço, não da criação do
+        # objeto (asyncio.run ainda monta o laço antes de chegar aqui)
+        self.inicio = time.time()
+        if self.cfg['TAXA_CHEGADA']:
+            self.demanda = Demanda(self.topologia.nos, self.cfg['TAXA_CHEGADA'],
+                                   self.cfg['TEMPO_SIMULACAO'], origem=self.inicio,
+                                   gerador=self.gerador)
+        self.fim = asyncio.Event()
+        self.eventos_verde = {u: asyncio.Event() for u in self.topologia.nos}
+        for u in self.topologia.fases[0]:
+            self.eventos_verde[u].set()
+        tarefas = [asyncio.create_task(self.semaforo(u)) for u in self.topologia.nos]
+        try:
+            await asyncio.wait_for(self.fim.wait(), self.cfg['TEMPO_SIMULACAO'])
+        except asyncio.TimeoutError:
+            pass
+        # Fim: acorda quem aguarda o VERDE e espera cada corrotina sair; os
+        # call_later pendentes são descartados com o laço
+        self.fim.set()
+        for evento in self.eventos_verde.values():
+            evento.set()
+        await asyncio.gather(*tarefas)
+
+    def executar(self):
+        """
+        Roda a simulação até TEMPO_SIMULACAO ou até um acidente e imprime o
+        relatório (se RELATORIO).
+
+        Retorna:
+            dict: como com_controle.run, sem 'metricas'.
+        """
+        inicio_real = time.perf_counter()
+        asyncio.run(self._principal())
+        self.eventos.fechar()
+
+        agora = time.time()
+        inicio = self.inicio
+        duracao = agora - inicio
+        resultados = {
+            'liberados': dict(self.carros_liberados),
+            'acidente': sorted(self.semaforos_acidente),
+            'duracao': duracao,
+            'tarde': [c for c, fim, _, _ in self.carros_atuais if fim > agora],
+            'vazao': {sid: v.taxa(agora, inicio) * 60 for sid, v in self.vazao_liberacao.items()},
+            'janela_vazao': min(self.janela_vazao, agora - inicio),
+            'demanda': self.demanda.resumo(agora) if self.demanda else None,
+            'tempos_liberacao': self.tempos_liberacao,
+        }
+        resultados['tempo_real'] = time.perf_counter() - inicio_real
+        if self.cfg['RELATORIO']:
+            self.relatorio(resultados)
+        return resultados
+
+    def relatorio(self, r):
+        """Mesmo relatório final de com_controle."""
+        com_controle.relatorio(r, self.cfg)
+
+
+def run(config=None):
+    """
+    Executa uma simulação com asyncio e devolve os resultados (mesmas
+    chaves de com_controle.run, exceto 'metricas').
+    """
+    return Simulacao(config).executar()
+
+
+def main(argv=None):
+    parser = analisador("Semáforos com controle sobre asyncio.")
+    executar(run, parser.parse_args(argv))
+
+
+if __name__ == '__main__':
+    main()
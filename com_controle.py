@@ -1,172 +1,369 @@
 import threading
 import time
 import random
+from relogio import RelogioReal, RelogioVirtual
+from carros_ativos import CarrosAtivos
+from topologia import Topologia
+from controle_verde import CicloFixo, VerdeAtuado, Demanda, demandas_por_fase
+from instrumentacao import Instrumentacao
+from estatisticas import VazaoJanela, JANELA_VAZAO
+from registro_eventos import RegistroEventos, SaidaConsole, abrir_saida
+from parametros import mesclar, analisador, executar
 
 # === Configurações gerais da simulação ===
-NUM_SEMAFOROS        = 4      # Quantidade de semáforos interligados
+# São os padrões de run(config); cada chave de `config` substitui a constante de mesmo nome.
+NUM_SEMAFOROS        = 4      # Quantidade de semáforos interligados (rua linear)
+GRADE                = None   # (linhas, colunas) para uma grade de cruzamentos; None = rua linear
 TEMPO_SIMULACAO      = 30.0   # Duração total da simulação em segundos
 TEMPO_VERDE          = 3.0    # Tempo (s) que cada semáforo fica VERDE
+MODO_VERDE           = 'fixo' # 'fixo' (TEMPO_VERDE em rodízio) ou 'atuado' (conforme a fila)
+VERDE_MIN            = 1.0    # Modo atuado: VERDE mínimo (s)
+VERDE_MAX            = 6.0    # Modo atuado: VERDE máximo (s)
+TAXA_CHEGADA         = None   # Chegadas (carros/s) por semáforo, número ou {id: taxa}; None = liberação por sorteio
 INTERVALO_TICK       = 0.3    # Intervalo (s) entre tentativas de liberação de carro
 PROBABILIDADE_LIB    = 0.2    # Probabilidade de liberar um carro a cada tick (0.0 a 1.0)
 JANELA_COLISAO       = 0.3    # Janela (s) para detectar colisão entre semáforos adjacentes
+TEMPO_VIRTUAL        = False  # True: roda sobre relógio simulado, sem esperar em tempo real
+SEMENTE              = None   # Semente do gerador aleatório (None = aleatória)
+SAIDA_CONSOLE        = True   # Exibe os eventos no console, no formato de texto original
+RELATORIO            = True   # Imprime o relatório final
+ARQUIVO_EVENTOS      = None   # Caminho .jsonl ou .bin para gravar os eventos (None = não grava)
+ARQUIVO_METRICAS     = None   # Caminho .json ou .prom para exportar medidas de travas e tempos (None = desligada)
+GUARDAR_TEMPOS       = False  # True: guarda o instante de cada liberação em tempos_liberacao (memória cresce sem limite)
 
-# === Objetos de sincronização ===
-trava_impressao      = threading.Lock()      # Garante prints sem sobreposição
-evento_simulacao     = threading.Event()     # Sinaliza fim imediato da simulação
-condicao_verde       = threading.Condition() # Coordena qual semáforo está com VERDE
-semaforo_verde_atual = 1                     # ID do semáforo que iniciou em VERDE
+PARAMETROS = (
+    'NUM_SEMAFOROS', 'GRADE', 'TEMPO_SIMULACAO', 'TEMPO_VERDE', 'MODO_VERDE', 'VERDE_MIN',
+    'VERDE_MAX', 'TAXA_CHEGADA', 'INTERVALO_TICK', 'PROBABILIDADE_LIB', 'JANELA_COLISAO',
+    'TEMPO_VIRTUAL', 'SEMENTE', 'SAIDA_CONSOLE', 'RELATORIO', 'ARQUIVO_EVENTOS',
+    'ARQUIVO_METRICAS', 'GUARDAR_TEMPOS',
+)
 
-# === Estatísticas de liberação ===
-carros_liberados    = {i: 0 for i in range(1, NUM_SEMAFOROS + 1)}   # total liberado por semáforo
-tempos_liberacao    = {i: [] for i in range(1, NUM_SEMAFOROS + 1)} # timestamps de liberação
-contagens_liberacao = {i: 0 for i in range(1, NUM_SEMAFOROS + 1)} # contador sequencial de carros
-semaforos_acidente  = set()                                    # IDs de semáforos envolvidos em colisão
 
-# Lista compartilhada de carros em travessia: tuplas (id_carro, fim_trav, inicio_lib, id_semaforo)
-carros_atuais = []
-trava_carros   = threading.Lock()  # Protege acesso à lista carros_atuais
-
-
-def evento_travessia(id_carro):
+def configuracao(config=None, parametros=PARAMETROS):
     """
-    Invocada quando um carro termina de atravessar. Remove da lista de ativos.
+    Os padrões do módulo com as chaves de `config` por cima. `parametros`
+    restringe os nomes aceitos (com_asyncio não tem TEMPO_VIRTUAL nem
+    ARQUIVO_METRICAS).
     """
-    with trava_impressao:
-        print(f"  ▶ O {id_carro} atravessou a rua completamente.")
-    # Remove todas as entradas correspondentes a este carro
-    carros_atuais[:] = [
-        (c, tf, tl, sid)
-        for c, tf, tl, sid in carros_atuais
-        if c != id_carro
-    ]
+    cfg = mesclar(parametros, globals(), config)
+    if cfg['MODO_VERDE'] not in ('fixo', 'atuado'):
+        raise ValueError(f"MODO_VERDE inválido: {cfg['MODO_VERDE']!r} (use 'fixo' ou 'atuado')")
+    if cfg['MODO_VERDE'] == 'atuado' and not cfg['TAXA_CHEGADA']:
+        raise ValueError("MODO_VERDE 'atuado' precisa de TAXA_CHEGADA para medir as filas")
+    return cfg
 
 
-def trabalhador_semaforo(id_semaforo):
+class Simulacao:
     """
-    Thread que gerencia o ciclo de VERDE/VERMELHO de um semáforo.
-    Executa até o evento de simulação ser disparado ou até colisão.
+    Todo o estado de uma execução: relógio, cruzamentos, objetos de
+    sincronização, contadores e carros em travessia. Cada run() cria a sua,
+    então várias simulações podem rodar em sequência (ou ao mesmo tempo) no
+    mesmo processo.
     """
-    global semaforo_verde_atual
 
-    while not evento_simulacao.is_set():
-        # Aguarda ser notificado de que é sua vez de ficar VERDE
-        with condicao_verde:
-            while semaforo_verde_atual != id_semaforo and not evento_simulacao.is_set():
-                condicao_verde.wait()
+    def __init__(self, config=None):
+        cfg = self.cfg = configuracao(config)
+
+        # === Relógio da simulação (real ou virtual, ver relogio.py) ===
+        # Gerador próprio: a sequência de sorteios só depende de SEMENTE
+        self.gerador = random.Random(cfg['SEMENTE'])
+        self.relogio = RelogioVirtual() if cfg['TEMPO_VIRTUAL'] else RelogioReal()
+
+        # === Cruzamentos: adjacência, tempos de trânsito e fases (ver topologia.py) ===
+        self.topologia = (Topologia.grade(*cfg['GRADE'], gerador=self.gerador) if cfg['GRADE']
+                          else Topologia.linear(cfg['NUM_SEMAFOROS']))
+        nos = self.topologia.nos
+
+        # === Controle do VERDE e demanda com filas (ver controle_verde.py) ===
+        self.controle = (VerdeAtuado(cfg['VERDE_MIN'], cfg['VERDE_MAX'])
+                         if cfg['MODO_VERDE'] == 'atuado' else CicloFixo(cfg['TEMPO_VERDE']))
+        self.demanda = (Demanda(nos, cfg['TAXA_CHEGADA'], cfg['TEMPO_SIMULACAO'],
+                                origem=self.relogio.agora(), gerador=self.gerador)
+                        if cfg['TAXA_CHEGADA'] else None)
+
+        # === Fluxo de eventos: os caminhos quentes só enfileiram, uma thread escreve ===
+        saidas_eventos = [SaidaConsole()] if cfg['SAIDA_CONSOLE'] else []
+        if cfg['ARQUIVO_EVENTOS']:
+            saidas_eventos.append(abrir_saida(cfg['ARQUIVO_EVENTOS']))
+        self.eventos = RegistroEventos(saidas_eventos)
+
+        # === Instrumentação opcional das travas e tempos (ver instrumentacao.py) ===
+        self.metricas = Instrumentacao(ativa=cfg['ARQUIVO_METRICAS'] is not None)
+
+        # === Objetos de sincronização ===
+        self.trava_impressao = self.metricas.trava('trava_impressao')    # Garante prints sem sobreposição (relatório final)
+        self.evento_simulacao = threading.Event()                        # Sinaliza fim imediato da simulação
+        self.condicao_verde = self.metricas.condicao('condicao_verde')   # Coordena qual fase está com VERDE
+        self.fase_verde = 0                                  # Índice (em topologia.fases) da fase com VERDE
+        self.rodada_verde = 0                                # Nº de trocas de fase já feitas
+        self.pendentes_fase = len(self.topologia.fases[0])   # Semáforos da fase atual ainda VERDES
+
+        # === Estatísticas de liberação ===
+        self.carros_liberados = {i: 0 for i in nos}     # total liberado por semáforo
+        self.tempos_liberacao = ({i: [] for i in nos}   # timestamps de liberação
+                                 if cfg['GUARDAR_TEMPOS'] else None)
+        # Vazão recente por semáforo, em memória constante (só a thread do semáforo escreve)
+        self.janela_vazao = min(JANELA_VAZAO, cfg['TEMPO_SIMULACAO'])
+        self.vazao_liberacao = {i: VazaoJanela(self.janela_vazao) for i in nos}
+        self.contagens_liberacao = {i: 0 for i in nos}  # contador sequencial de carros
+        self.semaforos_acidente = set()                 # IDs de semáforos envolvidos em colisão
+
+        # Carros em travessia, indexados por semáforo e instante de liberação;
+        # itera tuplas (id_carro, fim_trav, inicio_lib, id_semaforo)
+        self.carros_atuais = CarrosAtivos()
+        self.trava_carros = self.metricas.trava('trava_carros')  # Protege acesso a carros_atuais
+
+    def evento_travessia(self, id_carro, id_semaforo, numero, inicio_lib):
+        """
+        Invocada quando um carro termina de atravessar. Remove da lista de ativos.
+        """
+        agora = self.relogio.agora()
+        self.eventos.emitir('travessia', agora, id_semaforo, numero)
+        if self.metricas.ativa:
+            self.metricas.registrar('travessia', agora - inicio_lib)
+        # Remove o carro da rua (O(1) amortizado)
+        with self.trava_carros:
+            self.carros_atuais.remover(id_carro)
+
+    def trabalhador_semaforo(self, id_semaforo):
+        """
+        Thread que gerencia o ciclo de VERDE/VERMELHO de um semáforo.
+        Executa até o evento de simulação ser disparado ou até colisão.
+        """
+        cfg = self.cfg
+        relogio, topologia, controle, demanda = self.relogio, self.topologia, self.controle, self.demanda
+        eventos, metricas = self.eventos, self.metricas
+        evento_simulacao, condicao_verde = self.evento_simulacao, self.condicao_verde
+        carros_atuais, trava_carros = self.carros_atuais, self.trava_carros
+        intervalo_tick = cfg['INTERVALO_TICK']
+        probabilidade_lib = cfg['PROBABILIDADE_LIB']
+        janela_colisao = cfg['JANELA_COLISAO']
+        sorteio = self.gerador.random
+
+        fase = topologia.fase_de[id_semaforo]
+        ultima_rodada = None  # rodada em que este semáforo ficou VERDE pela última vez
+
+        def minha_vez():
+            return ((self.fase_verde == fase and self.rodada_verde != ultima_rodada)
+                    or evento_simulacao.is_set())
+
+        while not evento_simulacao.is_set():
+            # Aguarda ser notificado de que é a vez da sua fase ficar VERDE
+            relogio.aguardar(condicao_verde, minha_vez)
             if evento_simulacao.is_set():
                 return  # sai se simulação finalizada
+            ultima_rodada = self.rodada_verde
+
+            # Início do ciclo VERDE deste semáforo
+            inicio_verde = relogio.agora()
+            eventos.emitir('verde', inicio_verde, id_semaforo,
+                           valor=cfg['VERDE_MAX'] if cfg['MODO_VERDE'] == 'atuado' else cfg['TEMPO_VERDE'])
+
+            # Durante o período VERDE, a cada tick tenta liberar um carro; o
+            # controle decide quando o VERDE acaba (fixo ou conforme a fila)
+            while not evento_simulacao.is_set():
+                relogio.dormir(intervalo_tick)
+                if evento_simulacao.is_set():
+                    return  # acordada pelo encerramento: não libera depois do fim
+                agora = relogio.agora()
+                fila = demanda.fila(id_semaforo, agora) if demanda else None
+                if controle.encerrar(agora - inicio_verde, fila):
+                    break
 
-        # Início do ciclo VERDE deste semáforo
-        with trava_impressao:
-            print(f"\n[S{id_semaforo}] — VERDE ({TEMPO_VERDE:.0f}s)")
-
-        inicio_verde = time.time()
-        fim_verde    = inicio_verde + TEMPO_VERDE
-
-        # Durante o período VERDE, a cada tick tenta liberar um carro
-        while time.time() < fim_verde and not evento_simulacao.is_set():
-            time.sleep(INTERVALO_TICK)
-            agora = time.time()
-            if agora > fim_verde:
-                break
-
-            # Sorteia se um carro é liberado neste tick
-            if random.random() < PROBABILIDADE_LIB:
-                # Cria um novo carro com ID sequencial baseado no semáforo
-                contagens_liberacao[id_semaforo] += 1
-                id_carro = f"carro{contagens_liberacao[id_semaforo]}_s{id_semaforo}"
-                tempos_liberacao[id_semaforo].append(agora)
-                carros_liberados[id_semaforo] += 1
-
-                # Tempo estimado para completar travessia: função da posição do semáforo
-                tempo_viagem = NUM_SEMAFOROS - id_semaforo + 2
-                fim_travessia = agora + tempo_viagem
-
-                # Adiciona carro à lista de atravessamento ativo
-                with trava_carros:
-                    carros_atuais.append((id_carro, fim_travessia, agora, id_semaforo))
-
-                # Agenda evento que remove o carro ao fim da travessia
-                timer = threading.Timer(tempo_viagem, evento_travessia, args=(id_carro,))
-                timer.daemon = True
-                timer.start()
-
-                # Imprime estado atual da rua após liberação
-                with trava_impressao:
-                    estados = [
-                        f"({c}, {(agora - tl):.2f}s)"
-                        for c, _, tl, _ in carros_atuais
-                    ]
-                    print(f"  • S{id_semaforo} liberou {id_carro} em {(agora - inicio_verde):.2f}s do verde. Rua:",
-                          " ".join(estados))
-
-                # Verifica colisão com semáforo anterior adjacente
-                sema_ante = id_semaforo - 1
-                if sema_ante >= 1:
-                    envolvidos = []
-                    # tempo de trânsito até semáforo anterior (exemplo fixo)
-                    tempo_ate_ante = 1 + abs(id_semaforo - sema_ante)
+                # Com demanda, libera o primeiro da fila; sem ela, sorteia
+                liberar = fila > 0 if demanda else sorteio() < probabilidade_lib
+                if liberar:
+                    # Cria um novo carro com ID sequencial baseado no semáforo
+                    self.contagens_liberacao[id_semaforo] += 1
+                    numero = self.contagens_liberacao[id_semaforo]
+                    id_carro = f"carro{numero}_s{id_semaforo}"
+                    if self.tempos_liberacao is not None:
+                        self.tempos_liberacao[id_semaforo].append(agora)
+                    self.vazao_liberacao[id_semaforo].registrar(agora)
+                    self.carros_liberados[id_semaforo] += 1
+
+                    # Tempo estimado para completar travessia: função da posição do semáforo
+                    tempo_viagem = topologia.travessia[id_semaforo]
+                    fim_travessia = agora + tempo_viagem
+
+                    # Adiciona carro à lista de atravessamento ativo; o retrato
+                    # da rua só é montado se alguma saída for exibi-lo
                     with trava_carros:
-                        for c_prev, _, tl_prev, sid_prev in carros_atuais:
-                            if sid_prev == sema_ante:
-                                delta = agora - tl_prev
-                                # colisão se cruzamentos próximos chocam dentro da janela
-                                if tempo_ate_ante <= delta <= tempo_ate_ante + JANELA_COLISAO:
-                                    envolvidos.append(c_prev)
-                    if envolvidos:
-                        envolvidos.append(id_carro)
-                        semaforos_acidente.update({sema_ante, id_semaforo})
-                        with trava_impressao:
-                            print(f"💥 ACIDENTE! Semáforos envolvidos: {sorted(semaforos_acidente)}")
-                            print(f"  • Carros envolvidos: {envolvidos}")
-                        # encerra simulação em caso de acidente
-                        evento_simulacao.set()
-                        return
-
-        # Fim do período VERDE: semáforo volta ao estado VERMELHO
-        with trava_impressao:
-            print(f"[S{id_semaforo}] — VERMELHO")
-
-        # Passa o VERDE para o próximo semáforo e notifica todas threads
-        with condicao_verde:
-            semaforo_verde_atual = (id_semaforo % NUM_SEMAFOROS) + 1
-            condicao_verde.notify_all()
-
-
-# === Inicialização das threads de semáforos ===
-threads = []
-for s in range(1, NUM_SEMAFOROS + 1):
-    t = threading.Thread(target=trabalhador_semaforo, args=(s,), daemon=True)
-    t.start()
-    threads.append(t)
-
-# === Loop principal controla duração da simulação ===
-inicio = time.time()
-while time.time() - inicio < TEMPO_SIMULACAO and not evento_simulacao.is_set():
-    time.sleep(0.2)
-# Sinaliza término caso o tempo acabe ou ocorra acidente
-evento_simulacao.set()
-
-# Destrava possíveis threads em espera e aguarda todas encerrarem
-with condicao_verde:
-    condicao_verde.notify_all()
-for t in threads:
-    t.join()
-
-# === Finalização: limpa rua e exibe estatísticas ===
-with trava_impressao:
+                        if demanda:
+                            espera = demanda.atender(id_semaforo, agora)
+                            if metricas.ativa:
+                                metricas.registrar('espera', espera)
+                        carros_atuais.adicionar(id_carro, fim_travessia, agora, id_semaforo)
+                        rua = ([(c, tl) for c, _, tl, _ in carros_atuais]
+                               if eventos.detalhado else None)
+
+                    # Agenda evento que remove o carro ao fim da travessia
+                    relogio.agendar(tempo_viagem, self.evento_travessia,
+                                    args=(id_carro, id_semaforo, numero, agora))
+
+                    # Registra a liberação (a formatação fica com a thread escritora)
+                    eventos.emitir('liberacao', agora, id_semaforo, numero, agora - inicio_verde, rua)
+
+                    # Verifica colisão com cada semáforo que tem aresta para este
+                    for sema_ante, tempo_ate_ante in topologia.entradas[id_semaforo]:
+                        # colisão se cruzamentos próximos chocam dentro da janela:
+                        # busca por bissecção só entre os carros do semáforo anterior
+                        with trava_carros:
+                            envolvidos = carros_atuais.na_janela(
+                                sema_ante, agora, tempo_ate_ante, tempo_ate_ante + janela_colisao
+                            )
+                        if envolvidos:
+                            envolvidos.append(id_carro)
+                            self.semaforos_acidente.update({sema_ante, id_semaforo})
+                            eventos.emitir('acidente', agora, id_semaforo,
+                                           extra=(sorted(self.semaforos_acidente), envolvidos))
+                            # encerra simulação em caso de acidente
+                            evento_simulacao.set()
+                            return
+
+            # Fim do período VERDE: semáforo volta ao estado VERMELHO
+            eventos.emitir('vermelho', relogio.agora(), id_semaforo)
+
+            # O último semáforo da fase a encerrar escolhe a próxima fase (em
+            # ordem ou pela demanda) e notifica todas threads
+            with condicao_verde:
+                self.pendentes_fase -= 1
+                if self.pendentes_fase == 0:
+                    demandas = (demandas_por_fase(topologia, demanda, relogio.agora()) if demanda
+                                else [(0, 0.0)] * len(topologia.fases))
+                    self.fase_verde = controle.proxima_fase(self.fase_verde, demandas)
+                    self.rodada_verde += 1
+                    self.pendentes_fase = len(topologia.fases[self.fase_verde])
+                    condicao_verde.notify_all()
+
+    def iniciar_semaforo(self, id_semaforo):
+        """
+        Corpo da thread de cada semáforo: executa o ciclo e avisa o relógio
+        quando a thread deixa de participar da simulação.
+        """
+        try:
+            self.trabalhador_semaforo(id_semaforo)
+        finally:
+            self.relogio.sair()
+
+    def executar(self):
+        """
+        Roda a simulação até TEMPO_SIMULACAO ou até um acidente, imprime o
+        relatório (se RELATORIO) e exporta as medidas (se ARQUIVO_METRICAS).
+
+        Retorna:
+            dict: ver run().
+        """
+        relogio = self.relogio
+
+        # === Inicialização das threads de semáforos ===
+        inicio_real = time.perf_counter()
+        threads = []
+        for s in self.topologia.nos:
+            t = threading.Thread(target=self.iniciar_semaforo, args=(s,), daemon=True)
+            relogio.registrar()
+            t.start()
+            threads.append(t)
+
+        # === Loop principal controla duração da simulação ===
+        inicio = relogio.agora()
+        while relogio.agora() - inicio < self.cfg['TEMPO_SIMULACAO'] and not self.evento_simulacao.is_set():
+            relogio.dormir(0.2)
+        # Sinaliza término caso o tempo acabe ou ocorra acidente
+        self.evento_simulacao.set()
+        relogio.encerrar()
+
+        # Destrava possíveis threads em espera e aguarda todas encerrarem
+        with self.condicao_verde:
+            self.condicao_verde.notify_all()
+        for t in threads:
+            t.join()
+        # Escreve os eventos que ainda estão na fila antes do relatório
+        self.eventos.fechar()
+
+        agora = relogio.agora()
+        duracao = agora - inicio
+        resultados = {
+            'liberados': dict(self.carros_liberados),
+            'acidente': sorted(self.semaforos_acidente),
+            'duracao': duracao,
+            # Carros que não completaram a travessia a tempo
+            'tarde': [c for c, fim, _, _ in self.carros_atuais if fim > agora],
+            'vazao': {sid: v.taxa(agora, inicio) * 60 for sid, v in self.vazao_liberacao.items()},
+            'janela_vazao': min(self.janela_vazao, agora - inicio),
+            'demanda': self.demanda.resumo(agora) if self.demanda else None,
+            'tempos_liberacao': self.tempos_liberacao,
+        }
+        resultados['tempo_real'] = time.perf_counter() - inicio_real
+        if self.cfg['RELATORIO']:
+            self.relatorio(resultados)
+        # Exporta as medidas depois do relatório, que também usa trava_impressao
+        if self.metricas.ativa:
+            resultados['metricas'] = self.metricas.instantaneo()
+            self.metricas.exportar(self.cfg['ARQUIVO_METRICAS'])
+        return resultados
+
+    def relatorio(self, r):
+        """Limpa a rua e exibe as estatísticas finais."""
+        with self.trava_impressao:
+            relatorio(r, self.cfg)
+
+
+def relatorio(r, cfg):
+    """Relatório final a partir dos resultados `r` de uma execução (também usado por com_asyncio)."""
     print("\nEsvaziando rua restante…")
-    agora = time.time()
     # Remove manualmente qualquer carro que não completou a tempo
-    for c, fim, _, _ in carros_atuais:
-        if fim > agora:
-            print(f"  • Carro {c} removido (tarde).")
+    for c in r['tarde']:
+        print(f"  • Carro {c} removido (tarde).")
     print("\n=== SIMULAÇÃO ENCERRADA ===")
     # Exibe contagem de carros liberados por semáforo
-    for sid, cnt in carros_liberados.items():
+    for sid, cnt in r['liberados'].items():
         print(f"  S{sid}: {cnt}")
+    print(f"Vazão nos últimos {r['janela_vazao']:.1f}s (carros/min): "
+          + ", ".join(f"S{sid}: {v:.1f}" for sid, v in r['vazao'].items()))
+    # Com demanda: vazão, espera média na fila e quem ficou esperando
+    if r['demanda']:
+        d = r['demanda']
+        print(f"Vazão ({cfg['MODO_VERDE']}): {d['liberados']} carros, "
+              f"{d['liberados'] * 60 / r['duracao'] if r['duracao'] else 0:.1f}/min; "
+              f"espera média {d['espera_media']:.2f}s; ainda na fila: {d['na_fila']}")
     # Informa se houve acidente e quais semáforos foram afetados
-    if semaforos_acidente:
-        print("Semáforos no acidente:", sorted(semaforos_acidente))
+    if r['acidente']:
+        print("Semáforos no acidente:", r['acidente'])
     else:
-        print("Nenhum acidente ocorreu.")
\ No newline at end of file
+        print("Nenhum acidente ocorreu.")
+    print(f"Tempo simulado: {r['duracao']:.1f}s em {r['tempo_real']:.3f}s reais")
+
+
+def run(config=None):
+    """
+    Executa uma simulação completa e devolve os resultados. Não depende de
+    estado global: pode ser chamada quantas vezes for preciso no mesmo
+    processo (ex.: varreduras de parâmetros).
+
+    Parâmetros:
+        config (dict): parâmetros a alterar, com os nomes das constantes do
+                       módulo (ex.: {'TEMPO_VIRTUAL': True, 'SEMENTE': 3,
+                       'SAIDA_CONSOLE': False, 'RELATORIO': False})
+
+    Retorna:
+        dict: 'liberados' por semáforo, semáforos do 'acidente' (vazia se
+              não houve), 'duracao' simulada e 'tempo_real' em segundos,
+              carros 'tarde', 'vazao' recente por semáforo (carros/min)
+              sobre os últimos 'janela_vazao' segundos (menos que
+              JANELA_VAZAO se a execução foi mais curta), resumo da
+              'demanda' (ou None), 'tempos_liberacao' (se GUARDAR_TEMPOS)
+              e, com ARQUIVO_METRICAS, 'metricas'.
+    """
+    return Simulacao(config).executar()
+
+
+def main(argv=None):
+    parser = analisador("Semáforos com controle: fases VERDES sincronizadas por threads.")
+    parser.add_argument('--virtual', action='store_true', help="relógio simulado (TEMPO_VIRTUAL)")
+    args = parser.parse_args(argv)
+    executar(run, args, {'TEMPO_VIRTUAL': True} if args.virtual else None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+"""
+Conferências de equivalência entre os motores de escalonamento.py.
+
+Cada conferência roda cenários semeados e compara os resultados carro a
+carro; `python conferencia.py` roda todas e termina com código 1 se alguma
+falhar.
+
+- eventos x referência: o motor de eventos (sem matriz de conflitos) contra
+  uma referência direta do Semaphore(1) original: ordem de escalonador_fcfs
+  ou escalonador_prioridade, entrada = max(chegada, saída anterior) e
+  travessia sorteada com random.uniform(1, 2) na ordem de entrada. As
+  esperas e a média têm de ser idênticas.
+- eventos x threads: o caminho com uma thread por carro, com os tempos
+  encolhidos por ESCALA_THREADS, tem a mesma ordem de entrada do motor de
+  eventos. As esperas não são comparadas: no relógio real elas somam os
+  atrasos de criação e escalonamento das threads, que se acumulam ao longo
+  da fila. No FCFS as chegadas são espaçadas de ESPACAMENTO segundos, para
+  que o relógio real não inverta chegadas quase simultâneas.
+- matriz total x sem matriz: com todos os movimentos em conflito entre si,
+  o laço com matriz de conflitos reproduz exatamente o log sem matriz.
+- CarrosAtivos x varredura: na_janela devolve os mesmos carros que a
+  varredura linear de `carros_atuais` que ele substituiu, sobre sequências
+  sorteadas de liberações, saídas e consultas.
+- grade particionada x com_controle: com PROBABILIDADE_LIB 1.0 não há
+  sorteio, e simulacao_grade libera os mesmos carros que com_controle em
+  tempo virtual numa grade pequena (sem colisões) e encontra o primeiro
+  acidente no mesmo instante, com as mesmas liberações antes dele, para
+  cada TEMPO_VERDE de GRADE_VERDES. Com
+  sorteio, a execução em GRADE_PROCESSOS processos é idêntica à de um.
+
+Uso:
+    python conferencia.py [SEMENTES]
+"""
+import sys
+import random
+
+import com_controle
+from topologia import Topologia
+from carros_ativos import CarrosAtivos
+from escalonamento import gerar_cenario, simular
+from simulacao_grade import simular_grade
+
+SEMENTES = 200
+ALGORITMOS = ('fcfs', 'prioridade')
+SEMENTES_THREADS = 2        # o caminho com threads roda em tempo real
+ESCALA_THREADS = 0.1
+ESPACAMENTO = 0.5
+OPERACOES = 2000            # por semente, na conferência do CarrosAtivos
+JANELA_COLISAO = 0.3        # mesma janela de com_controle
+SEMENTES_GRADE = 5          # cada uma roda com_controle 1 + len(GRADE_VERDES) vezes
+GRADE = (2, 3)
+GRADE_DURACAO = 60.0
+GRADE_PROCESSOS = 2
+# Com VERDES curtos a janela de colisão alcança carros que já terminaram a travessia
+GRADE_VERDES = (1.5, 2.1, 3.0)
+TOLERANCIA = 1e-9
+
+
+def referencia(algoritmo, semaforos, cars_data, semente):
+    """
+    Esperas do cruzamento único original, calculadas em sequência.
+
+    Retorna:
+        list: ((semaforo_id, carro_idx), espera) na ordem de entrada.
+    """
+    sorteio = random.Random(semente)
+    prioridade = {s['id']: s['priority'] for s in semaforos}
+    fcfs = algoritmo.lower() == 'fcfs'
+    # Ordenações estáveis, como escalonador_fcfs e escalonador_prioridade
+    ordem = sorted(cars_data, key=(lambda d: d['delay']) if fcfs
+                   else (lambda d: prioridade[d['semaforo_id']]))
+    livre = 0.0
+    esperas = []
+    for d in ordem:
+        chegada = d['delay'] if fcfs else 0.0
+        entrada = max(chegada, livre)
+        esperas.append(((d['semaforo_id'], d['carro_idx']), entrada - chegada))
+        livre = entrada + sorteio.uniform(1, 2)
+    return esperas
+
+
+def _log(algoritmo, semaforos, cars_data, semente, **kwargs):
+    """((semaforo_id, carro_idx), espera) de `simular`, em ordem de entrada, e a média."""
+    log = []
+    random.seed(semente)
+    media = simular(algoritmo, semaforos, cars_data, verboso=False, log=log, **kwargs)
+    log.sort(key=lambda item: item[0].tempo_entrada)
+    return [((c.semaforo_id, c.carro_idx), espera) for c, espera in log], media
+
+
+def conferir_referencia(sementes=SEMENTES):
+    """Motor de eventos x referência, com esperas e médias idênticas."""
+    falhas = []
+    for semente in range(sementes):
+        semaforos, cars_data = gerar_cenario(gerador=random.Random(semente))
+        # Chegadas fora da ordem de prioridade, que o cenário gerado nunca tem
+        random.Random(semente).shuffle(cars_data)
+        for algoritmo in ALGORITMOS:
+            esperado = referencia(algoritmo, semaforos, cars_data, semente)
+            obtido, media = _log(algoritmo, semaforos, cars_data, semente, motor='eventos')
+            media_esperada = sum(e for _, e in esperado) / len(esperado) if esperado else 0
+            if obtido != esperado or media != media_esperada:
+                falhas.append(f"semente {semente}, {algoritmo}: log ou média diferente da referência")
+    return falhas
+
+
+def conferir_threads(sementes=SEMENTES_THREADS):
+    """Motor de eventos x caminho com threads: mesma ordem de entrada no cruzamento."""
+    falhas = []
+    for semente in range(sementes):
+        gerador = random.Random(semente)
+        semaforos, cars_data = gerar_cenario(3, 4, gerador)
+        atrasos = [k * ESPACAMENTO for k in range(len(cars_data))]
+        gerador.shuffle(atrasos)
+        for d, atraso in zip(cars_data, atrasos):
+            d['delay'] = atraso
+        for algoritmo in ALGORITMOS:
+            eventos, _ = _log(algoritmo, semaforos, cars_data, semente, motor='eventos')
+            threads, _ = _log(algoritmo, semaforos, cars_data, semente, motor='threads',
+                              escala_tempo=ESCALA_THREADS)
+            if [c for c, _ in threads] != [c for c, _ in eventos]:
+                falhas.append(f"semente {semente}, {algoritmo}: ordem de entrada diferente")
+    return falhas
+
+
+def conferir_matriz(sementes=SEMENTES):
+    """Matriz em que todos os movimentos conflitam x conflitos=None."""
+    falhas = []
+    for semente in range(sementes):
+        semaforos, cars_data = gerar_cenario(gerador=random.Random(semente))
+        random.Random(semente).shuffle(cars_data)
+        ids = [s['id'] for s in semaforos]
+        total = {a: {b for b in ids if b != a} for a in ids}
+        for algoritmo in ALGORITMOS:
+            sem_matriz = _log(algoritmo, semaforos, cars_data, semente, motor='eventos')
+            com_matriz = _log(algoritmo, semaforos, cars_data, semente, motor='eventos',
+                              conflitos=total)
+            if com_matriz != sem_matriz:
+                falhas.append(f"semente {semente}, {algoritmo}: log ou média diferente sem matriz")
+    return falhas
+
+
+def varredura(carros_atuais, id_semaforo, agora, atraso_min, atraso_max):
+    """A busca original de com_controle: percorre todos os carros na rua."""
+    return [c for c, _, tl, sid in carros_atuais
+            if sid == id_semaforo and atraso_min <= agora - tl <= atraso_max]
+
+
+def conferir_carros_ativos(sementes=SEMENTES):
+    """CarrosAtivos.na_janela x varredura linear da lista de carros."""
+    falhas = []
+    for semente in range(sementes):
+        sorteio = random.Random(semente)
+        ativos, lista = CarrosAtivos(), []
+        agora, proximo = 0.0, 0
+        for _ in range(OPERACOES):
+            agora += sorteio.choice((0.0, sorteio.uniform(0, 0.5)))
+            sid = sorteio.randint(1, 4)
+            operacao = sorteio.random()
+            if operacao < 0.45:
+                carro = (f"C{proximo}", agora + sorteio.uniform(1, 2), agora, sid)
+                proximo += 1
+                ativos.adicionar(*carro)
+                lista.append(carro)
+            elif operacao < 0.75 and lista:
+                # Sai quase sempre o mais antigo, às vezes um do meio
+                indice = 0 if sorteio.random() < 0.8 else sorteio.randrange(len(lista))
+                ativos.remover(lista.pop(indice)[0])
+            else:
+                atraso = 1 + abs(sid - (sid - 1))   # tempo_ate_ante de com_controle
+                esperado = varredura(lista, sid - 1, agora, atraso, atraso + JANELA_COLISAO)
+                obtido = ativos.na_janela(sid - 1, agora, atraso, atraso + JANELA_COLISAO)
+                if obtido != esperado or len(ativos) != len(lista):
+                    falhas.append(f"semente {semente}, t={agora:.3f}: {obtido} != {esperado}")
+                    break
+        # Liberações no mesmo instante podem sair em outra ordem que a da lista
+        iterados = list(ativos)
+        if (sorted(iterados) != sorted(lista)
+                or any(a[2] > b[2] for a, b in zip(iterados, iterados[1:]))):
+            falhas.append(f"semente {semente}: iteração fora da ordem de liberação")
+    return falhas
+
+
+def _liberacoes_controle(semente, tempo_verde, janela_colisao):
+    """Instantes de liberação por nó de com_controle em tempo virtual, sem sorteio."""
+    r = com_controle.run({
+        'GRADE': GRADE, 'SEMENTE': semente, 'TEMPO_SIMULACAO': GRADE_DURACAO,
+        'TEMPO_VERDE': tempo_verde, 'PROBABILIDADE_LIB': 1.0,
+        'JANELA_COLISAO': janela_colisao, 'TEMPO_VIRTUAL': True,
+        'GUARDAR_TEMPOS': True, 'SAIDA_CONSOLE': False, 'RELATORIO': False,
+    })
+    return r['tempos_liberacao']
+
+
+def _contar(tempos, ate):
+    """Liberações por nó estritamente antes de `ate`."""
+    return {u: sum(t < ate - TOLERANCIA for t in ts) for u, ts in sorted(tempos.items())}
+
+
+def conferir_grade(sementes=SEMENTES_GRADE):
+    """simulacao_grade x com_controle numa grade pequena, e P processos x um."""
+    falhas = []
+    for semente in range(sementes):
+        # com_controle sorteia a topologia com o próprio gerador, antes de tudo
+        topologia = Topologia.grade(*GRADE, gerador=random.Random(semente))
+
+        # Sem colisões (janela negativa): as mesmas liberações até o fim
+        esperado = _contar(_liberacoes_controle(semente, com_controle.TEMPO_VERDE, -1.0),
+                           GRADE_DURACAO + com_controle.INTERVALO_TICK)
+        obtido = simular_grade(topologia, GRADE_DURACAO, semente, probabilidade_lib=1.0,
+                               janela_colisao=-1.0)
+        if obtido['liberados'] != esperado or obtido['acidentes']:
+            falhas.append(f"semente {semente}: liberações diferentes de com_controle")
+
+        # Com colisões: com_controle para no primeiro acidente
+        for verde in GRADE_VERDES:
+            tempos = _liberacoes_controle(semente, verde, JANELA_COLISAO)
+            obtido = simular_grade(topologia, GRADE_DURACAO, semente, tempo_verde=verde,
+                                   probabilidade_lib=1.0, janela_colisao=JANELA_COLISAO)
+            instante = obtido['primeiro_acidente']
+            fim = max(t for ts in tempos.values() for t in ts)
+            if instante is None or abs(instante - fim) > TOLERANCIA:
+                falhas.append(f"semente {semente}, verde {verde}: primeiro acidente em "
+                              f"{instante}, com_controle parou em {fim:.3f}")
+                continue
+            antes = simular_grade(topologia, instante - com_controle.INTERVALO_TICK / 2, semente,
+                                  tempo_verde=verde, probabilidade_lib=1.0,
+                                  janela_colisao=JANELA_COLISAO)
+            if antes['liberados'] != _contar(tempos, instante) or antes['acidentes']:
+                falhas.append(f"semente {semente}, verde {verde}: liberações antes do "
+                              f"acidente diferentes")
+
+        # Particionada: o resultado não depende do número de processos
+        um = simular_grade(topologia, GRADE_DURACAO, semente, processos=1)
+        varios = simular_grade(topologia, GRADE_DURACAO, semente, processos=GRADE_PROCESSOS)
+        if {**um, 'processos': None} != {**varios, 'processos': None}:
+            falhas.append(f"semente {semente}: {GRADE_PROCESSOS} processos diferente de um")
+    return falhas
+
+
+CONFERENCIAS = {
+    'eventos x referência': conferir_referencia,
+    'eventos x threads': conferir_threads,
+    'matriz total x sem matriz': conferir_matriz,
+    'CarrosAtivos x varredura': conferir_carros_ativos,
+    'grade particionada x com_controle': conferir_grade,
+}
+# Conferências caras, que rodam a própria quantidade de sementes
+PROPRIAS = (conferir_threads, conferir_grade)
+
+
+def conferir(sementes=SEMENTES, verboso=True):
+    """Roda todas as conferências; retorna o total de falhas."""
+    total = 0
+    for nome, conferencia in CONFERENCIAS.items():
+        falhas = conferencia() if conferencia in PROPRIAS else conferencia(sementes)
+        if verboso:
+            print(f"{nome}: {'ok' if not falhas else f'{len(falhas)} falha(s)'}")
+            for falha in falhas:
+                print(f"  {falha}")
+        total += len(falhas)
+    return total
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('sementes', type=int, nargs='?', default=SEMENTES,
+                        help='cenários das conferências exatas')
+    args = parser.parse_args()
+    sys.exit(1 if conferir(args.sementes) else 0)
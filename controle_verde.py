@@ -0,0 +1,173 @@
+"""
+Políticas de tempo de VERDE e demanda com filas por semáforo.
+
+- CicloFixo: o comportamento original de com_controle; cada fase fica
+  VERDE por TEMPO_VERDE e as fases se revezam em ordem, com ou sem carros.
+- VerdeAtuado: cada semáforo fica VERDE entre verde_min e verde_max; passado
+  o mínimo, encerra assim que sua fila esvazia. A próxima fase é a de maior
+  demanda (fila + chegadas esperadas durante o verde mínimo), pulando as
+  que não têm ninguém esperando.
+
+Demanda sorteia de antemão as chegadas (Poisson) de cada semáforo; a fila
+em um instante é quem já chegou e ainda não foi liberado. Com a mesma
+semente as duas políticas enfrentam exatamente os mesmos carros.
+
+comparar() roda com_controle com cada política sobre a mesma demanda.
+
+Uso:
+    python controle_verde.py [--taxa TAXA] [--duracao S] [--semente N]
+"""
+import bisect
+import random
+
+from parametros import analisador, executar
+
+TOLERANCIA  = 1e-9
+JANELA_TAXA = 10.0   # segundos considerados na estimativa da taxa de chegada
+MODOS       = ('fixo', 'atuado')
+
+
+class Demanda:
+    """
+    Chegadas por semáforo a partir de `origem`, com taxa em carros/s (um
+    número para todos ou {id: taxa}), até `duracao` segundos depois.
+    """
+
+    def __init__(self, nos, taxas, duracao, origem=0.0, gerador=random):
+        if not isinstance(taxas, dict):
+            taxas = {u: taxas for u in nos}
+        self.chegadas = {}
+        for u in nos:
+            tempos, t = [], 0.0
+            taxa = taxas.get(u, 0.0)
+            while taxa > 0:
+                t += gerador.expovariate(taxa)
+                if t > duracao:
+                    break
+                tempos.append(origem + t)
+            self.chegadas[u] = tempos
+        self.atendidos = {u: 0 for u in nos}
+        self.soma_espera = 0.0
+
+    def fila(self, u, agora):
+        """Carros de u que já chegaram e ainda esperam."""
+        return bisect.bisect_right(self.chegadas[u], agora) - self.atendidos[u]
+
+    def taxa(self, u, agora, janela=JANELA_TAXA):
+        """Taxa de chegada observada (carros/s) nos últimos `janela` segundos."""
+        tempos = self.chegadas[u]
+        return (bisect.bisect_right(tempos, agora)
+                - bisect.bisect_right(tempos, agora - janela)) / janela
+
+    def atender(self, u, agora):
+        """Libera o primeiro da fila de u e devolve quanto ele esperou."""
+        espera = agora - self.chegadas[u][self.atendidos[u]]
+        self.atendidos[u] += 1
+        self.soma_espera += espera
+        return espera
+
+    def resumo(self, agora):
+        """Total liberado, espera média dos liberados e carros ainda na fila."""
+        liberados = sum(self.atendidos.values())
+        return {
+            'liberados': liberados,
+            'espera_media': self.soma_espera / liberados if liberados else 0.0,
+            'na_fila': sum(self.fila(u, agora) for u in self.atendidos),
+        }
+
+
+class CicloFixo:
+    """VERDE de duração fixa, fases em ordem."""
+
+    def __init__(self, tempo_verde):
+        self.tempo_verde = tempo_verde
+
+    def encerrar(self, decorrido, fila):
+        return decorrido >= self.tempo_verde - TOLERANCIA
+
+    def proxima_fase(self, atual, demandas):
+        return (atual + 1) % len(demandas)
+
+
+class VerdeAtuado:
+    """VERDE entre verde_min e verde_max conforme a fila; fases por demanda."""
+
+    def __init__(self, verde_min, verde_max):
+        self.verde_min = verde_min
+        self.verde_max = verde_max
+
+    def encerrar(self, decorrido, fila):
+        if decorrido >= self.verde_max - TOLERANCIA:
+            return True
+        return fila == 0 and decorrido >= self.verde_min - TOLERANCIA
+
+    def proxima_fase(self, atual, demandas):
+        """
+        `demandas` traz (fila, taxa) somados por fase. Escolhe, entre as
+        outras fases com fila, a de maior fila + taxa * verde_min; empates
+        seguem a ordem do ciclo. Sem fila em lugar nenhum, segue o ciclo.
+        """
+        num_fases = len(demandas)
+        melhor, maior = None, 0.0
+        for passo in range(1, num_fases + 1):
+            f = (atual + passo) % num_fases
+            fila, taxa = demandas[f]
+            if fila == 0 or (f == atual and melhor is not None):
+                continue
+            pontos = fila + taxa * self.verde_min
+            if pontos > maior:
+                melhor, maior = f, pontos
+        return (atual + 1) % num_fases if melhor is None else melhor
+
+
+def demandas_por_fase(topologia, demanda, agora):
+    """(fila, taxa) de cada fase, somando seus semáforos."""
+    return [
+        (sum(demanda.fila(u, agora) for u in fase), sum(demanda.taxa(u, agora) for u in fase))
+        for fase in topologia.fases
+    ]
+
+
+def comparar(config=None):
+    """
+    Roda com_controle em tempo virtual uma vez com cada MODO_VERDE sobre a
+    mesma demanda: com a mesma SEMENTE, Demanda sorteia as mesmas chegadas.
+    As colisões ficam desligadas, já que um acidente encerraria a execução
+    antes de medir a vazão.
+
+    Parâmetros:
+        config (dict): parâmetros de com_controle (TAXA_CHEGADA e SEMENTE
+                       são obrigatórios)
+
+    Retorna:
+        dict: modo -> resultados de com_controle.run.
+    """
+    import com_controle   # com_controle importa este módulo
+
+    config = {'TEMPO_VIRTUAL': True, 'JANELA_COLISAO': -1.0, 'SAIDA_CONSOLE': False,
+              'RELATORIO': False, **(config or {})}
+    if config.get('SEMENTE') is None:
+        raise ValueError("a comparação precisa de SEMENTE para que os dois modos vejam a mesma demanda")
+    return {modo: com_controle.run({**config, 'MODO_VERDE': modo}) for modo in MODOS}
+
+
+def main(argv=None):
+    parser = analisador(__doc__.strip().splitlines()[0])
+    parser.add_argument('--taxa', type=float, default=0.3,
+                        help="carros/s por semáforo (o S1 recebe o triplo e o S4, metade)")
+    args = parser.parse_args(argv)
+    # Demanda desigual: o semáforo 1 recebe o triplo da taxa e o 4, metade
+    taxas = {1: args.taxa * 3, 2: args.taxa, 3: args.taxa, 4: args.taxa / 2}
+    resultados = executar(comparar, args, {'NUM_SEMAFOROS': 4, 'GRADE': None, 'TAXA_CHEGADA': taxas,
+                                           'TEMPO_SIMULACAO': 600.0, 'SEMENTE': 1})
+    duracao = resultados[MODOS[0]]['duracao']
+    print(f"Rua linear, {duracao:.0f}s simulados, taxas {taxas} carros/s")
+    print(f"{'controle':10} {'liberados':>9} {'carros/min':>10} {'espera(s)':>9} {'na fila':>7}")
+    for modo, r in resultados.items():
+        d = r['demanda']
+        print(f"{modo:10} {d['liberados']:9d} {d['liberados'] * 60 / r['duracao']:10.1f} "
+              f"{d['espera_media']:9.2f} {d['na_fila']:7d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""
+Escalonadores online do cruzamento, sobre uma fila de prontos em heap.
+
+Ao contrário de escalonador_fcfs/escalonador_prioridade (que ordenam a lista
+inteira uma vez, antes de começar), aqui cada carro é admitido na fila no
+instante real de chegada e o despacho escolhe o próximo em O(log n). Cada
+política só define a chave do heap:
+
+- fcfs:           ordem de chegada
+- prioridade:     prioridade do semáforo, depois chegada
+- sjf:            menor tempo de travessia esperado primeiro, estimado pela
+                  média das travessias já concluídas no semáforo
+- sjf_oraculo:    menor travessia real primeiro; conhece o futuro, serve só
+                  de limite inferior para a sjf
+- rr:             rodízio entre semáforos com carros esperando
+- envelhecimento: prioridade que melhora com o tempo de espera, evitando
+                  a inanição dos semáforos de baixa prioridade
+
+O motor (simular_online) usa relógio simulado e um único cruzamento, como
+simular_eventos.
+
+Uso:
+    python escalonadores.py [REPLICACOES] [MAX_CARROS]
+"""
+import sys
+import abc
+import heapq
+import random
+import itertools
+
+from escalonamento import RegistroCarro, gerar_cenario
+from estatisticas import Histograma, Momentos
+
+# Quanto a prioridade efetiva melhora por segundo de espera no envelhecimento
+TAXA_ENVELHECIMENTO = 1.0
+# Estimativa de travessia de um semáforo sem travessias concluídas (média de uniform(1, 2))
+TRAVESSIA_INICIAL = 1.5
+
+
+class FilaProntos(abc.ABC):
+    """
+    Fila de prontos em heap. Subclasses definem chave(carro); empates são
+    resolvidos pela ordem de admissão. admitir e proximo custam O(log n).
+    """
+    nome = None
+
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+
+    @abc.abstractmethod
+    def chave(self, carro):
+        """Chave de ordenação do carro no heap (menor sai primeiro)."""
+
+    def admitir(self, carro):
+        heapq.heappush(self._heap, (self.chave(carro), next(self._seq), carro))
+
+    def proximo(self):
+        return heapq.heappop(self._heap)[2]
+
+    def concluir(self, carro):
+        """Avisa que o carro saiu do cruzamento (travessia já observada)."""
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class FilaFCFS(FilaProntos):
+    nome = 'fcfs'
+
+    def chave(self, carro):
+        return carro.tempo_chegada
+
+
+class FilaPrioridade(FilaProntos):
+    nome = 'prioridade'
+
+    def chave(self, carro):
+        return (carro.prioridade, carro.tempo_chegada)
+
+
+class FilaSJF(FilaProntos):
+    """
+    Shortest-job-first pelo tempo de travessia esperado: a média das
+    travessias já concluídas no semáforo do carro (TRAVESSIA_INICIAL antes
+    da primeira), fixada na admissão.
+    """
+    nome = 'sjf'
+
+    def __init__(self, inicial=TRAVESSIA_INICIAL):
+        super().__init__()
+        self.inicial = inicial
+        self._travessias = {}   # id_semaforo -> Momentos das travessias concluídas
+
+    def chave(self, carro):
+        momentos = self._travessias.get(carro.semaforo_id)
+        esperada = momentos.media if momentos else self.inicial
+        return (esperada, carro.tempo_chegada)
+
+    def concluir(self, carro):
+        self._travessias.setdefault(carro.semaforo_id, Momentos()).adicionar(carro.travessia)
+
+
+class FilaSJFOraculo(FilaProntos):
+    """
+    Shortest-job-first pela travessia real, sorteada antes da entrada. Não é
+    realizável (o controlador não sabe quanto o carro vai demorar); mostra
+    o melhor que uma estimativa perfeita da sjf alcançaria.
+    """
+    nome = 'sjf_oraculo'
+
+    def chave(self, carro):
+        return (carro.travessia, carro.tempo_chegada)
+
+
+class FilaRoundRobin(FilaProntos):
+    """
+    Rodízio entre semáforos: o k-ésimo carro pendente de cada semáforo recebe
+    a rodada k (contada a partir da rodada em atendimento), e dentro de uma
+    rodada os semáforos são atendidos em ordem de id. Assim a chave é fixa
+    na admissão e o heap continua O(log n).
+    """
+    nome = 'rr'
+
+    def __init__(self):
+        super().__init__()
+        self._proxima_rodada = {}   # id_semaforo -> rodada do próximo carro admitido
+        self._rodada_atual = 0
+
+    def chave(self, carro):
+        rodada = max(self._proxima_rodada.get(carro.semaforo_id, 0), self._rodada_atual)
+        self._proxima_rodada[carro.semaforo_id] = rodada + 1
+        return (rodada, carro.semaforo_id)
+
+    def proximo(self):
+        (rodada, _), _, carro = heapq.heappop(self._heap)
+        self._rodada_atual = rodada
+        return carro
+
+
+class FilaEnvelhecimento(FilaProntos):
+    """
+    Prioridade com envelhecimento: a prioridade efetiva no instante t é
+    prioridade - taxa * (t - chegada). Como o termo taxa * t é igual para
+    todos os carros na fila, a ordem depende só de prioridade + taxa * chegada,
+    que é fixa na admissão.
+    """
+    nome = 'envelhecimento'
+
+    def __init__(self, taxa=TAXA_ENVELHECIMENTO):
+        super().__init__()
+        self.taxa = taxa
+
+    def chave(self, carro):
+        return carro.prioridade + self.taxa * carro.tempo_chegada
+
+
+POLITICAS = {cls.nome: cls for cls in
+             (FilaFCFS, FilaPrioridade, FilaSJF, FilaSJFOraculo, FilaRoundRobin,
+              FilaEnvelhecimento)}
+
+
+def simular_online(politica, semaforos, cars_data, log=None, gerador=random):
+    """
+    Simula o cruzamento único com a política informada (nome em POLITICAS ou
+    instância de FilaProntos). Todos os carros usam o atraso real de chegada.
+    O tempo de travessia de cada carro vem de cars_data['travessia'] ou é
+    sorteado com gerador.uniform(1, 2) na chegada, na ordem de chegada — o
+    mesmo para qualquer política com o mesmo gerador semeado, o que deixa as
+    comparações pareadas. A fila só é avisada da travessia de um carro
+    (FilaProntos.concluir) depois de admitir quem chegou durante ela.
+
+    Retorna:
+        list: esperas dos carros, na ordem em que entraram no cruzamento.
+    """
+    fila = POLITICAS[politica]() if isinstance(politica, str) else politica
+    por_id = {s['id']: s for s in semaforos}
+    carros = []
+    for seq, data in enumerate(cars_data):
+        sem = por_id[data['semaforo_id']]
+        carro = RegistroCarro(sem['id'], data['carro_idx'], data['delay'],
+                              sem['priority'], sem['prob'], travessia=data.get('travessia'))
+        carros.append((data['delay'], seq, carro))
+    carros.sort()
+    for _, _, carro in carros:
+        if carro.travessia is None:
+            carro.travessia = gerador.uniform(1, 2)
+
+    esperas = []
+    livre_em = 0.0          # instante em que o cruzamento fica livre
+    anterior = None         # carro que sai do cruzamento em livre_em
+    i, total = 0, len(carros)
+    while i < total or fila:
+        # Cruzamento livre e ninguém esperando: salta para a próxima chegada
+        if not fila:
+            livre_em = max(livre_em, carros[i][0])
+        # Admite todos que chegaram até o cruzamento ficar livre
+        while i < total and carros[i][0] <= livre_em:
+            fila.admitir(carros[i][2])
+            i += 1
+        if anterior is not None:
+            fila.concluir(anterior)
+        carro = fila.proximo()
+        carro.tempo_entrada = livre_em
+        carro.tempo_saida = livre_em + carro.travessia
+        espera = livre_em - carro.tempo_chegada
+        esperas.append(espera)
+        if log is not None:
+            log.append((carro, espera))
+        livre_em = carro.tempo_saida
+        anterior = carro
+    return esperas
+
+
+def comparar(replicacoes, max_carros=10, politicas=tuple(POLITICAS)):
+    """
+    Roda todas as políticas sobre os mesmos cenários (uma semente por
+    replicação) e devolve, por política, média, p99 e a pior espera média
+    entre semáforos (indicador de inanição). O p99 vem do esboço de quantis
+    (Histograma), que também responde com poucas esperas.
+    """
+    esperas = {p: Histograma() for p in politicas}
+    por_semaforo = {p: {} for p in politicas}
+    for semente in range(replicacoes):
+        semaforos, cars_data = gerar_cenario(max_carros=max_carros,
+                                             gerador=random.Random(semente))
+        for p in politicas:
+            log = []
+            simular_online(p, semaforos, cars_data, log, gerador=random.Random(semente))
+            for carro, espera in log:
+                esperas[p].registrar(espera)
+                por_semaforo[p].setdefault(carro.prioridade, Momentos()).adicionar(espera)
+
+    resumo = {}
+    for p in politicas:
+        h = esperas[p]
+        resumo[p] = {
+            'media': h.soma / h.contagem if h.contagem else 0.0,
+            'p99': h.quantil(0.99),
+            'pior_prioridade': max((m.media for m in por_semaforo[p].values()), default=0.0),
+        }
+    return resumo
+
+
+if __name__ == '__main__':
+    replicacoes = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    max_carros = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    print(f"{replicacoes} replicações, até {max_carros} carros por semáforo")
+    print(f"{'política':15} {'média(s)':>9} {'p99(s)':>9} {'pior nível(s)':>14}")
+    for p, r in comparar(replicacoes, max_carros).items():
+        print(f"{p:15} {r['media']:9.3f} {r['p99']:9.3f} {r['pior_prioridade']:14.3f}")
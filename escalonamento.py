@@ -1,7 +1,13 @@
 import threading
 import time
 import random
-import matplotlib.pyplot as plt
+import heapq
+from collections import deque
+
+from estatisticas import Estatisticas
+
+# Número fixo de threads trabalhadoras do motor 'pool'
+TAMANHO_POOL = 4
 
 # Classe que representa cada veículo passando por um semáforo
 class Carro(threading.Thread):
@@ -24,8 +30,16 @@ class Carro(threading.Thread):
         # Flags para controlar o formato do print durante a simulação
         self.show_prioridade = False
         self.position = None
-        # Timestamp de início de passagem pelo semáforo
+        self.verboso = True
+        # Fluxo de eventos (registro_eventos.RegistroEventos) ou None para print
+        self.eventos = None
+        # Fator aplicado aos tempos reais (1.0 = segundos de verdade)
+        self.escala = 1.0
+        # Instrumentação (instrumentacao.Instrumentacao) ou None
+        self.metricas = None
+        # Timestamps de início e fim da passagem pelo semáforo
         self.tempo_entrada = None
+        self.tempo_saida = None
 
     def run(self):
         """
@@ -39,32 +53,27 @@ class Carro(threading.Thread):
         # 1) Aguarda até o instante de chegada
         time.sleep(max(0, self.tempo_chegada - time.time()))
 
-        # 2) Seção crítica: somente um carro por vez
+        # 2) Seção crítica: somente um carro por vez (ou, com matriz de
+        #    conflitos, só os pontos de conflito do seu movimento)
         with self.semaforo:
             # Marca o instante de início da travessia
             self.tempo_entrada = time.time()
-            # 3) Cálculo do tempo de espera
-            espera = self.tempo_entrada - self.tempo_chegada
+            # 3) Cálculo do tempo de espera (em segundos simulados)
+            espera = (self.tempo_entrada - self.tempo_chegada) / self.escala
             # Registra no log compartilhado
             self.log.append((self, espera))
 
-            # 4) Impressão do resultado para o usuário
-            if self.show_prioridade:
-                # Mostra probabilidade e prioridade no algoritmo de prioridades
-                print(
-                    f"Carro {self.carro_idx} do semáforo {self.semaforo_id} "
-                    f"(Prob: {self.prob*100:.1f}%, Pri: {self.prioridade}) "
-                    f"esperou {espera:.3f}s"
-                )
-            else:
-                # Mostra posição e tempo de espera no algoritmo FCFS
-                print(
-                    f"Carro {self.carro_idx} do semáforo {self.semaforo_id} "
-                    f"- posição {self.position}: esperou {espera:.3f}s"
-                )
+            # 4) Resultado para o usuário: evento na fila ou print direto
+            _registrar_espera(self, espera, not self.show_prioridade,
+                              self.verboso, self.eventos)
 
             # 5) Tempo de travessia aleatório (1 a 2 segundos)
-            time.sleep(random.uniform(1, 2))
+            time.sleep(random.uniform(1, 2) * self.escala)
+            self.tempo_saida = time.time()
+            if self.metricas is not None:
+                self.metricas.registrar('espera', espera)
+                self.metricas.registrar('travessia',
+                                        (self.tempo_saida - self.tempo_entrada) / self.escala)
 
 
 # ----------------------
@@ -85,11 +94,166 @@ def escalonador_prioridade(carros):
     return sorted(carros, key=lambda c: c.prioridade)
 
 
+def _imprimir_ordem(ordem, fcfs):
+    """Imprime a ordem prevista de passagem, no formato de cada algoritmo."""
+    if fcfs:
+        print("Ordem de chegada dos carros:")
+        for carro in ordem:
+            print(f"  Posição {carro.position}: Carro {carro.carro_idx} do semáforo {carro.semaforo_id}")
+    else:
+        print("Ordem de execução por prioridade:")
+        for carro in ordem:
+            print(
+                f"  Carro {carro.carro_idx} do semáforo {carro.semaforo_id} "
+                f"(Prob: {carro.prob*100:.1f}%, Pri: {carro.prioridade})"
+            )
+
+
+def _registrar_espera(carro, espera, fcfs, verboso, eventos):
+    """
+    Publica a espera de um carro: com um fluxo de eventos, só enfileira
+    (a formatação e a E/S ficam fora da seção crítica); sem ele, imprime
+    se verboso.
+    """
+    if eventos is not None:
+        eventos.emitir('espera', carro.tempo_entrada, carro.semaforo_id, carro.carro_idx, espera,
+                       (carro.position, carro.prob, carro.prioridade, fcfs))
+    elif verboso:
+        _imprimir_espera(carro, espera, fcfs)
+
+
+def _imprimir_espera(carro, espera, fcfs):
+    """Imprime a espera de um carro ao entrar no cruzamento."""
+    if fcfs:
+        # Mostra posição e tempo de espera no algoritmo FCFS
+        print(
+            f"Carro {carro.carro_idx} do semáforo {carro.semaforo_id} "
+            f"- posição {carro.position}: esperou {espera:.3f}s"
+        )
+    else:
+        # Mostra probabilidade e prioridade no algoritmo de prioridades
+        print(
+            f"Carro {carro.carro_idx} do semáforo {carro.semaforo_id} "
+            f"(Prob: {carro.prob*100:.1f}%, Pri: {carro.prioridade}) "
+            f"esperou {espera:.3f}s"
+        )
+
+
+# -------------------------------------
+# Conflitos entre movimentos do cruzamento
+# -------------------------------------
+
+def matriz_conflitos(semaforos):
+    """
+    Matriz de conflitos padrão: os semáforos são as aproximações em volta do
+    cruzamento, na ordem dos ids (N, L, S, O, ...). Aproximações opostas
+    (posições de mesma paridade) atravessam juntas; perpendiculares se
+    cruzam. Cada movimento também conflita consigo mesmo (uma faixa).
+
+    Retorna:
+        dict: id do semáforo -> conjunto de ids com que ele conflita.
+    """
+    ids = sorted(s['id'] for s in semaforos)
+    return {a: {b for j, b in enumerate(ids) if i == j or (i - j) % 2}
+            for i, a in enumerate(ids)}
+
+
+def recursos_por_movimento(conflitos):
+    """
+    Converte a matriz em recursos: cada par em conflito, inclusive (a, a),
+    vira um ponto de conflito que os dois movimentos precisam adquirir.
+    A lista de cada movimento sai em ordem global crescente, então adquirir
+    nessa ordem nunca gera deadlock. A matriz é tratada como simétrica.
+    """
+    recursos = {m: set() for m in conflitos}
+    for a, outros in conflitos.items():
+        for b in outros:
+            chave = (min(a, b), max(a, b))
+            recursos[a].add(chave)
+            recursos.setdefault(b, set()).add(chave)
+    return {m: sorted(r) for m, r in recursos.items()}
+
+
+class AlocadorConflitos:
+    """
+    Alocação tudo-ou-nada dos pontos de conflito sob um monitor (Condition),
+    com a mesma regra de simular_pool: uma fila FIFO por movimento e, a cada
+    chegada ou saída, as cabeças são percorridas na ordem do algoritmo
+    (`chave`) e cada uma cujos recursos estão todos livres os ocupa de uma
+    vez. Quem espera não segura nenhum recurso, então não bloqueia
+    movimentos compatíveis, e não há deadlock. Usado no lugar do
+    Semaphore(1) do motor 'threads' quando há matriz de conflitos.
+    """
+
+    def __init__(self, recursos, monitor=None):
+        self._recursos = recursos
+        self._filas = {m: deque() for m in recursos}   # (chave, vaga) por movimento
+        self._ocupados = set()
+        self._monitor = monitor or threading.Condition()
+
+    def vaga(self, movimento, chave):
+        """Pedido de um carro, usado como `with` no lugar do Semaphore(1)."""
+        return _Vaga(self, movimento, chave)
+
+    def _entrar(self, vaga):
+        with self._monitor:
+            self._filas[vaga.movimento].append((vaga.chave, vaga))
+            self._despachar()
+
+    def _aguardar(self, vaga):
+        with self._monitor:
+            while not vaga.concedida:
+                self._monitor.wait()
+
+    def _sair(self, vaga):
+        with self._monitor:
+            self._ocupados.difference_update(self._recursos[vaga.movimento])
+            self._despachar()
+
+    def _despachar(self):
+        # Chamada com o monitor adquirido
+        cabecas = sorted((f[0][0], m) for m, f in self._filas.items() if f)
+        concedeu = False
+        for _, movimento in cabecas:
+            if self._ocupados.isdisjoint(self._recursos[movimento]):
+                self._ocupados.update(self._recursos[movimento])
+                self._filas[movimento].popleft()[1].concedida = True
+                concedeu = True
+        if concedeu:
+            self._monitor.notify_all()
+
+
+class _Vaga:
+    """Pedido de um carro ao AlocadorConflitos; entra na fila ao reservar."""
+
+    def __init__(self, alocador, movimento, chave):
+        self.alocador = alocador
+        self.movimento = movimento
+        self.chave = chave
+        self.reservada = False
+        self.concedida = False
+
+    def reservar(self):
+        """Entra na fila do movimento (no `with`, se ainda não entrou)."""
+        if not self.reservada:
+            self.reservada = True
+            self.alocador._entrar(self)
+
+    def __enter__(self):
+        self.reservar()
+        self.alocador._aguardar(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.alocador._sair(self)
+
+
 # -------------------------------------
 # Função principal de simulação genérica
 # -------------------------------------
 
-def simular(algoritmo, semaforos, cars_data):
+def simular(algoritmo, semaforos, cars_data, motor='threads', verboso=True, log=None,
+            escala_tempo=1.0, eventos=None, conflitos=None, metricas=None, estatisticas=None):
     """
     Executa a simulação de controle de tráfego para o algoritmo especificado:
     - FCFS: usa delays para chegar e executa todos os carros em paralelo.
@@ -99,45 +263,97 @@ def simular(algoritmo, semaforos, cars_data):
         algoritmo (str): 'fcfs' ou 'prioridade'
         semaforos (list): lista de dicts com keys 'id','prob','cars','priority'
         cars_data (list): lista de dicts com keys 'semaforo_id','carro_idx','delay'
+        motor (str): 'threads' (uma thread por carro, tempo real),
+                     'pool' (threads fixas, ver simular_pool) ou
+                     'eventos' (relógio simulado, ver simular_eventos)
+        verboso (bool): imprime ordem e espera de cada carro
+        log (list): se informado, recebe as tuplas (carro, espera); sem
+                    ele nenhuma tupla é guardada
+        escala_tempo (float): fator aplicado às esperas reais nos motores
+                              'threads' e 'pool' (ex.: 0.01 roda 100x mais
+                              rápido); as esperas são reportadas em segundos
+                              simulados
+        eventos (RegistroEventos): se informado, a espera de cada carro vira
+                                   um evento 'espera' em vez de um print
+        conflitos (dict): matriz id -> ids em conflito (ver matriz_conflitos);
+                          None mantém um único Semaphore(1) para todos.
+                          Os dois algoritmos aproveitam a capacidade
+                          liberada em todos os motores; no 'threads' a
+                          alocação é a do AlocadorConflitos e a Prioridade
+                          deixa de ser sequencial
+        metricas (Instrumentacao): se informado, nos motores 'threads' e
+                                   'pool' as travas do cruzamento são
+                                   instrumentadas e esperas e travessias
+                                   entram em histogramas
+        estatisticas (Estatisticas): se informado, recebe média, variância,
+                                     quantis e vazão das esperas, com
+                                     memória constante (ver estatisticas.py)
 
     Retorna:
         float: tempo médio de espera de todos os carros.
     """
-    print(f"\n--- Simulando {algoritmo.upper()} ---\n")
+    if motor == 'eventos':
+        return simular_eventos(algoritmo, semaforos, cars_data, verboso, log, eventos,
+                               conflitos, estatisticas)
+    if motor == 'pool':
+        return simular_pool(algoritmo, semaforos, cars_data, verboso, log,
+                            escala_tempo=escala_tempo, eventos=eventos, conflitos=conflitos,
+                            metricas=metricas, estatisticas=estatisticas)
+    if motor != 'threads':
+        raise ValueError(f"Motor desconhecido: {motor!r}")
+
+    if verboso:
+        print(f"\n--- Simulando {algoritmo.upper()} ---\n")
     # Marca início da simulação para calcular tempos relativos
     sim_start = time.time()
 
-    log = []                   # para registrar cada espera
-    lock = threading.Semaphore(1)  # semáforo geral
+    # Esperas em estatísticas de memória constante; tuplas só se pedidas em `log`
+    coletor = Estatisticas(bruto=log)
+    # semáforo geral
+    lock = metricas.semaforo('cruzamento') if metricas else threading.Semaphore(1)
     threads = []               # lista de threads Carro
+    # Com matriz de conflitos: os pontos de conflito de cada movimento são
+    # alocados de uma vez, sob um monitor, na ordem do algoritmo
+    if conflitos is not None:
+        alocador = AlocadorConflitos(
+            recursos_por_movimento(conflitos),
+            metricas.condicao('monitor_cruzamento') if metricas else None)
+    # Índice id -> semáforo, evita varrer a lista a cada carro
+    por_id = {s['id']: s for s in semaforos}
 
     # 1) Criação das threads de Carro
     for data in cars_data:
         # Busca configurações do semáforo do carro
-        sem = next(s for s in semaforos if s['id'] == data['semaforo_id'])
+        sem = por_id[data['semaforo_id']]
         # FCFS: aplica delay simulado; Prioridade: chega imediatamente
-        tempo_chegada = (sim_start + data['delay']
+        tempo_chegada = (sim_start + data['delay'] * escala_tempo
                          if algoritmo.lower() == 'fcfs'
                          else time.time())
         carro = Carro(
             semaforo_id=sem['id'],
             carro_idx=data['carro_idx'],
             tempo_chegada=tempo_chegada,
-            semaforo=lock,
-            log=log,
+            semaforo=lock,   # com conflitos, trocado pela vaga no alocador abaixo
+            log=coletor,
             prioridade=sem['priority'],
             prob=sem['prob']
         )
+        carro.verboso = verboso
+        carro.escala = escala_tempo
+        carro.eventos = eventos
+        carro.metricas = metricas
         threads.append(carro)
 
     # 2) Determinação da ordem de saída e configuração de flags de impressão
     if algoritmo.lower() == 'fcfs':
         ordem = escalonador_fcfs(threads)
-        print("Ordem de chegada dos carros:")
         for pos, carro in enumerate(ordem, start=1):
             carro.position = pos        # posição na fila FCFS
             carro.show_prioridade = False
-            print(f"  Posição {pos}: Carro {carro.carro_idx} do semáforo {carro.semaforo_id}")
+            if conflitos is not None:
+                carro.semaforo = alocador.vaga(carro.semaforo_id, (carro.tempo_chegada, pos))
+        if verboso:
+            _imprimir_ordem(ordem, fcfs=True)
         # 3a) Execução em paralelo
         for carro in threads:
             carro.start()
@@ -146,37 +362,363 @@ def simular(algoritmo, semaforos, cars_data):
 
     else:
         ordem = escalonador_prioridade(threads)
-        print("Ordem de execução por prioridade:")
         for carro in ordem:
             carro.show_prioridade = True
-            print(
-                f"  Carro {carro.carro_idx} do semáforo {carro.semaforo_id} "
-                f"(Prob: {carro.prob*100:.1f}%, Pri: {carro.prioridade})"
-            )
-        # 3b) Execução sequencial conforme prioridade
-        for carro in ordem:
-            carro.start()
-            carro.join()
+        if verboso:
+            _imprimir_ordem(ordem, fcfs=False)
+        if conflitos is None:
+            # 3b) Execução sequencial conforme prioridade
+            for carro in ordem:
+                carro.start()
+                carro.join()
+        else:
+            # 3c) Com conflitos: todos entram na fila antes de qualquer thread
+            #     começar, então o alocador atende pela prioridade e
+            #     movimentos compatíveis atravessam juntos
+            for seq, carro in enumerate(ordem):
+                carro.semaforo = alocador.vaga(carro.semaforo_id, (carro.prioridade, seq))
+                carro.semaforo.reservar()
+            for carro in ordem:
+                carro.start()
+            for carro in ordem:
+                carro.join()
 
     # 4) Cálculo e exibição do tempo médio de espera
-    esperas = [esp for (_, esp) in log]
-    media = sum(esperas) / len(esperas) if esperas else 0
-    print(f"\nTempo médio de espera ({algoritmo.upper()}): {media:.2f}s")
+    media = coletor.media
+    if estatisticas is not None:
+        estatisticas.mesclar(coletor)
+    if verboso:
+        print(f"\nTempo médio de espera ({algoritmo.upper()}): {media:.2f}s")
     return media
 
 
-# ----------------------
-# Bloco principal (ENTRYPOINT)
-# ----------------------
-if __name__ == '__main__':
-    random.seed()
-    num_semaforos = 4
+# -------------------------------------
+# Motor de eventos discretos (relógio virtual)
+# -------------------------------------
+
+class RegistroCarro:
+    """
+    Registro leve de um carro no motor de eventos (sem thread associada).
+    Expõe os mesmos campos de Carro usados nos logs e escalonadores.
+    """
+    __slots__ = ('semaforo_id', 'carro_idx', 'tempo_chegada', 'prioridade',
+                 'prob', 'position', 'tempo_entrada', 'tempo_saida', 'travessia')
+
+    def __init__(self, semaforo_id, carro_idx, tempo_chegada, prioridade, prob,
+                 position=None, tempo_entrada=None, tempo_saida=None, travessia=None):
+        self.semaforo_id = semaforo_id
+        self.carro_idx = carro_idx
+        self.tempo_chegada = tempo_chegada
+        self.prioridade = prioridade
+        self.prob = prob
+        self.position = position
+        self.tempo_entrada = tempo_entrada
+        self.tempo_saida = tempo_saida
+        self.travessia = travessia
+
+
+def _registro(carro, posicao, tempo_entrada=None, tempo_saida=None):
+    """Converte a tupla interna do motor de eventos em RegistroCarro."""
+    return RegistroCarro(carro[2], carro[3], carro[0], carro[4], carro[5],
+                         posicao.get(carro[1]), tempo_entrada, tempo_saida)
+
+
+def simular_eventos(algoritmo, semaforos, cars_data, verboso=True, log=None, eventos=None,
+                    conflitos=None, estatisticas=None):
+    """
+    Mesma simulação de `simular`, mas com relógio simulado no lugar das
+    threads e dos time.sleep. As chegadas formam um fluxo ordenado por tempo
+    e as saídas ficam num heap; a cada passo o relógio salta para o próximo
+    instante com eventos e trata todos eles (saídas antes de chegadas) antes
+    de ocupar o cruzamento. Na Prioridade todos chegam em 0.0, então o
+    primeiro a entrar é o de maior prioridade, como no caminho com threads,
+    e não o primeiro de cars_data. O cruzamento continua
+    sendo um recurso único, equivalente ao Semaphore(1), e a travessia é
+    sorteada com random.uniform(1, 2) na entrada, na mesma ordem do caminho
+    com threads.
+
+    Com `conflitos`, cada movimento ocupa só os seus pontos de conflito e a
+    cada evento as cabeças das filas de cada movimento entram, na ordem do
+    algoritmo, sempre que seus recursos estiverem livres (ver _laco_conflitos).
+
+    Os tempos são relativos ao início da simulação (instante 0.0).
+    Retorna o tempo médio de espera.
+    """
+    fcfs = algoritmo.lower() == 'fcfs'
+    if verboso:
+        print(f"\n--- Simulando {algoritmo.upper()} (eventos) ---\n")
+
+    # 1) Carros como tuplas (chegada, seq, semaforo_id, carro_idx, prioridade, prob);
+    #    na Prioridade todos chegam em 0.0, como no caminho com threads
+    por_id = {s['id']: s for s in semaforos}
+    carros = []
+    for seq, data in enumerate(cars_data):
+        sem = por_id[data['semaforo_id']]
+        carros.append((data['delay'] if fcfs else 0.0, seq, sem['id'],
+                       data['carro_idx'], sem['priority'], sem['prob']))
+    # Fluxo de chegadas em ordem de tempo (desempate pela ordem de cars_data)
+    chegadas = sorted(carros) if fcfs else carros
+
+    # 2) Ordem de saída prevista, igual à impressa pelo caminho com threads
+    posicao = {}
+    if fcfs:
+        for pos, carro in enumerate(chegadas, start=1):
+            posicao[carro[1]] = pos
+    if verboso:
+        ordem = chegadas if fcfs else sorted(carros, key=lambda c: c[4])
+        _imprimir_ordem([_registro(c, posicao) for c in ordem], fcfs)
+
+    if conflitos is not None:
+        soma = _laco_conflitos(chegadas, fcfs, recursos_por_movimento(conflitos),
+                               posicao, log, verboso, eventos, estatisticas)
+        media = soma / len(chegadas) if chegadas else 0
+        if verboso:
+            print(f"\nTempo médio de espera ({algoritmo.upper()}): {media:.2f}s")
+        return media
+
+    # 3) Laço de eventos: fila de prontos FIFO (FCFS) ou heap (prioridade, seq)
+    fila = deque() if fcfs else []
+    saidas = []            # heap com os instantes de fim de travessia
+    livres = 1             # capacidade do cruzamento (Semaphore(1))
+    soma = 0.0
+    total = len(chegadas)
+    i = 0
+    uniform = random.uniform
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    while i < total or saidas:
+        # Próximo instante: a saída mais cedo ou a próxima chegada; todos os
+        # eventos dele entram antes de alguém ocupar o cruzamento
+        agora = saidas[0] if saidas and (i == total or saidas[0] <= chegadas[i][0]) else chegadas[i][0]
+        while saidas and saidas[0] <= agora:
+            heappop(saidas)
+            livres += 1
+        while i < total and chegadas[i][0] <= agora:
+            carro = chegadas[i]
+            i += 1
+            if fcfs:
+                fila.append(carro)
+            else:
+                heappush(fila, (carro[4], carro[1], carro))
+
+        # Cruzamento livre: o próximo da fila entra e agenda sua saída
+        while livres and fila:
+            carro = fila.popleft() if fcfs else heappop(fila)[2]
+            espera = agora - carro[0]
+            soma += espera
+            livres -= 1
+            saida = agora + uniform(1, 2)
+            heappush(saidas, saida)
+
+            if estatisticas is not None:
+                estatisticas.registrar(espera, carro[2], agora)
+            # Registros só são montados quando alguém vai consumi-los
+            if log is not None or verboso or eventos is not None:
+                registro = _registro(carro, posicao, agora, saida)
+                if log is not None:
+                    log.append((registro, espera))
+                _registrar_espera(registro, espera, fcfs, verboso, eventos)
+
+    media = soma / total if total else 0
+    if verboso:
+        print(f"\nTempo médio de espera ({algoritmo.upper()}): {media:.2f}s")
+    return media
+
+
+def _laco_conflitos(chegadas, fcfs, recursos, posicao, log, verboso, eventos,
+                    estatisticas=None):
+    """
+    Laço de eventos com matriz de conflitos. Há uma fila FIFO por movimento
+    (dentro de um semáforo a ordem é a mesma nos dois algoritmos); a cada
+    evento, as cabeças são visitadas na ordem do algoritmo (FCFS: chegada;
+    Prioridade: prioridade) e cada uma entra se nenhum dos seus pontos de
+    conflito estiver ocupado. Retorna a soma das esperas.
+    """
+    filas = {m: deque() for m in recursos}
+    ocupados = set()       # pontos de conflito em uso
+    saidas = []            # heap de (fim da travessia, seq, movimento)
+    soma = 0.0
+    total = len(chegadas)
+    i = 0
+    uniform = random.uniform
+    heappush, heappop = heapq.heappush, heapq.heappop
+    chave = (lambda c: (c[0], c[1])) if fcfs else (lambda c: (c[4], c[1]))
+
+    while i < total or saidas:
+        # Como em simular_eventos: todos os eventos do instante, depois o preenchimento
+        agora = (saidas[0][0] if saidas and (i == total or saidas[0][0] <= chegadas[i][0])
+                 else chegadas[i][0])
+        while saidas and saidas[0][0] <= agora:
+            _, _, movimento = heappop(saidas)
+            ocupados.difference_update(recursos[movimento])
+        while i < total and chegadas[i][0] <= agora:
+            carro = chegadas[i]
+            i += 1
+            filas[carro[2]].append(carro)
+
+        # Preenche a capacidade liberada, na ordem do algoritmo
+        cabecas = sorted((chave(f[0]), m) for m, f in filas.items() if f)
+        for _, movimento in cabecas:
+            if not ocupados.isdisjoint(recursos[movimento]):
+                continue
+            carro = filas[movimento].popleft()
+            ocupados.update(recursos[movimento])
+            espera = agora - carro[0]
+            soma += espera
+            saida = agora + uniform(1, 2)
+            heappush(saidas, (saida, carro[1], movimento))
+
+            if estatisticas is not None:
+                estatisticas.registrar(espera, carro[2], agora)
+            if log is not None or verboso or eventos is not None:
+                registro = _registro(carro, posicao, agora, saida)
+                if log is not None:
+                    log.append((registro, espera))
+                _registrar_espera(registro, espera, fcfs, verboso, eventos)
+    return soma
+
+
+# -------------------------------------
+# Motor com pool fixo de threads
+# -------------------------------------
+
+def simular_pool(algoritmo, semaforos, cars_data, verboso=True, log=None,
+                 trabalhadores=TAMANHO_POOL, escala_tempo=1.0, eventos=None, conflitos=None,
+                 metricas=None, estatisticas=None):
+    """
+    Mesma simulação de `simular`, em tempo real, mas sem uma thread por carro:
+    cada carro é um RegistroCarro e um número fixo de threads trabalhadoras
+    atende as filas de prontos. A thread que chama despacha cada carro na
+    fila do seu movimento no instante de chegada.
+
+    A alocação do cruzamento é feita sob um monitor (Condition): a
+    trabalhadora escolhe, na ordem do algoritmo (FCFS: chegada; Prioridade:
+    prioridade e ordem), a primeira cabeça de fila cujos recursos estão
+    livres e os marca como ocupados de uma vez, o que evita deadlock. Sem
+    `conflitos` há um único recurso, equivalente ao Semaphore(1); com
+    `conflitos`, movimentos compatíveis atravessam juntos. O número de
+    threads não cresce com o número de carros.
+
+    Retorna o tempo médio de espera (em segundos simulados).
+    """
+    fcfs = algoritmo.lower() == 'fcfs'
+    if verboso:
+        print(f"\n--- Simulando {algoritmo.upper()} (pool de {trabalhadores} threads) ---\n")
+    coletor = Estatisticas(bruto=log)
+
+    # 1) Registros leves dos carros, com chegada relativa ao início
+    por_id = {s['id']: s for s in semaforos}
+    carros = []
+    for data in cars_data:
+        sem = por_id[data['semaforo_id']]
+        carros.append(RegistroCarro(sem['id'], data['carro_idx'],
+                                    data['delay'] if fcfs else 0.0,
+                                    sem['priority'], sem['prob']))
+    chegadas = escalonador_fcfs(carros)
+    if fcfs:
+        for pos, carro in enumerate(chegadas, start=1):
+            carro.position = pos
+    if verboso:
+        _imprimir_ordem(chegadas if fcfs else escalonador_prioridade(carros), fcfs)
+
+    # 2) Recursos por movimento: um único "cruzamento" ou os pontos de conflito
+    if conflitos is None:
+        recursos = {s['id']: ['cruzamento'] for s in semaforos}
+    else:
+        recursos = recursos_por_movimento(conflitos)
+    filas = {m: deque() for m in recursos}   # (chave de ordem, carro) por movimento
+    ocupados = set()
+    monitor = metricas.condicao('monitor_pool') if metricas else threading.Condition()
+    despacho_concluido = False
+    sim_start = time.time()
+
+    def escolher():
+        """Próximo carro que pode entrar (chamada com o monitor adquirido)."""
+        cabecas = sorted((f[0][0], m) for m, f in filas.items() if f)
+        for _, movimento in cabecas:
+            if ocupados.isdisjoint(recursos[movimento]):
+                ocupados.update(recursos[movimento])
+                return filas[movimento].popleft()[1]
+        return None
+
+    def trabalhadora():
+        while True:
+            with monitor:
+                carro = escolher()
+                while carro is None:
+                    if despacho_concluido and not any(filas.values()):
+                        return
+                    monitor.wait()
+                    carro = escolher()
+                entrada = time.time()
+                espera = (entrada - (sim_start + carro.tempo_chegada * escala_tempo)) / escala_tempo
+                carro.tempo_entrada = (entrada - sim_start) / escala_tempo
+                coletor.append((carro, espera))
+            _registrar_espera(carro, espera, fcfs, verboso, eventos)
+            time.sleep(random.uniform(1, 2) * escala_tempo)
+            with monitor:
+                carro.tempo_saida = (time.time() - sim_start) / escala_tempo
+                if metricas is not None:
+                    metricas.registrar('espera', espera)
+                    metricas.registrar('travessia', carro.tempo_saida - carro.tempo_entrada)
+                ocupados.difference_update(recursos[carro.semaforo_id])
+                monitor.notify_all()
+
+    # 3) Despacho: enfileira cada carro no seu instante de chegada
+    pool = [threading.Thread(target=trabalhadora, daemon=True) for _ in range(trabalhadores)]
+    iniciado = False
+    for seq, carro in enumerate(chegadas):
+        atraso = sim_start + carro.tempo_chegada * escala_tempo - time.time()
+        if atraso > 0:
+            if not iniciado:
+                # Quem já chegou está na fila: agora as trabalhadoras podem começar
+                for t in pool:
+                    t.start()
+                iniciado = True
+            time.sleep(atraso)
+        chave = (carro.tempo_chegada, seq) if fcfs else (carro.prioridade, seq)
+        with monitor:
+            filas[carro.semaforo_id].append((chave, carro))
+            monitor.notify()
+    with monitor:
+        despacho_concluido = True
+        monitor.notify_all()
+    if not iniciado:
+        for t in pool:
+            t.start()
+    for t in pool:
+        t.join()
+
+    media = coletor.media
+    if estatisticas is not None:
+        estatisticas.mesclar(coletor)
+    if verboso:
+        print(f"\nTempo médio de espera ({algoritmo.upper()}): {media:.2f}s")
+    return media
+
+
+# -------------------------------------
+# Geração de cenários
+# -------------------------------------
+
+def gerar_cenario(num_semaforos=4, max_carros=10, gerador=random):
+    """
+    Sorteia a configuração dos semáforos e a chegada dos carros.
+
+    Parâmetros:
+        num_semaforos (int): quantidade de semáforos
+        max_carros (int): máximo de carros por semáforo
+        gerador: fonte de aleatoriedade (módulo random ou random.Random(semente))
+
+    Retorna:
+        tuple: (semaforos, cars_data) no formato esperado por `simular`.
+    """
     semaforos = []
 
     # 1) Geração de probabilidades e número de carros por semáforo
     for s_id in range(num_semaforos):
-        prob = random.random()            # probabilidade simulada (0.0 a 1.0)
-        cnt = random.randint(0, 10)       # número de carros (0 a 10)
+        prob = gerador.random()               # probabilidade simulada (0.0 a 1.0)
+        cnt = gerador.randint(0, max_carros)  # número de carros (0 a max_carros)
         semaforos.append({'id': s_id, 'prob': prob, 'cars': cnt})
 
     # 2) Definição de prioridade baseada na probabilidade (maior prob = Pri 1)
@@ -184,34 +726,63 @@ if __name__ == '__main__':
     for rank, sem in enumerate(semaforos, start=1):
         sem['priority'] = rank
 
-    # 3) Impressão das configurações iniciais para o usuário
-    print("Configurações iniciais dos semáforos:")
-    for sem in semaforos:
-        print(
-            f"  Semáforo {sem['id']}: Prob={sem['prob']*100:.1f}%, "
-            f"Carros={sem['cars']}, Pri={sem['priority']}"
-        )
-
-    # 4) Geração de delays aleatórios para FCFS (usado por ambos para mesma base)
+    # 3) Geração de delays aleatórios para FCFS (usado por ambos para mesma base)
     cars_data = []
     for sem in semaforos:
         for i in range(sem['cars']):
             cars_data.append({
                 'semaforo_id': sem['id'],
                 'carro_idx': i,
-                'delay': random.uniform(0, 3)
+                'delay': gerador.uniform(0, 3)
             })
+    return semaforos, cars_data
 
-    # 5) Simulação sequencial de FCFS e Prioridade, reaproveitando dados
-    m_fcfs = simular('fcfs', semaforos, cars_data)
-    m_prio = simular('prioridade', semaforos, cars_data)
 
-    # 6) Plotagem comparativa dos resultados
-    plt.figure(figsize=(6, 4))
-    plt.bar(['FCFS', 'Prioridade'], [m_fcfs, m_prio])
-    plt.ylabel('Tempo médio de espera (s)')
-    plt.title('Comparação de Algoritmos')
+def plotar_medias(m_fcfs, m_prio, caminho='comparacao.png'):
+    """
+    Grava o gráfico de barras com a espera média de cada algoritmo (.png ou
+    .svg), sem abrir janela. O matplotlib só é importado aqui: quem usa o
+    módulo sem plotar não paga o custo.
+    """
+    from graficos import nova_figura, gravar
+
+    figura = nova_figura(figsize=(6, 4))
+    eixo = figura.subplots()
+    eixo.bar(['FCFS', 'Prioridade'], [m_fcfs, m_prio])
+    eixo.set_ylabel('Tempo médio de espera (s)')
+    eixo.set_title('Comparação de Algoritmos')
     for idx, val in enumerate([m_fcfs, m_prio]):
-        plt.text(idx, val + 0.1, f"{val:.2f}s", ha='center', fontweight='bold')
-    plt.tight_layout()
-    plt.show()
+        eixo.text(idx, val + 0.1, f"{val:.2f}s", ha='center', fontweight='bold')
+    return gravar(figura, caminho)
+
+
+# ----------------------
+# Bloco principal (ENTRYPOINT)
+# ----------------------
+if __name__ == '__main__':
+    random.seed()
+
+    # 1) Sorteio dos semáforos (prioridade pela probabilidade) e dos carros
+    semaforos, cars_data = gerar_cenario()
+
+    # 2) Impressão das configurações iniciais para o usuário
+    print("Configurações iniciais dos semáforos:")
+    for sem in semaforos:
+        print(
+            f"  Semáforo {sem['id']}: Prob={sem['prob']*100:.1f}%, "
+            f"Carros={sem['cars']}, Pri={sem['priority']}"
+        )
+
+    # 3) Simulação sequencial de FCFS e Prioridade, reaproveitando dados
+    log_fcfs, log_prio = [], []
+    m_fcfs = simular('fcfs', semaforos, cars_data, log=log_fcfs)
+    m_prio = simular('prioridade', semaforos, cars_data, log=log_prio)
+
+    # 4) Gráficos gravados em arquivo: médias e distribuição das esperas
+    import graficos
+    esperas = {'FCFS': graficos.Distribuicao(), 'Prioridade': graficos.Distribuicao()}
+    esperas['FCFS'].adicionar_log(log_fcfs)
+    esperas['Prioridade'].adicionar_log(log_prio)
+    print("\nGráficos gravados:")
+    for caminho in [plotar_medias(m_fcfs, m_prio)] + graficos.relatorio(esperas):
+        print(f"  {caminho}")
@@ -0,0 +1,333 @@
+"""
+Estatísticas em fluxo, com memória constante e mescláveis.
+
+Para simulações longas ou grandes, no lugar de guardar cada espera ou cada
+instante de liberação:
+
+- Momentos: contagem, média e variância online (Welford), mínimo e máximo;
+- Histograma: esboço de quantis com baldes log-lineares no estilo HDR
+  (erro relativo de ~1,6%), para p50/p95/p99;
+- VazaoJanela: vazão recente (eventos/s) numa janela deslizante, num anel
+  de baldes de tamanho fixo;
+- Estatisticas: junta os três, no total e por semáforo.
+
+Todos têm mesclar(), então resultados de execuções paralelas (ex.: os
+processos de replicacoes.py) se combinam sem as amostras brutas.
+"""
+import math
+import threading
+
+# Bits de mantissa por balde: erro relativo máximo de 2^-(BITS_BALDE-1)
+BITS_BALDE = 7
+# Resolução dos valores registrados (segundos por unidade inteira)
+UNIDADE = 1e-6
+QUANTIS = (0.5, 0.9, 0.99, 0.999)
+JANELA_VAZAO = 60.0      # segundos considerados na vazão recente
+RESOLUCAO_VAZAO = 1.0    # largura (s) de cada balde da janela
+
+
+class Momentos:
+    """Contagem, média, variância, mínimo e máximo em uma passada."""
+    __slots__ = ('contagem', 'media', '_m2', 'minimo', 'maximo')
+
+    def __init__(self):
+        self.contagem = 0
+        self.media = 0.0
+        self._m2 = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+
+    def adicionar(self, valor):
+        self.contagem += 1
+        delta = valor - self.media
+        self.media += delta / self.contagem
+        self._m2 += delta * (valor - self.media)
+        if valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def mesclar(self, outro):
+        """Combina com outro Momentos (fórmula de Chan et al.)."""
+        if not outro.contagem:
+            return
+        total = self.contagem + outro.contagem
+        delta = outro.media - self.media
+        self._m2 += outro._m2 + delta * delta * self.contagem * outro.contagem / total
+        self.media += delta * outro.contagem / total
+        self.contagem = total
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+
+    @property
+    def variancia(self):
+        """Variância amostral (0.0 com menos de duas amostras)."""
+        return self._m2 / (self.contagem - 1) if self.contagem > 1 else 0.0
+
+    @property
+    def desvio(self):
+        return math.sqrt(self.variancia)
+
+    def __getstate__(self):
+        return (self.contagem, self.media, self._m2, self.minimo, self.maximo)
+
+    def __setstate__(self, estado):
+        self.contagem, self.media, self._m2, self.minimo, self.maximo = estado
+
+
+class Histograma:
+    """Histograma log-linear de durações em segundos."""
+
+    def __init__(self):
+        self._baldes = {}
+        self._trava = threading.Lock()
+        self.contagem = 0
+        self.soma = 0.0
+        self.minimo = None
+        self.maximo = None
+
+    @staticmethod
+    def _indice(unidades):
+        # Até 2^BITS_BALDE cada valor tem o próprio balde; acima disso,
+        # guarda só os BITS_BALDE bits mais significativos
+        expoente = max(unidades.bit_length() - BITS_BALDE, 0)
+        return (expoente << BITS_BALDE) | (unidades >> expoente)
+
+    @staticmethod
+    def _limites(indice):
+        """Menor e maior valor (em unidades) que caem no balde."""
+        expoente, mantissa = indice >> BITS_BALDE, indice & ((1 << BITS_BALDE) - 1)
+        return mantissa << expoente, ((mantissa + 1) << expoente) - 1
+
+    def registrar(self, segundos):
+        with self._trava:
+            self._adicionar(segundos)
+
+    def _adicionar(self, segundos):
+        # Sem trava: para quem já serializa os registros (Estatisticas)
+        i = self._indice(max(int(segundos / UNIDADE), 0))
+        self._baldes[i] = self._baldes.get(i, 0) + 1
+        self.contagem += 1
+        self.soma += segundos
+        if self.minimo is None or segundos < self.minimo:
+            self.minimo = segundos
+        if self.maximo is None or segundos > self.maximo:
+            self.maximo = segundos
+
+    def mesclar(self, outro):
+        """Acumula as amostras de outro histograma neste."""
+        with self._trava:
+            for i, n in outro._baldes.items():
+                self._baldes[i] = self._baldes.get(i, 0) + n
+            self.contagem += outro.contagem
+            self.soma += outro.soma
+            if outro.minimo is not None and (self.minimo is None or outro.minimo < self.minimo):
+                self.minimo = outro.minimo
+            if outro.maximo is not None and (self.maximo is None or outro.maximo > self.maximo):
+                self.maximo = outro.maximo
+
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        del estado['_trava']
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._trava = threading.Lock()
+
+    def quantil(self, q):
+        """Valor (s) abaixo do qual está a fração q das amostras."""
+        if not self.contagem:
+            return 0.0
+        alvo = q * self.contagem
+        acumulado = 0
+        for i in sorted(self._baldes):
+            acumulado += self._baldes[i]
+            if acumulado >= alvo:
+                baixo, alto = self._limites(i)
+                return min((baixo + alto) / 2 * UNIDADE, self.maximo)
+        return self.maximo
+
+    def baldes(self):
+        """Pares (limite superior em s, contagem) dos baldes não vazios, em ordem."""
+        return [((self._limites(i)[1] + 1) * UNIDADE, self._baldes[i]) for i in sorted(self._baldes)]
+
+    def resumo(self):
+        r = {
+            'contagem': self.contagem,
+            'soma': self.soma,
+            'min': self.minimo or 0.0,
+            'max': self.maximo or 0.0,
+            'media': self.soma / self.contagem if self.contagem else 0.0,
+        }
+        for q in QUANTIS:
+            r[f"p{q * 100:g}"] = self.quantil(q)
+        r['baldes'] = self.baldes()
+        return r
+
+
+class VazaoJanela:
+    """
+    Eventos por segundo nos últimos `janela` segundos. Um anel de baldes de
+    `resolucao` segundos guarda a contagem de cada intervalo; baldes de
+    voltas anteriores do anel são zerados ao serem reaproveitados.
+    """
+
+    def __init__(self, janela=JANELA_VAZAO, resolucao=RESOLUCAO_VAZAO):
+        self.janela = janela
+        self.resolucao = resolucao
+        self._tamanho = max(1, math.ceil(janela / resolucao))
+        # O anel só é alocado no primeiro registro
+        self._contagens = None
+        self._intervalos = None     # nº do intervalo guardado em cada balde
+        self.total = 0
+
+    def registrar(self, instante, quantidade=1):
+        if self._contagens is None:
+            self._contagens = [0] * self._tamanho
+            self._intervalos = [None] * self._tamanho
+        intervalo = math.floor(instante / self.resolucao)
+        i = intervalo % self._tamanho
+        if self._intervalos[i] != intervalo:
+            if self._intervalos[i] is not None and self._intervalos[i] > intervalo:
+                self.total += quantidade   # mais antigo que a janela: só entra no total
+                return
+            self._intervalos[i] = intervalo
+            self._contagens[i] = 0
+        self._contagens[i] += quantidade
+        self.total += quantidade
+
+    def intervalo(self, agora, desde=None):
+        """
+        Segundos cobertos por taxa(agora, desde): a janela inteira ou, se a
+        contagem começou em `desde` há menos tempo que isso, só o decorrido.
+        """
+        janela = self._tamanho * self.resolucao
+        return janela if desde is None else min(janela, agora - desde)
+
+    def taxa(self, agora, desde=None):
+        """
+        Eventos/s entre agora - janela e agora. Com `desde` (início da
+        contagem), uma execução mais curta que a janela é dividida pelo
+        tempo de fato decorrido, e não pela janela toda.
+        """
+        intervalo = self.intervalo(agora, desde)
+        if self._contagens is None or intervalo <= 0:
+            return 0.0
+        atual = math.floor(agora / self.resolucao)
+        soma = sum(c for c, k in zip(self._contagens, self._intervalos)
+                   if k is not None and atual - self._tamanho < k <= atual)
+        return soma / intervalo
+
+    def mesclar(self, outro):
+        """Soma as contagens de outra janela de mesma resolução."""
+        if outro._contagens is None:
+            self.total += outro.total
+            return
+        for c, k in zip(outro._contagens, outro._intervalos):
+            if k is not None:
+                self.registrar(k * outro.resolucao, c)
+                self.total -= c
+        self.total += outro.total
+
+
+class Estatisticas:
+    """
+    Momentos, quantis e vazão de uma grandeza (ex.: espera no cruzamento),
+    no total e por chave (ex.: semáforo). Segura para várias threads.
+
+    Aceita append((carro, valor)), como as listas `log` de escalonamento:
+    registra valor com chave carro.semaforo_id e instante carro.tempo_entrada,
+    sem guardar o carro. As tuplas só são mantidas se `bruto` for uma lista.
+    Com agrupar=False as chaves são ignoradas e só o total é mantido.
+    """
+
+    def __init__(self, janela=JANELA_VAZAO, bruto=None, agrupar=True):
+        self.janela = janela
+        self.bruto = bruto
+        self.agrupar = agrupar
+        self.momentos = Momentos()
+        self.quantis = Histograma()
+        self.por_chave = {}    # chave -> (Momentos, Histograma, VazaoJanela)
+        self._trava = threading.Lock()
+
+    def _da_chave(self, chave):
+        grupo = self.por_chave.get(chave)
+        if grupo is None:
+            grupo = self.por_chave[chave] = (Momentos(), Histograma(), VazaoJanela(self.janela))
+        return grupo
+
+    def registrar(self, valor, chave=None, instante=None):
+        with self._trava:
+            self.momentos.adicionar(valor)
+            self.quantis._adicionar(valor)
+            if chave is not None and self.agrupar:
+                momentos, quantis, vazao = self._da_chave(chave)
+                momentos.adicionar(valor)
+                quantis._adicionar(valor)
+                if instante is not None:
+                    vazao.registrar(instante)
+
+    def append(self, item):
+        carro, valor = item
+        self.registrar(valor, carro.semaforo_id, carro.tempo_entrada)
+        if self.bruto is not None:
+            self.bruto.append(item)
+
+    @property
+    def contagem(self):
+        return self.momentos.contagem
+
+    @property
+    def media(self):
+        return self.momentos.media
+
+    def quantil(self, q):
+        return self.quantis.quantil(q)
+
+    def mesclar(self, outro):
+        with self._trava:
+            self.momentos.mesclar(outro.momentos)
+            self.quantis.mesclar(outro.quantis)
+            for chave, (m, q, v) in outro.por_chave.items():
+                momentos, quantis, vazao = self._da_chave(chave)
+                momentos.mesclar(m)
+                quantis.mesclar(q)
+                vazao.mesclar(v)
+
+    def resumo(self, agora=None, desde=None):
+        """
+        dict com contagem, média, desvio, mín., máx. e p50/p95/p99 no total e
+        por chave; com `agora`, também a vazão recente de cada chave. Com
+        `desde` (início da execução), uma execução mais curta que a janela
+        tem a vazão dividida pelo tempo decorrido (ver VazaoJanela.taxa).
+        """
+        def linha(momentos, quantis):
+            return {
+                'contagem': momentos.contagem,
+                'media': momentos.media,
+                'desvio': momentos.desvio,
+                'min': momentos.minimo if momentos.contagem else 0.0,
+                'max': momentos.maximo if momentos.contagem else 0.0,
+                'p50': quantis.quantil(0.5),
+                'p95': quantis.quantil(0.95),
+                'p99': quantis.quantil(0.99),
+            }
+
+        por_chave = {}
+        for chave, (m, q, v) in self.por_chave.items():
+            por_chave[chave] = linha(m, q)
+            if agora is not None:
+                por_chave[chave]['vazao'] = v.taxa(agora, desde)
+        return {'total': linha(self.momentos, self.quantis), 'por_chave': por_chave}
+
+    def __getstate__(self):
+        # O bruto e a trava ficam no processo de origem
+        estado = self.__dict__.copy()
+        del estado['_trava']
+        estado['bruto'] = None
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._trava = threading.Lock()
@@ -0,0 +1,405 @@
+"""
+Relatório gráfico sem tela: distribuição das esperas e linha do tempo das
+liberações, gravadas em PNG ou SVG (requer `numpy` e `matplotlib`).
+
+Nenhuma amostra vira um artista próprio. As esperas são contadas com NumPy
+nos mesmos baldes log-lineares de estatisticas.Histograma (erro relativo
+de ~1,6%), no total e por semáforo, e cada curva é desenhada a partir das
+contagens: a memória fica limitada ao número de baldes e milhões de carros
+agregam em segundos, em fatias (logs de `simular`, colunas de um
+rastro.Rastro, arrays de analitico.py ou um Estatisticas já coletado).
+As liberações (`tempos_liberacao` de com_controle, sem_controle e
+com_asyncio com GUARDAR_TEMPOS) são contadas em intervalos de tempo fixos.
+
+As figuras são matplotlib.figure.Figure criadas direto, sem pyplot: o
+backend (Agg para PNG, o de SVG para SVG) sai da extensão do arquivo, sem
+display e sem estado global.
+
+Uso:
+    python graficos.py simular [--semaforos 8] [--carros 500] [--semente 0]
+    python graficos.py analitico 10000000 [--semaforos 8]
+    python graficos.py rastro CAMINHO            # depois de `rastro.py repetir`
+    python graficos.py controle [--duracao 60] [--virtual]
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+from estatisticas import BITS_BALDE, UNIDADE
+
+BLOCO = 1 << 20      # carros por fatia ao converter logs
+NUM_BARRAS = 100     # barras dos histogramas
+MAX_SERIES = 8       # acima disso, resumo (percentis ou mapa) no lugar de uma curva por semáforo
+RESOLUCAO = 1.0      # segundos por intervalo na linha do tempo das liberações
+FORMATOS = ('png', 'svg')
+
+
+def indices(esperas):
+    """Balde log-linear de cada espera (s), como Histograma._indice, vetorizado."""
+    unidades = np.maximum(np.asarray(esperas, dtype=np.float64) / UNIDADE, 0).astype(np.int64)
+    # frexp devolve o expoente e com u = m * 2^e, m em [0.5, 1): o bit_length de u
+    _, bits = np.frexp(unidades.astype(np.float64))
+    expoente = np.maximum(bits.astype(np.int64) - BITS_BALDE, 0)
+    return (expoente << BITS_BALDE) | (unidades >> expoente)
+
+
+def limites(indices):
+    """Menor valor e limite superior (s) dos baldes, como Histograma._limites."""
+    indices = np.asarray(indices, dtype=np.int64)
+    expoente, mantissa = indices >> BITS_BALDE, indices & ((1 << BITS_BALDE) - 1)
+    return (mantissa << expoente) * UNIDADE, ((mantissa + 1) << expoente) * UNIDADE
+
+
+def _somar(contagens, outras):
+    """Soma dois vetores de contagens de tamanhos possivelmente diferentes."""
+    if len(outras) > len(contagens):
+        contagens, outras = outras, contagens
+    contagens = contagens.copy()
+    contagens[:len(outras)] += outras
+    return contagens
+
+
+class Distribuicao:
+    """
+    Contagens de esperas por balde, no total e por chave (semáforo). Cada
+    vetor de contagens é denso até o maior balde visto (poucos milhares de
+    posições para esperas de anos), então o tamanho não depende do número
+    de carros.
+    """
+
+    def __init__(self):
+        self.total = np.zeros(0, dtype=np.int64)
+        self.por_chave = {}
+
+    def adicionar(self, esperas, chaves=None):
+        """Acumula um array de esperas (s) e, opcionalmente, a chave de cada uma."""
+        i = indices(esperas)
+        if not len(i):
+            return
+        baldes = int(i.max()) + 1
+        self.total = _somar(self.total, np.bincount(i, minlength=baldes))
+        if chaves is None:
+            return
+        # Uma contagem só para todas as chaves da fatia: linha = chave, coluna = balde
+        valores, linha = np.unique(np.asarray(chaves), return_inverse=True)
+        matriz = np.bincount(linha.ravel() * baldes + i,
+                             minlength=len(valores) * baldes).reshape(len(valores), baldes)
+        for chave, contagens in zip(valores.tolist(), matriz):
+            anterior = self.por_chave.get(chave)
+            self.por_chave[chave] = contagens if anterior is None else _somar(anterior, contagens)
+
+    def adicionar_log(self, log, bloco=BLOCO):
+        """Acumula um log de `simular` (pares (carro, espera)), em fatias de `bloco`."""
+        for inicio in range(0, len(log), bloco):
+            fatia = log[inicio:inicio + bloco]
+            self.adicionar(np.fromiter((espera for _, espera in fatia), np.float64, len(fatia)),
+                           np.fromiter((c.semaforo_id for c, _ in fatia), np.int64, len(fatia)))
+
+    def adicionar_rastro(self, rastro):
+        """Acumula as esperas (entrada - chegada) gravadas num rastro.Rastro."""
+        for _, b in rastro.blocos(('semaforo_id', 'delay', 'entrada')):
+            esperas = np.asarray(b['entrada']) - np.asarray(b['delay'])
+            if np.isnan(esperas).any():
+                raise ValueError("rastro sem resultados gravados (rode rastro.py repetir)")
+            self.adicionar(esperas, np.asarray(b['semaforo_id']))
+
+    @classmethod
+    def de_estatisticas(cls, estatisticas):
+        """Distribuição a partir de um estatisticas.Estatisticas (mesmos baldes)."""
+        def vetor(histograma):
+            contagens = np.zeros(max(histograma._baldes, default=-1) + 1, dtype=np.int64)
+            for i, n in histograma._baldes.items():
+                contagens[i] = n
+            return contagens
+
+        d = cls()
+        d.total = vetor(estatisticas.quantis)
+        d.por_chave = {chave: vetor(q) for chave, (_, q, _) in estatisticas.por_chave.items()}
+        return d
+
+    def mesclar(self, outra):
+        self.total = _somar(self.total, outra.total)
+        for chave, contagens in outra.por_chave.items():
+            anterior = self.por_chave.get(chave)
+            self.por_chave[chave] = contagens if anterior is None else _somar(anterior, contagens)
+
+    @property
+    def contagem(self):
+        return int(self.total.sum())
+
+
+def cdf(contagens):
+    """(x, F(x)) nos limites superiores dos baldes não vazios."""
+    ocupados = np.flatnonzero(contagens)
+    if not len(ocupados):
+        return np.zeros(0), np.zeros(0)
+    acumulado = np.cumsum(contagens[ocupados])
+    return limites(ocupados)[1], acumulado / acumulado[-1]
+
+
+def _acumulada(contagens):
+    """
+    Contagem acumulada em 0 e no limite superior de cada balde possível até
+    o último com contagem. Acima de 2^BITS_BALDE a mantissa fica na metade
+    de cima, então os índices com mantissa menor nunca ocorrem e são pulados.
+    """
+    i = np.arange(len(contagens))
+    mantissa = i & ((1 << BITS_BALDE) - 1)
+    validos = i[((i >> BITS_BALDE) == 0) | (mantissa >= 1 << (BITS_BALDE - 1))]
+    return (np.concatenate(([0.0], limites(validos)[1])),
+            np.concatenate(([0], np.cumsum(contagens[validos]))))
+
+
+def quantil(contagens, q):
+    """Centro do balde com a fração q das esperas, como Histograma.quantil."""
+    ocupados = np.flatnonzero(contagens)
+    if not len(ocupados):
+        return 0.0
+    acumulado = np.cumsum(contagens[ocupados])
+    i = ocupados[min(np.searchsorted(acumulado, q * acumulado[-1]), len(ocupados) - 1)]
+    baixo, alto = limites(i)
+    return float((baixo + alto - UNIDADE) / 2)
+
+
+def histograma(contagens, bordas):
+    """
+    Fração das esperas em cada barra de `bordas`. Cada balde é repartido
+    entre as barras que cobre, supondo as esperas uniformes dentro dele:
+    a contagem acumulada é interpolada nas bordas das barras.
+    """
+    x, acumulado = _acumulada(contagens)
+    return np.diff(np.interp(bordas, x, acumulado)) / max(acumulado[-1], 1)
+
+
+def linha_do_tempo(tempos_liberacao, resolucao=RESOLUCAO):
+    """
+    Liberações por intervalo de `resolucao` segundos, a partir da primeira.
+
+    Retorna:
+        tuple: (bordas dos intervalos, chaves, matriz chave x intervalo)
+    """
+    chaves = sorted(tempos_liberacao)
+    tempos = [np.asarray(tempos_liberacao[k], dtype=np.float64) for k in chaves]
+    ocupados = [t for t in tempos if len(t)]
+    if not ocupados:
+        return np.zeros(1), chaves, np.zeros((len(chaves), 0), dtype=np.int64)
+    inicio = min(float(t.min()) for t in ocupados)
+    intervalos = int((max(float(t.max()) for t in ocupados) - inicio) // resolucao) + 1
+    matriz = np.zeros((len(chaves), intervalos), dtype=np.int64)
+    for linha, t in zip(matriz, tempos):
+        if len(t):
+            linha += np.bincount(((t - inicio) // resolucao).astype(np.int64), minlength=intervalos)
+    return np.arange(intervalos + 1) * resolucao, chaves, matriz
+
+
+def nova_figura(*args, **kwargs):
+    """Figure sem pyplot, com layout automático (argumentos de Figure)."""
+    # Import só aqui: quem usa o módulo para agregar não paga o matplotlib
+    from matplotlib.figure import Figure
+    return Figure(*args, layout='constrained', **kwargs)
+
+
+def gravar(figura, caminho):
+    """Grava a figura; o formato (e o backend) sai da extensão de `caminho`."""
+    figura.savefig(caminho, dpi=120)
+    return caminho
+
+
+def plotar_esperas(distribuicoes, caminho):
+    """
+    Histograma e CDF da espera de cada escalonador.
+
+    Parâmetros:
+        distribuicoes (dict): nome do escalonador -> Distribuicao
+        caminho (str): arquivo .png ou .svg
+    """
+    figura = nova_figura(figsize=(11, 4))
+    barras, curvas = figura.subplots(1, 2)
+    maximo = max((quantil(d.total, 1.0) for d in distribuicoes.values()), default=0.0) or 1.0
+    bordas = np.linspace(0.0, maximo, NUM_BARRAS + 1)
+    for nome, d in distribuicoes.items():
+        barras.stairs(histograma(d.total, bordas), bordas, label=nome)
+        x, f = cdf(d.total)
+        curvas.step(x, f, where='post',
+                    label=f"{nome}: p50 {quantil(d.total, 0.5):.1f}s, p99 {quantil(d.total, 0.99):.1f}s")
+    barras.set(xlabel='Espera (s)', ylabel='Fração dos carros', title='Distribuição das esperas')
+    curvas.set(xlabel='Espera (s)', ylabel='Fração acumulada', ylim=(0, 1.01), title='CDF das esperas')
+    barras.legend()
+    curvas.legend(loc='lower right')
+    curvas.grid(alpha=0.3)
+    return gravar(figura, caminho)
+
+
+def plotar_por_semaforo(distribuicao, caminho, titulo=''):
+    """
+    Espera por semáforo: uma CDF por semáforo até MAX_SERIES semáforos;
+    acima disso, p50/p90/p99 de cada um (uma curva por percentil).
+    """
+    figura = nova_figura(figsize=(7, 4.5))
+    eixo = figura.subplots()
+    chaves = sorted(distribuicao.por_chave)
+    if len(chaves) <= MAX_SERIES:
+        for chave in chaves:
+            contagens = distribuicao.por_chave[chave]
+            x, f = cdf(contagens)
+            eixo.step(x, f, where='post', label=f"Semáforo {chave} ({int(contagens.sum())} carros)")
+        eixo.set(xlabel='Espera (s)', ylabel='Fração acumulada', ylim=(0, 1.01))
+        eixo.legend(loc='lower right', fontsize='small')
+    else:
+        posicoes = np.arange(len(chaves))
+        for q in (0.5, 0.9, 0.99):
+            eixo.plot(posicoes, [quantil(distribuicao.por_chave[c], q) for c in chaves],
+                      label=f"p{q * 100:g}")
+        eixo.set(xlabel='Semáforo (ordem)', ylabel='Espera (s)')
+        eixo.legend()
+    eixo.set_title(titulo)
+    eixo.grid(alpha=0.3)
+    return gravar(figura, caminho)
+
+
+def plotar_liberacoes(tempos_liberacao, caminho, resolucao=RESOLUCAO):
+    """
+    Taxa de liberação ao longo do tempo: o total e, até MAX_SERIES
+    semáforos, a parcela de cada um empilhada; acima disso, um mapa
+    semáforo x tempo.
+    """
+    bordas, chaves, matriz = linha_do_tempo(tempos_liberacao, resolucao)
+    por_semaforo = len(chaves) <= MAX_SERIES
+    figura = nova_figura(figsize=(10, 4.5 if por_semaforo else 7))
+    if por_semaforo:
+        eixo = figura.subplots()
+        empilhado = np.vstack((np.zeros(matriz.shape[1]), np.cumsum(matriz, axis=0))) / resolucao
+        for n, chave in enumerate(chaves):
+            eixo.stairs(empilhado[n + 1], bordas, baseline=empilhado[n], fill=True, alpha=0.6,
+                        label=f"Semáforo {chave}")
+        eixo.set_xlabel('Tempo desde a primeira liberação (s)')
+    else:
+        eixo, mapa = figura.subplots(2, 1, sharex=True, height_ratios=(1, 2))
+        imagem = mapa.pcolormesh(bordas, np.arange(len(chaves) + 1), matriz / resolucao,
+                                 shading='flat')
+        mapa.set(xlabel='Tempo desde a primeira liberação (s)', ylabel='Semáforo (ordem)')
+        figura.colorbar(imagem, ax=(eixo, mapa), label='carros/s')
+    eixo.stairs(matriz.sum(axis=0) / resolucao, bordas, color='black', label='Total')
+    eixo.set(ylabel='Liberações (carros/s)', title=f"Liberações em intervalos de {resolucao:g}s")
+    eixo.legend(fontsize='small')
+    eixo.grid(alpha=0.3)
+    return gravar(figura, caminho)
+
+
+def relatorio(esperas=None, tempos_liberacao=None, diretorio='', formato='png',
+              resolucao=RESOLUCAO):
+    """
+    Grava as figuras do que for informado.
+
+    Parâmetros:
+        esperas (dict): nome do escalonador -> Distribuicao
+        tempos_liberacao (dict): semáforo -> instantes de liberação
+        diretorio (str): onde gravar (padrão: diretório atual)
+        formato (str): 'png' ou 'svg'
+
+    Retorna:
+        list: caminhos gravados
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"formato deve ser um de {FORMATOS}, não {formato!r}")
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    gravados = []
+    if esperas:
+        gravados.append(plotar_esperas(esperas, os.path.join(diretorio, f"esperas.{formato}")))
+        for nome, d in esperas.items():
+            arquivo = f"esperas_semaforo_{nome.lower()}.{formato}"
+            gravados.append(plotar_por_semaforo(d, os.path.join(diretorio, arquivo),
+                                                f"{nome}: espera por semáforo"))
+    if tempos_liberacao:
+        gravados.append(plotar_liberacoes(tempos_liberacao,
+                                          os.path.join(diretorio, f"liberacoes.{formato}"), resolucao))
+    return gravados
+
+
+def _simular(args):
+    import random
+    from escalonamento import gerar_cenario, simular
+
+    semaforos, cars_data = gerar_cenario(args.semaforos, args.carros, random.Random(args.semente))
+    esperas = {}
+    for nome in ('FCFS', 'Prioridade'):
+        log = []
+        random.seed(args.semente)
+        simular(nome.lower(), semaforos, cars_data, motor='eventos', verboso=False, log=log)
+        esperas[nome] = Distribuicao()
+        esperas[nome].adicionar_log(log)
+    return esperas, None
+
+
+def _analitico(args):
+    import analitico
+
+    carros = analitico.gerar_carros(args.num_carros, args.semaforos, semente=args.semente)
+    esperas = {}
+    for nome in ('FCFS', 'Prioridade'):
+        esperas[nome] = Distribuicao()
+        esperas[nome].adicionar(analitico.esperas(nome.lower(), carros), carros['semaforo_id'])
+    return esperas, None
+
+
+def _rastro(args):
+    from rastro import Rastro
+
+    rastro = Rastro(args.caminho)
+    d = Distribuicao()
+    d.adicionar_rastro(rastro)
+    rastro.fechar()
+    return {os.path.splitext(os.path.basename(args.caminho))[0]: d}, None
+
+
+def _controle(args):
+    import com_controle
+
+    config = {'GUARDAR_TEMPOS': True, 'TEMPO_VIRTUAL': args.virtual, 'SEMENTE': args.semente,
+              'SAIDA_CONSOLE': False, 'RELATORIO': False}
+    if args.duracao is not None:
+        config['TEMPO_SIMULACAO'] = args.duracao
+    return None, com_controle.run(config)['tempos_liberacao']
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--saida', default='figuras', help='diretório das figuras (padrão: figuras)')
+    parser.add_argument('--formato', choices=FORMATOS, default='png')
+    parser.add_argument('--resolucao', type=float, default=RESOLUCAO,
+                        help='segundos por intervalo na linha do tempo das liberações')
+    comandos = parser.add_subparsers(dest='comando', required=True)
+    p = comandos.add_parser('simular', help='FCFS e Prioridade no motor de eventos')
+    p.add_argument('--semaforos', type=int, default=8)
+    p.add_argument('--carros', type=int, default=500, help='máximo de carros por semáforo')
+    p.add_argument('--semente', type=int, default=0)
+    p.set_defaults(origem=_simular)
+    p = comandos.add_parser('analitico', help='FCFS e Prioridade por analitico.py (milhões de carros)')
+    p.add_argument('num_carros', type=int)
+    p.add_argument('--semaforos', type=int, default=8)
+    p.add_argument('--semente', type=int, default=0)
+    p.set_defaults(origem=_analitico)
+    p = comandos.add_parser('rastro', help='esperas gravadas num rastro (rastro.py repetir)')
+    p.add_argument('caminho')
+    p.set_defaults(origem=_rastro)
+    p = comandos.add_parser('controle', help='linha do tempo das liberações de com_controle')
+    p.add_argument('--duracao', type=float, default=None, help='segundos simulados')
+    p.add_argument('--semente', type=int, default=None)
+    p.add_argument('--virtual', action='store_true', help='relógio virtual (termina na hora)')
+    p.set_defaults(origem=_controle)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    try:
+        esperas, tempos = args.origem(args)
+    except ValueError as erro:
+        sys.exit(f"erro: {erro}")
+    agregado = time.perf_counter()
+    for caminho in relatorio(esperas, tempos, args.saida, args.formato, args.resolucao):
+        print(caminho)
+    print(f"Agregação em {agregado - inicio:.2f}s, figuras em {time.perf_counter() - agregado:.2f}s",
+          file=sys.stderr)
@@ -0,0 +1,255 @@
+"""
+Instrumentação opcional das travas, condições e semáforos da simulação.
+
+Instrumentacao é uma fábrica de primitivas com nome. Ligada, devolve
+envoltórios que medem latência de aquisição, tempo de posse e quantas
+aquisições encontraram a trava ocupada (contenção); desligada, devolve os
+objetos de threading sem envoltório, então o custo é zero nas travas e um
+teste de `ativa` nos pontos que registram tempos.
+
+Os tempos ficam em estatisticas.Histograma: baldes log-lineares no estilo
+HDR, com memória limitada, quantis aproximados e mescla.
+
+Ao fim da execução, exportar() grava um retrato em JSON ou, se o caminho
+terminar em .prom, no formato texto do Prometheus.
+"""
+import json
+import time
+import threading
+
+from estatisticas import Histograma
+
+
+class TravaInstrumentada:
+    """
+    threading.Lock com medidas. Os contadores e o histograma de posse são
+    atualizados por quem detém a trava, então não disputam entre si.
+    """
+
+    def __init__(self, nome, trava=None):
+        self.nome = nome
+        self._trava = trava or threading.Lock()
+        self.aquisicoes = 0
+        self.contencoes = 0
+        self.espera = Histograma()
+        self.posse = Histograma()
+        self._inicio_posse = 0.0
+
+    def acquire(self, blocking=True, timeout=-1):
+        if self._trava.acquire(False):
+            espera = 0.0
+        else:
+            if not blocking:
+                return False
+            inicio = time.perf_counter()
+            if not self._trava.acquire(True, timeout):
+                return False
+            espera = time.perf_counter() - inicio
+            self.contencoes += 1
+        self.aquisicoes += 1
+        self.espera.registrar(espera)
+        self._inicio_posse = time.perf_counter()
+        return True
+
+    def release(self):
+        self.posse.registrar(time.perf_counter() - self._inicio_posse)
+        self._trava.release()
+
+    def locked(self):
+        return self._trava.locked()
+
+    def _is_owned(self):
+        # Usado por threading.Condition; não conta como aquisição
+        if self._trava.acquire(False):
+            self._trava.release()
+            return False
+        return True
+
+    __enter__ = acquire
+
+    def __exit__(self, *excecao):
+        self.release()
+
+    def resumo(self):
+        return {'aquisicoes': self.aquisicoes, 'contencoes': self.contencoes,
+                'espera': self.espera.resumo(), 'posse': self.posse.resumo()}
+
+
+class CondicaoInstrumentada(threading.Condition):
+    """
+    threading.Condition sobre uma TravaInstrumentada: mede quanto tempo as
+    threads ficam em wait() e conta notificações. A trava subjacente mede
+    também as readquisições feitas ao acordar.
+    """
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.trava = TravaInstrumentada(nome)
+        super().__init__(self.trava)
+        self.esperas = 0
+        self.notificacoes = 0
+        self.espera = Histograma()
+
+    def wait(self, timeout=None):
+        inicio = time.perf_counter()
+        try:
+            return super().wait(timeout)
+        finally:
+            # De volta com a trava: contadores sem disputa
+            self.esperas += 1
+            self.espera.registrar(time.perf_counter() - inicio)
+
+    def notify(self, n=1):
+        # notify_all também passa por aqui
+        self.notificacoes += 1
+        super().notify(n)
+
+    def resumo(self):
+        return {'esperas': self.esperas, 'notificacoes': self.notificacoes,
+                'espera': self.espera.resumo(), 'trava': self.trava.resumo()}
+
+
+class SemaforoInstrumentado:
+    """threading.Semaphore com medidas; a posse é medida por thread."""
+
+    def __init__(self, nome, valor=1):
+        self.nome = nome
+        self._semaforo = threading.Semaphore(valor)
+        self._contadores = threading.Lock()
+        self._local = threading.local()
+        self.aquisicoes = 0
+        self.contencoes = 0
+        self.espera = Histograma()
+        self.posse = Histograma()
+
+    def acquire(self, blocking=True, timeout=None):
+        contida = False
+        inicio = time.perf_counter()
+        if not self._semaforo.acquire(False):
+            if not blocking or not self._semaforo.acquire(True, timeout):
+                return False
+            contida = True
+        agora = time.perf_counter()
+        with self._contadores:
+            self.aquisicoes += 1
+            self.contencoes += contida
+        self.espera.registrar(agora - inicio if contida else 0.0)
+        self._local.__dict__.setdefault('inicios', []).append(agora)
+        return True
+
+    def release(self):
+        inicios = self._local.__dict__.get('inicios')
+        if inicios:
+            self.posse.registrar(time.perf_counter() - inicios.pop())
+        self._semaforo.release()
+
+    __enter__ = acquire
+
+    def __exit__(self, *excecao):
+        self.release()
+
+    def resumo(self):
+        return {'aquisicoes': self.aquisicoes, 'contencoes': self.contencoes,
+                'espera': self.espera.resumo(), 'posse': self.posse.resumo()}
+
+
+class Instrumentacao:
+    """
+    Fábrica e registro das primitivas instrumentadas e dos histogramas.
+    Com ativa=False, trava/condicao/semaforo devolvem as primitivas comuns
+    e registrar() não faz nada.
+    """
+
+    def __init__(self, ativa=True):
+        self.ativa = ativa
+        self._travas = {}
+        self._condicoes = {}
+        self._semaforos = {}
+        self._histogramas = {}
+
+    def trava(self, nome):
+        if not self.ativa:
+            return threading.Lock()
+        return self._travas.setdefault(nome, TravaInstrumentada(nome))
+
+    def condicao(self, nome):
+        if not self.ativa:
+            return threading.Condition()
+        return self._condicoes.setdefault(nome, CondicaoInstrumentada(nome))
+
+    def semaforo(self, nome, valor=1):
+        if not self.ativa:
+            return threading.Semaphore(valor)
+        return self._semaforos.setdefault(nome, SemaforoInstrumentado(nome, valor))
+
+    def histograma(self, nome):
+        h = self._histogramas.get(nome)
+        if h is None:
+            h = self._histogramas.setdefault(nome, Histograma())
+        return h
+
+    def registrar(self, nome, segundos):
+        """Acrescenta uma duração ao histograma `nome` (se ativa)."""
+        if self.ativa:
+            self.histograma(nome).registrar(segundos)
+
+    def instantaneo(self):
+        """Retrato de todas as medidas como dict serializável em JSON."""
+        return {
+            'travas': {n: t.resumo() for n, t in self._travas.items()},
+            'condicoes': {n: c.resumo() for n, c in self._condicoes.items()},
+            'semaforos': {n: s.resumo() for n, s in self._semaforos.items()},
+            'histogramas': {n: h.resumo() for n, h in self._histogramas.items()},
+        }
+
+    def prometheus(self):
+        """Medidas no formato texto de exposição do Prometheus."""
+        linhas = []
+
+        def contador(nome, rotulo, valor, ajuda):
+            linhas.append(f"# HELP c012_{nome} {ajuda}")
+            linhas.append(f"# TYPE c012_{nome} counter")
+            linhas.extend(f'c012_{nome}{{{rotulo}="{n}"}} {v}' for n, v in valor)
+
+        def histograma(nome, rotulo, series, ajuda):
+            linhas.append(f"# HELP c012_{nome} {ajuda}")
+            linhas.append(f"# TYPE c012_{nome} histogram")
+            for n, h in series:
+                acumulado = 0
+                for limite, contagem in h.baldes():
+                    acumulado += contagem
+                    linhas.append(f'c012_{nome}_bucket{{{rotulo}="{n}",le="{limite:.6g}"}} {acumulado}')
+                linhas.append(f'c012_{nome}_bucket{{{rotulo}="{n}",le="+Inf"}} {h.contagem}')
+                linhas.append(f'c012_{nome}_sum{{{rotulo}="{n}"}} {h.soma:.9g}')
+                linhas.append(f'c012_{nome}_count{{{rotulo}="{n}"}} {h.contagem}')
+
+        travas = dict(self._travas)
+        travas.update({n: c.trava for n, c in self._condicoes.items()})
+        for tipo, objs in (('trava', travas), ('semaforo', self._semaforos)):
+            if not objs:
+                continue
+            contador(f"{tipo}_aquisicoes_total", tipo, ((n, o.aquisicoes) for n, o in objs.items()),
+                     "Aquisicoes")
+            contador(f"{tipo}_contencoes_total", tipo, ((n, o.contencoes) for n, o in objs.items()),
+                     "Aquisicoes que encontraram o recurso ocupado")
+            histograma(f"{tipo}_espera_segundos", tipo, ((n, o.espera) for n, o in objs.items()),
+                       "Latencia de aquisicao")
+            histograma(f"{tipo}_posse_segundos", tipo, ((n, o.posse) for n, o in objs.items()),
+                       "Tempo de posse")
+        if self._condicoes:
+            contador("condicao_notificacoes_total", 'condicao',
+                     ((n, c.notificacoes) for n, c in self._condicoes.items()), "Chamadas de notify")
+            histograma("condicao_espera_segundos", 'condicao',
+                       ((n, c.espera) for n, c in self._condicoes.items()), "Tempo bloqueado em wait")
+        if self._histogramas:
+            histograma("tempo_segundos", 'serie', self._histogramas.items(),
+                       "Tempos da simulacao (espera, travessia)")
+        return "\n".join(linhas) + "\n"
+
+    def exportar(self, caminho):
+        """Grava as medidas: Prometheus se terminar em .prom, JSON nos demais."""
+        with open(caminho, 'w', encoding='utf-8') as f:
+            if caminho.endswith('.prom'):
+                f.write(self.prometheus())
+            else:
+                json.dump(self.instantaneo(), f, indent=2, ensure_ascii=False)
@@ -0,0 +1,71 @@
+"""
+Parâmetros das simulações de semáforos (com_controle, sem_controle,
+com_asyncio): cada módulo lista em PARAMETROS as constantes que run(config)
+aceita, e aqui ficam a mescla de `config` sobre esses padrões e a linha de
+comando comum (--semente, --duracao, --silencioso, --definir NOME=VALOR).
+"""
+import sys
+import ast
+import argparse
+
+
+def mesclar(parametros, padroes, config=None):
+    """
+    Os padrões dos nomes em `parametros` com as chaves de `config` por cima.
+
+    Parâmetros:
+        parametros (tuple): nomes aceitos (o PARAMETROS do módulo)
+        padroes (dict): valores padrão por nome (ex.: globals() do módulo)
+        config (dict): parâmetros a alterar
+
+    Levanta ValueError se `config` tiver um nome fora de `parametros`.
+    """
+    cfg = {nome: padroes[nome] for nome in parametros}
+    desconhecidos = set(config or ()) - cfg.keys()
+    if desconhecidos:
+        raise ValueError(f"parâmetros desconhecidos: {sorted(desconhecidos)}")
+    cfg.update(config or {})
+    return cfg
+
+
+def analisador(descricao):
+    """ArgumentParser com as opções comuns; cada módulo acrescenta as suas."""
+    parser = argparse.ArgumentParser(description=descricao)
+    parser.add_argument('--semente', type=int, help="SEMENTE")
+    parser.add_argument('--duracao', type=float, help="TEMPO_SIMULACAO em segundos")
+    parser.add_argument('--silencioso', action='store_true', help="sem eventos no console")
+    parser.add_argument('--definir', action='append', default=[], metavar='NOME=VALOR',
+                        help="altera qualquer parâmetro do módulo (valor em sintaxe Python)")
+    return parser
+
+
+def definicoes(itens):
+    """Converte itens NOME=VALOR em dict; o valor é lido em sintaxe Python."""
+    config = {}
+    for item in itens:
+        nome, _, valor = item.partition('=')
+        try:
+            config[nome.strip()] = ast.literal_eval(valor.strip())
+        except (ValueError, SyntaxError):
+            config[nome.strip()] = valor.strip()   # texto sem aspas (ex.: MODO_VERDE=atuado)
+    return config
+
+
+def executar(run, args, config=None):
+    """
+    Monta o config das opções comuns de `args` sobre `config` (opções
+    próprias do módulo), aplica os --definir por último e chama run(config).
+    Um ValueError (parâmetro inválido) encerra com a mensagem.
+    """
+    config = dict(config or {})
+    if args.semente is not None:
+        config['SEMENTE'] = args.semente
+    if args.duracao is not None:
+        config['TEMPO_SIMULACAO'] = args.duracao
+    if args.silencioso:
+        config['SAIDA_CONSOLE'] = False
+    config.update(definicoes(args.definir))
+    try:
+        return run(config)
+    except ValueError as erro:
+        sys.exit(str(erro))
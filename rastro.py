@@ -0,0 +1,329 @@
+"""
+Rastros gravados: cenários e resultados em arquivo colunar, com repetição
+determinística por mapeamento em memória (requer `numpy`).
+
+Formato do arquivo:
+    b'C012RS1\\n'                 assinatura
+    uint32 little-endian         tamanho do cabeçalho JSON
+    JSON                         semáforos, número de carros, semente, ...
+    colunas                      uma após a outra, cada uma alinhada em 64
+                                 bytes, com n valores de largura fixa:
+        semaforo_id  int32   carro_idx  int32   delay    float64
+        servico      float64 entrada    float64 saida    float64
+
+`servico` é o tempo de travessia; `entrada` e `saida` são os resultados
+(NaN enquanto não gravados). Os tempos são relativos ao início da simulação.
+
+Rastro abre o arquivo com numpy.memmap: nada é carregado até ser lido, e
+blocos()/cars_data() percorrem os carros em fatias, então rastros de 10^8
+carros continuam utilizáveis. repetir() refaz a simulação do cruzamento
+único bloco a bloco sobre as colunas, com memória limitada.
+"""
+import json
+import struct
+import random
+
+import numpy as np
+
+ASSINATURA = b'C012RS1\n'
+ALINHAMENTO = 64
+COLUNAS = (
+    ('semaforo_id', '<i4'),
+    ('carro_idx', '<i4'),
+    ('delay', '<f8'),
+    ('servico', '<f8'),
+    ('entrada', '<f8'),
+    ('saida', '<f8'),
+)
+BLOCO = 1 << 20   # carros por fatia nas leituras e na repetição
+
+
+def _alinhar(posicao):
+    return -(-posicao // ALINHAMENTO) * ALINHAMENTO
+
+
+def _deslocamentos(inicio, n):
+    """Offset de cada coluna, a partir do fim do cabeçalho."""
+    offsets = {}
+    posicao = _alinhar(inicio)
+    for nome, tipo in COLUNAS:
+        offsets[nome] = posicao
+        posicao = _alinhar(posicao + n * np.dtype(tipo).itemsize)
+    return offsets, posicao
+
+
+class Gravador:
+    """
+    Escreve um rastro em fatias, sem manter os carros em memória:
+
+        with Gravador(caminho, semaforos, n, semente) as g:
+            g.escrever(semaforo_id=..., carro_idx=..., delay=..., servico=...)
+
+    As fatias são gravadas em sequência; colunas omitidas ficam NaN (ou 0,
+    nas inteiras). `meta` acrescenta campos livres ao cabeçalho.
+    """
+
+    def __init__(self, caminho, semaforos, n, semente=None, **meta):
+        cabecalho = dict(meta, semaforos=semaforos, n=n, semente=semente)
+        dados = json.dumps(cabecalho, ensure_ascii=False).encode('utf-8')
+        self.n = n
+        self._escritos = 0
+        self._offsets, tamanho = _deslocamentos(len(ASSINATURA) + 4 + len(dados), n)
+        self._arquivo = open(caminho, 'w+b')
+        self._arquivo.write(ASSINATURA + struct.pack('<I', len(dados)) + dados)
+        self._arquivo.truncate(tamanho)
+        # Saídas ainda não gravadas começam como NaN
+        nan = np.full(min(n, BLOCO), np.nan)
+        for nome in ('servico', 'entrada', 'saida'):
+            for inicio in range(0, n, BLOCO):
+                self._arquivo.seek(self._offsets[nome] + inicio * 8)
+                self._arquivo.write(nan[:min(BLOCO, n - inicio)].tobytes())
+
+    def escrever(self, **colunas):
+        tamanhos = {len(v) for v in colunas.values()}
+        if len(tamanhos) != 1:
+            raise ValueError("colunas de tamanhos diferentes na mesma fatia")
+        quantidade = tamanhos.pop()
+        if self._escritos + quantidade > self.n:
+            raise ValueError(f"mais de {self.n} carros no rastro")
+        tipos = dict(COLUNAS)
+        for nome, valores in colunas.items():
+            tipo = np.dtype(tipos[nome])
+            self._arquivo.seek(self._offsets[nome] + self._escritos * tipo.itemsize)
+            self._arquivo.write(np.ascontiguousarray(valores, dtype=tipo).tobytes())
+        self._escritos += quantidade
+
+    def fechar(self):
+        self._arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+
+def gravar(caminho, semaforos, cars_data, semente=None, log=None):
+    """
+    Grava um cenário de `simular` (semaforos e cars_data) e, se informado,
+    o `log` de uma execução com tempos relativos (motores 'eventos' ou
+    'pool'): entrada, saída e travessia de cada carro.
+    """
+    n = len(cars_data)
+    colunas = {
+        'semaforo_id': [d['semaforo_id'] for d in cars_data],
+        'carro_idx': [d['carro_idx'] for d in cars_data],
+        'delay': [d['delay'] for d in cars_data],
+    }
+    if log is not None:
+        indice = {(d['semaforo_id'], d['carro_idx']): i for i, d in enumerate(cars_data)}
+        entrada, saida = np.full(n, np.nan), np.full(n, np.nan)
+        for carro, _ in log:
+            i = indice[(carro.semaforo_id, carro.carro_idx)]
+            entrada[i], saida[i] = carro.tempo_entrada, carro.tempo_saida
+        colunas.update(entrada=entrada, saida=saida, servico=saida - entrada)
+    with Gravador(caminho, semaforos, n, semente) as g:
+        g.escrever(**colunas)
+
+
+def gerar(caminho, num_carros, num_semaforos=4, taxa=0.6, semente=0, bloco=BLOCO):
+    """
+    Grava um rastro sintético de qualquer tamanho, fatia a fatia: chegadas
+    de Poisson com `taxa` carros/s (já em ordem de chegada), semáforo
+    uniforme e travessia em [1, 2), como em gerar_cenario/analitico.
+    """
+    rng = np.random.default_rng(semente)
+    prob = rng.random(num_semaforos)
+    ordem = sorted(range(num_semaforos), key=lambda i: -prob[i])
+    prioridade = {sid: rank for rank, sid in enumerate(ordem, start=1)}
+    semaforos = [{'id': i, 'prob': float(prob[i]), 'cars': None, 'priority': prioridade[i]}
+                 for i in range(num_semaforos)]
+    contagem = np.zeros(num_semaforos, dtype=np.int64)
+    relogio = 0.0
+    with Gravador(caminho, semaforos, num_carros, semente, ordenado=True, taxa=taxa) as g:
+        for inicio in range(0, num_carros, bloco):
+            m = min(bloco, num_carros - inicio)
+            chegadas = relogio + np.cumsum(rng.exponential(1 / taxa, m))
+            relogio = float(chegadas[-1])
+            sid = rng.integers(0, num_semaforos, m)
+            # carro_idx: ordem do carro dentro do seu semáforo
+            idx = np.empty(m, dtype=np.int64)
+            for s in range(num_semaforos):
+                mascara = sid == s
+                k = int(mascara.sum())
+                idx[mascara] = contagem[s] + np.arange(k)
+                contagem[s] += k
+            g.escrever(semaforo_id=sid, carro_idx=idx, delay=chegadas,
+                       servico=rng.uniform(1.0, 2.0, m))
+
+
+class Rastro:
+    """
+    Rastro aberto por mapeamento em memória. modo='r' só lê; 'r+' permite
+    gravar entrada/saida (ver repetir).
+    """
+
+    def __init__(self, caminho, modo='r'):
+        with open(caminho, 'rb') as f:
+            if f.read(len(ASSINATURA)) != ASSINATURA:
+                raise ValueError(f"{caminho}: não é um rastro C012")
+            tamanho, = struct.unpack('<I', f.read(4))
+            self.meta = json.loads(f.read(tamanho).decode('utf-8'))
+        self.caminho = caminho
+        self.modo = modo
+        self.n = self.meta['n']
+        self.semaforos = self.meta['semaforos']
+        self.semente = self.meta.get('semente')
+        self._offsets, _ = _deslocamentos(len(ASSINATURA) + 4 + tamanho, self.n)
+        self._colunas = {}
+
+    def coluna(self, nome):
+        """Coluna inteira como numpy.memmap (sem cópia)."""
+        if nome not in self._colunas:
+            self._colunas[nome] = np.memmap(self.caminho, dtype=dict(COLUNAS)[nome],
+                                            mode=self.modo, offset=self._offsets[nome],
+                                            shape=(self.n,))
+        return self._colunas[nome]
+
+    def blocos(self, colunas=('semaforo_id', 'carro_idx', 'delay', 'servico'), tamanho=BLOCO):
+        """Percorre o rastro em fatias: (início, {coluna: array})."""
+        mapas = {nome: self.coluna(nome) for nome in colunas}
+        for inicio in range(0, self.n, tamanho):
+            yield inicio, {nome: m[inicio:inicio + tamanho] for nome, m in mapas.items()}
+
+    def cars_data(self, tamanho=BLOCO):
+        """
+        Carros no formato de `simular`, gerados sob demanda. Quando o rastro
+        tem a travessia, ela segue em 'travessia' (usada por simular_online).
+        """
+        for _, bloco in self.blocos(tamanho=tamanho):
+            servico = bloco['servico']
+            for sid, idx, delay, trav in zip(bloco['semaforo_id'].tolist(),
+                                             bloco['carro_idx'].tolist(),
+                                             bloco['delay'].tolist(), servico.tolist()):
+                dados = {'semaforo_id': sid, 'carro_idx': idx, 'delay': delay}
+                if trav == trav:   # não é NaN
+                    dados['travessia'] = trav
+                yield dados
+
+    def simular(self, algoritmo, **kwargs):
+        """
+        Repete o cenário em escalonamento.simular, com a semente gravada:
+        os sorteios de travessia do motor voltam a ser os mesmos.
+
+        Só serve para rastros que cabem na memória: simular recebe a lista
+        inteira de cars_data e os motores montam um registro Python por
+        carro (algumas centenas de bytes cada). Para rastros grandes, use
+        repetir, que percorre as colunas fatia a fatia.
+        """
+        from escalonamento import simular
+        if self.semente is not None:
+            random.seed(self.semente)
+        return simular(algoritmo, self.semaforos, list(self.cars_data()), **kwargs)
+
+    def fechar(self):
+        for m in self._colunas.values():
+            if self.modo != 'r':
+                m.flush()
+        self._colunas.clear()
+
+
+def _em_ordem_de_chegada(rastro, tamanho):
+    """
+    Fatias (posições, chegadas, travessias) em ordem de chegada. Rastros
+    gravados já ordenados (gerar) são lidos em sequência; os demais passam
+    por uma ordenação estável dos índices, que ocupa 8 bytes por carro.
+    """
+    delay, servico = rastro.coluna('delay'), rastro.coluna('servico')
+    if rastro.meta.get('ordenado'):
+        for inicio in range(0, rastro.n, tamanho):
+            fatia = slice(inicio, inicio + tamanho)
+            yield fatia, np.asarray(delay[fatia]), np.asarray(servico[fatia])
+        return
+    ordem = np.argsort(delay, kind='stable')
+    for inicio in range(0, rastro.n, tamanho):
+        posicoes = ordem[inicio:inicio + tamanho]
+        yield posicoes, delay[posicoes], servico[posicoes]
+
+
+def repetir(rastro, algoritmo, tamanho=BLOCO):
+    """
+    Refaz o cruzamento único com as travessias gravadas, fatia a fatia, com
+    a mesma recorrência de analitico.py carregando o instante em que o
+    cruzamento fica livre de uma fatia para a outra. No FCFS os carros são
+    percorridos em ordem de chegada; na Prioridade todos chegam em 0 e cada
+    nível de prioridade é uma passada pelo arquivo. Com modo 'r+', grava entrada e
+    saida no próprio rastro.
+
+    Retorna:
+        float: tempo médio de espera.
+    """
+    if rastro.n == 0:
+        return 0.0
+    gravar_saidas = rastro.modo != 'r'
+    entrada_col = rastro.coluna('entrada') if gravar_saidas else None
+    saida_col = rastro.coluna('saida') if gravar_saidas else None
+    soma = 0.0
+    livre = 0.0
+
+    if algoritmo.lower() == 'fcfs':
+        for posicoes, c, s in _em_ordem_de_chegada(rastro, tamanho):
+            if np.isnan(s).any():
+                raise ValueError("rastro sem travessias gravadas")
+            anteriores = np.cumsum(s) - s
+            entrada = anteriores + np.maximum(np.maximum.accumulate(c - anteriores), livre)
+            livre = float(entrada[-1] + s[-1])
+            soma += float((entrada - c).sum())
+            if gravar_saidas:
+                entrada_col[posicoes] = entrada
+                saida_col[posicoes] = entrada + s
+        return soma / rastro.n
+
+    prioridade = {s['id']: s['priority'] for s in rastro.semaforos}
+    tabela = np.zeros(max(prioridade) + 1, dtype=np.int64)
+    for sid, p in prioridade.items():
+        tabela[sid] = p
+    for nivel in sorted(set(prioridade.values())):
+        for inicio, b in rastro.blocos(('semaforo_id', 'servico'), tamanho):
+            mascara = tabela[np.asarray(b['semaforo_id'])] == nivel
+            s = np.asarray(b['servico'])[mascara]
+            if not len(s):
+                continue
+            if np.isnan(s).any():
+                raise ValueError("rastro sem travessias gravadas")
+            entrada = livre + np.cumsum(s) - s
+            livre = float(entrada[-1] + s[-1])
+            soma += float(entrada.sum())
+            if gravar_saidas:
+                posicoes = inicio + np.flatnonzero(mascara)
+                entrada_col[posicoes] = entrada
+                saida_col[posicoes] = entrada + s
+    return soma / rastro.n
+
+
+if __name__ == '__main__':
+    import time
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Grava ou repete rastros do cruzamento.")
+    sub = parser.add_subparsers(dest='comando', required=True)
+    p_gerar = sub.add_parser('gerar', help="grava um rastro sintético")
+    p_gerar.add_argument('caminho')
+    p_gerar.add_argument('carros', type=int)
+    p_gerar.add_argument('--taxa', type=float, default=0.6, help="chegadas por segundo")
+    p_gerar.add_argument('--semente', type=int, default=0)
+    p_repetir = sub.add_parser('repetir', help="repete um rastro e grava entrada/saida")
+    p_repetir.add_argument('caminho')
+    p_repetir.add_argument('algoritmo', choices=['fcfs', 'prioridade'])
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    if args.comando == 'gerar':
+        gerar(args.caminho, args.carros, taxa=args.taxa, semente=args.semente)
+        print(f"{args.carros} carros gravados em {time.perf_counter() - inicio:.2f}s")
+    else:
+        rastro = Rastro(args.caminho, 'r+')
+        media = repetir(rastro, args.algoritmo)
+        rastro.fechar()
+        print(f"{rastro.n} carros, espera média ({args.algoritmo.upper()}): {media:.3f}s "
+              f"em {time.perf_counter() - inicio:.2f}s")
@@ -0,0 +1,174 @@
+"""
+Fluxo estruturado de eventos da simulação.
+
+Os caminhos quentes (liberação de carro, travessia, troca de fase, acidente,
+espera no cruzamento) apenas enfileiram uma tupla numa deque, cujo append é
+atômico no CPython e dispensa trava. Uma thread escritora drena a fila em
+lotes e repassa para as saídas configuradas: JSONL, binário compacto ou o
+console com o mesmo texto que as simulações imprimiam antes.
+
+Cada evento é a tupla (tipo, instante, semaforo, carro, valor, extra):
+    verde       valor = duração do VERDE
+    vermelho    -
+    liberacao   carro = nº sequencial no semáforo, valor = segundos no verde,
+                extra = retrato da rua [(id_carro, inicio_lib), ...] ou None
+    travessia   carro = nº sequencial no semáforo
+    acidente    extra = (semáforos envolvidos, ids dos carros envolvidos)
+    espera      carro = carro_idx, valor = espera,
+                extra = (posição, prob, prioridade, fcfs)
+"""
+import sys
+import json
+import struct
+import threading
+from collections import deque
+
+# Códigos dos tipos no formato binário
+TIPOS = {'verde': 1, 'vermelho': 2, 'liberacao': 3, 'travessia': 4, 'acidente': 5, 'espera': 6}
+
+# Binário: cabeçalho seguido de registros de largura fixa
+# (tipo, instante, semaforo, carro, valor) = 25 bytes
+CABECALHO_BINARIO = b'C012EV1\n'
+REGISTRO_BINARIO = struct.Struct('<Bdiid')
+
+INTERVALO_ESCRITA = 0.05  # período (s) máximo entre lotes da escritora
+
+
+class RegistroEventos:
+    """
+    Fila de eventos com uma thread escritora em segundo plano.
+    Chame fechar() ao fim da simulação para escrever o que restou.
+    """
+
+    def __init__(self, saidas=(), intervalo=INTERVALO_ESCRITA):
+        self._fila = deque()
+        self._saidas = list(saidas)
+        self._intervalo = intervalo
+        self._parar = threading.Event()
+        # Só vale montar o retrato da rua se alguma saída for exibi-lo
+        self.detalhado = any(getattr(s, 'detalhado', False) for s in self._saidas)
+        self._thread = threading.Thread(target=self._escrever, daemon=True)
+        self._thread.start()
+
+    def emitir(self, tipo, instante, semaforo=-1, carro=-1, valor=0.0, extra=None):
+        """Enfileira um evento; não faz E/S nem adquire travas."""
+        self._fila.append((tipo, instante, semaforo, carro, valor, extra))
+
+    def _drenar(self):
+        lote = []
+        fila = self._fila
+        while True:
+            try:
+                lote.append(fila.popleft())
+            except IndexError:
+                break
+        if lote:
+            for saida in self._saidas:
+                saida.escrever(lote)
+
+    def _escrever(self):
+        while not self._parar.wait(self._intervalo):
+            self._drenar()
+        self._drenar()
+
+    def fechar(self):
+        """Para a escritora, escreve os eventos pendentes e fecha as saídas."""
+        self._parar.set()
+        self._thread.join()
+        for saida in self._saidas:
+            saida.fechar()
+
+
+class SaidaConsole:
+    """Reproduz no console o texto original de cada evento."""
+    detalhado = True
+
+    def __init__(self, arquivo=None):
+        self._arquivo = arquivo or sys.stdout
+
+    def escrever(self, lote):
+        self._arquivo.write(''.join(formatar(e) for e in lote))
+        self._arquivo.flush()
+
+    def fechar(self):
+        pass
+
+
+class SaidaJsonl:
+    """Um objeto JSON por linha."""
+
+    def __init__(self, caminho):
+        self._arquivo = open(caminho, 'w', encoding='utf-8')
+
+    def escrever(self, lote):
+        linhas = []
+        for tipo, instante, semaforo, carro, valor, extra in lote:
+            evento = {'tipo': tipo, 't': instante, 'semaforo': semaforo,
+                      'carro': carro, 'valor': valor}
+            if extra is not None:
+                evento['extra'] = extra
+            linhas.append(json.dumps(evento, ensure_ascii=False))
+        self._arquivo.write('\n'.join(linhas) + '\n')
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+class SaidaBinaria:
+    """Registros de largura fixa (REGISTRO_BINARIO); o campo extra é descartado."""
+
+    def __init__(self, caminho):
+        self._arquivo = open(caminho, 'wb')
+        self._arquivo.write(CABECALHO_BINARIO)
+
+    def escrever(self, lote):
+        pack = REGISTRO_BINARIO.pack
+        self._arquivo.write(b''.join(
+            pack(TIPOS[tipo], instante, semaforo, carro, valor)
+            for tipo, instante, semaforo, carro, valor, _ in lote
+        ))
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+def ler_binario(caminho):
+    """Lê um arquivo de SaidaBinaria como tuplas (tipo, instante, semaforo, carro, valor)."""
+    nomes = {codigo: tipo for tipo, codigo in TIPOS.items()}
+    with open(caminho, 'rb') as f:
+        if f.read(len(CABECALHO_BINARIO)) != CABECALHO_BINARIO:
+            raise ValueError(f"{caminho}: cabeçalho de eventos inválido")
+        for codigo, instante, semaforo, carro, valor in REGISTRO_BINARIO.iter_unpack(f.read()):
+            yield nomes[codigo], instante, semaforo, carro, valor
+
+
+def abrir_saida(caminho):
+    """Saída de arquivo conforme a extensão: .bin para binário, JSONL nos demais."""
+    return SaidaBinaria(caminho) if caminho.endswith('.bin') else SaidaJsonl(caminho)
+
+
+def formatar(evento):
+    """Texto de console de um evento, igual aos prints das simulações."""
+    tipo, instante, semaforo, carro, valor, extra = evento
+    if tipo == 'verde':
+        return f"\n[S{semaforo}] — VERDE ({valor:.0f}s)\n"
+    if tipo == 'vermelho':
+        return f"[S{semaforo}] — VERMELHO\n"
+    if tipo == 'liberacao':
+        estados = [f"({c}, {(instante - tl):.2f}s)" for c, tl in extra or ()]
+        return (f"  • S{semaforo} liberou carro{carro}_s{semaforo} em {valor:.2f}s do verde. Rua: "
+                + " ".join(estados) + "\n")
+    if tipo == 'travessia':
+        return f"  ▶ O carro{carro}_s{semaforo} atravessou a rua completamente.\n"
+    if tipo == 'acidente':
+        semaforos, carros = extra
+        return (f"💥 ACIDENTE! Semáforos envolvidos: {semaforos}\n"
+                f"  • Carros envolvidos: {carros}\n")
+    if tipo == 'espera':
+        posicao, prob, prioridade, fcfs = extra
+        if fcfs:
+            return (f"Carro {carro} do semáforo {semaforo} "
+                    f"- posição {posicao}: esperou {valor:.3f}s\n")
+        return (f"Carro {carro} do semáforo {semaforo} "
+                f"(Prob: {prob*100:.1f}%, Pri: {prioridade}) esperou {valor:.3f}s\n")
+    return f"{tipo} {instante} {semaforo} {carro} {valor}\n"
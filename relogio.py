@@ -0,0 +1,233 @@
+import threading
+import time
+import heapq
+import itertools
+import traceback
+
+# Tolerância (s) ao comparar instantes do relógio virtual: os intervalos são
+# somados em ponto flutuante (10 x 0.3 != 3.0), então um tick que cai
+# exatamente no fim do VERDE precisa contar como "passou", como no tempo real.
+TOLERANCIA_VIRTUAL = 1e-9
+
+
+class Agendador:
+    """
+    Substituto de um threading.Timer por callback: uma única thread dorme
+    até o vencimento mais próximo de um heap e executa os callbacks em
+    ordem. O número de threads não cresce com o número de agendamentos.
+
+    Os callbacks rodam na thread do agendador, um de cada vez; devem ser
+    curtos (como evento_travessia) para não atrasar os seguintes.
+    """
+
+    def __init__(self):
+        self._condicao = threading.Condition()
+        self._heap = []             # (instante monotônico, seq, funcao, args)
+        self._seq = itertools.count()
+        self._thread = None
+        self._parar = False
+
+    def agendar(self, atraso, funcao, args=()):
+        """Executa funcao(*args) após `atraso` segundos."""
+        item = (time.monotonic() + atraso, next(self._seq), funcao, args)
+        with self._condicao:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._executar, daemon=True)
+                self._thread.start()
+            heapq.heappush(self._heap, item)
+            # Só é preciso acordar a thread se o novo item passou à frente
+            if self._heap[0] is item:
+                self._condicao.notify()
+        return item
+
+    def parar(self):
+        """Encerra a thread do agendador; callbacks pendentes são descartados."""
+        with self._condicao:
+            self._parar = True
+            self._condicao.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _executar(self):
+        with self._condicao:
+            while not self._parar:
+                if not self._heap:
+                    self._condicao.wait()
+                    continue
+                atraso = self._heap[0][0] - time.monotonic()
+                if atraso > 0:
+                    self._condicao.wait(atraso)
+                    continue
+                _, _, funcao, args = heapq.heappop(self._heap)
+                # Executa fora da trava para não bloquear novos agendamentos
+                self._condicao.release()
+                try:
+                    funcao(*args)
+                except Exception:
+                    # Como num Timer, o erro de um callback não derruba os demais
+                    traceback.print_exc()
+                finally:
+                    self._condicao.acquire()
+
+
+class RelogioReal:
+    """
+    Relógio de parede: repassa para time.time, time.sleep e Condition.wait.
+    Os callbacks agendados ficam num único Agendador (em vez de uma thread
+    Timer por carro). É o comportamento original das simulações.
+    """
+
+    def __init__(self):
+        self._agendador = Agendador()
+
+    def agora(self):
+        return time.time()
+
+    def passou(self, instante):
+        """Indica se o instante informado já foi atingido."""
+        return time.time() >= instante
+
+    def dormir(self, segundos):
+        time.sleep(segundos)
+
+    def agendar(self, atraso, funcao, args=()):
+        """Executa funcao(*args) após `atraso` segundos, na thread do agendador."""
+        return self._agendador.agendar(atraso, funcao, args)
+
+    def aguardar(self, condicao, predicado):
+        """Bloqueia em `condicao` até que predicado() seja verdadeiro."""
+        with condicao:
+            while not predicado():
+                condicao.wait()
+
+    # No tempo real as threads não precisam se anunciar ao relógio
+    def registrar(self):
+        pass
+
+    def sair(self):
+        pass
+
+    def encerrar(self):
+        """Para o agendador; callbacks pendentes são descartados."""
+        self._agendador.parar()
+
+
+class RelogioVirtual:
+    """
+    Relógio simulado para as threads de semáforo.
+
+    As threads participantes se anunciam com registrar()/sair(). Quando
+    todas estão paradas (em dormir ou aguardar), o relógio salta direto
+    para o próximo evento do heap: acorda quem dormia até aquele instante
+    ou executa o callback agendado. Assim só uma thread roda por vez, a
+    ordem dos sorteios é determinística e nenhum segundo real é gasto
+    esperando.
+
+    A thread que cria o relógio já conta como participante ativa.
+    """
+
+    def __init__(self, inicio=0.0):
+        self._trava = threading.RLock()
+        self._agora = inicio
+        self._ativos = 1
+        self._eventos = []          # heap de (instante, seq, acao)
+        self._seq = itertools.count()
+        self._esperando = []        # lista de (predicado, threading.Event)
+        self._encerrado = False
+
+    def agora(self):
+        return self._agora
+
+    def passou(self, instante):
+        return self._agora >= instante - TOLERANCIA_VIRTUAL
+
+    def registrar(self):
+        """Conta mais uma thread ativa; chamar antes de Thread.start()."""
+        with self._trava:
+            self._ativos += 1
+
+    def sair(self):
+        """A thread atual deixa de participar (ex.: terminou seu laço)."""
+        with self._trava:
+            self._ativos -= 1
+            self._despachar()
+
+    def encerrar(self):
+        """
+        Para o relógio: acorda todas as threads paradas sem avançar o tempo
+        e descarta os callbacks pendentes (como os Timers daemon no fim do
+        modo real). A thread que encerra deixa de participar.
+        """
+        with self._trava:
+            self._encerrado = True
+            self._ativos -= 1
+            self._despachar()
+
+    def dormir(self, segundos):
+        acordar = threading.Event()
+        with self._trava:
+            if self._encerrado:
+                return
+            heapq.heappush(self._eventos, (self._agora + segundos, next(self._seq), acordar))
+            self._ativos -= 1
+            self._despachar()
+        acordar.wait()
+
+    def agendar(self, atraso, funcao, args=()):
+        """Executa funcao(*args) quando o relógio atingir agora + atraso."""
+        with self._trava:
+            heapq.heappush(self._eventos, (self._agora + atraso, next(self._seq), (funcao, args)))
+
+    def aguardar(self, condicao, predicado):
+        """
+        Equivalente virtual de Condition.wait em laço: a thread fica parada
+        até o despachante encontrar predicado() verdadeiro. `condicao` é
+        ignorada; os notify_all de quem altera o estado continuam inofensivos.
+        """
+        acordar = threading.Event()
+        with self._trava:
+            if self._encerrado or predicado():
+                return
+            self._esperando.append((predicado, acordar))
+            self._ativos -= 1
+            self._despachar()
+        acordar.wait()
+
+    def _despachar(self):
+        """
+        Chamado com a trava adquirida sempre que uma thread para. Enquanto
+        ninguém estiver ativo: acorda um aguardante cujo predicado ficou
+        verdadeiro ou avança o relógio até o próximo evento do heap.
+        """
+        while self._ativos == 0:
+            if self._encerrado:
+                # Fim da simulação: libera todos sem avançar o tempo
+                for _, acordar in self._esperando:
+                    acordar.set()
+                for _, _, acao in self._eventos:
+                    if isinstance(acao, threading.Event):
+                        self._ativos += 1
+                        acao.set()
+                self._ativos += len(self._esperando)
+                self._esperando.clear()
+                self._eventos.clear()
+                return
+
+            for i, (predicado, acordar) in enumerate(self._esperando):
+                if predicado():
+                    del self._esperando[i]
+                    self._ativos += 1
+                    acordar.set()
+                    return
+
+            if not self._eventos:
+                return  # nada mais a fazer: todas as threads saíram
+
+            instante, _, acao = heapq.heappop(self._eventos)
+            self._agora = max(self._agora, instante)
+            if isinstance(acao, threading.Event):
+                self._ativos += 1
+                acao.set()
+                return
+            funcao, args = acao
+            funcao(*args)
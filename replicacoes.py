@@ -0,0 +1,143 @@
+"""
+Replicações de Monte Carlo comparando FCFS e Prioridade.
+
+Cada semente gera um cenário independente (semáforos e chegadas, como no
+bloco principal de escalonamento.py) e roda os dois escalonadores no motor
+de eventos. As replicações são distribuídas entre os núcleos com um
+ProcessPoolExecutor; como cada uma depende só da sua semente, o resultado
+é o mesmo com qualquer número de processos. As esperas individuais voltam
+como estatisticas.Estatisticas (tamanho constante), mescladas no resumo.
+
+Uso:
+    python replicacoes.py INICIO FIM [--processos N]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+
+from escalonamento import gerar_cenario, simular
+from estatisticas import Estatisticas
+
+ALGORITMOS = ('fcfs', 'prioridade')
+NIVEL_CONFIANCA = 0.95
+
+
+def replicar(semente):
+    """
+    Executa uma replicação: gera o cenário da semente e simula os dois
+    algoritmos. Os tempos de travessia usam a mesma semente nos dois
+    (números aleatórios comuns), o que deixa a comparação pareada.
+
+    Retorna:
+        dict: semente, número de carros e, por algoritmo, a média e as
+              Estatisticas das esperas dos carros.
+    """
+    semaforos, cars_data = gerar_cenario(gerador=random.Random(semente))
+    resultado = {'semente': semente, 'carros': len(cars_data)}
+    for algoritmo in ALGORITMOS:
+        esperas = Estatisticas(agrupar=False)
+        random.seed(semente)
+        media = simular(algoritmo, semaforos, cars_data, motor='eventos',
+                        verboso=False, estatisticas=esperas)
+        resultado[algoritmo] = {'media': media, 'esperas': esperas}
+    return resultado
+
+
+def executar_replicacoes(sementes, processos=None):
+    """
+    Roda `replicar` para cada semente em paralelo, preservando a ordem.
+    processos=1 executa no próprio processo (útil para depurar).
+    """
+    sementes = list(sementes)
+    if processos == 1:
+        return [replicar(s) for s in sementes]
+    processos = processos or os.cpu_count() or 1
+    # Lotes grandes diluem o custo de serialização entre processos
+    lote = max(1, len(sementes) // (processos * 16))
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        return list(executor.map(replicar, sementes, chunksize=lote))
+
+
+def _intervalo_confianca(valores, nivel=NIVEL_CONFIANCA):
+    """Intervalo de confiança (aproximação normal) para a média dos valores."""
+    media = statistics.fmean(valores)
+    if len(valores) < 2:
+        return media, media
+    z = statistics.NormalDist().inv_cdf(0.5 + nivel / 2)
+    margem = z * statistics.stdev(valores) / len(valores) ** 0.5
+    return media - margem, media + margem
+
+
+def _percentis(esperas):
+    """p50, p90 e p99 (aproximados pelo esboço de quantis) das esperas."""
+    return {'p50': esperas.quantil(0.5), 'p90': esperas.quantil(0.9),
+            'p99': esperas.quantil(0.99)}
+
+
+def resumir(resultados):
+    """
+    Estatísticas agregadas das replicações.
+
+    Para cada algoritmo: média e intervalo de confiança da espera média por
+    replicação, e percentis da espera individual dos carros. A comparação
+    pareada (Prioridade - FCFS) usa só replicações com carros.
+    """
+    com_carros = [r for r in resultados if r['carros']]
+    resumo = {'replicacoes': len(resultados), 'com_carros': len(com_carros)}
+    for algoritmo in ALGORITMOS:
+        medias = [r[algoritmo]['media'] for r in com_carros]
+        esperas = Estatisticas(agrupar=False)
+        for r in com_carros:
+            esperas.mesclar(r[algoritmo]['esperas'])
+        resumo[algoritmo] = {
+            'media': statistics.fmean(medias) if medias else 0.0,
+            'ic': _intervalo_confianca(medias) if medias else (0.0, 0.0),
+            **_percentis(esperas),
+        }
+    diferencas = [r['prioridade']['media'] - r['fcfs']['media'] for r in com_carros]
+    if diferencas:
+        resumo['diferenca'] = {
+            'media': statistics.fmean(diferencas),
+            'ic': _intervalo_confianca(diferencas),
+            'prioridade_melhor': sum(d < 0 for d in diferencas) / len(diferencas),
+        }
+    return resumo
+
+
+def imprimir_resumo(resumo):
+    pct = int(NIVEL_CONFIANCA * 100)
+    print(f"Replicações: {resumo['replicacoes']} ({resumo['com_carros']} com carros)")
+    for algoritmo in ALGORITMOS:
+        r = resumo[algoritmo]
+        print(
+            f"  {algoritmo.upper():10} média {r['media']:.3f}s "
+            f"(IC{pct}% {r['ic'][0]:.3f}–{r['ic'][1]:.3f}) | "
+            f"p50 {r['p50']:.3f}s p90 {r['p90']:.3f}s p99 {r['p99']:.3f}s"
+        )
+    if 'diferenca' in resumo:
+        d = resumo['diferenca']
+        print(
+            f"  Prioridade - FCFS: {d['media']:+.3f}s "
+            f"(IC{pct}% {d['ic'][0]:+.3f}–{d['ic'][1]:+.3f}); "
+            f"Prioridade melhor em {d['prioridade_melhor']*100:.1f}% das replicações"
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('inicio', type=int, help='primeira semente (inclusiva)')
+    parser.add_argument('fim', type=int, help='última semente (exclusiva)')
+    parser.add_argument('--processos', type=int, default=None,
+                        help='número de processos (padrão: todos os núcleos)')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    resultados = executar_replicacoes(range(args.inicio, args.fim), args.processos)
+    duracao = time.perf_counter() - inicio
+    imprimir_resumo(resumir(resultados))
+    print(f"{len(resultados)} replicações em {duracao:.2f}s "
+          f"({len(resultados) / duracao:.0f}/s)", file=sys.stderr)
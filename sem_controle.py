@@ -1,137 +1,290 @@
 import threading
 import time
 import random
+from carros_ativos import CarrosAtivos
+from estatisticas import VazaoJanela, JANELA_VAZAO
+from parametros import mesclar, analisador, executar
 
 # === Configurações da simulação ===
+# São os padrões de run(config); cada chave de `config` substitui a constante de mesmo nome.
 NUM_SEMAFOROS        = 4       # número total de semáforos interligados
 TEMPO_SIMULACAO      = 30.0    # duração total da simulação (segundos)
 TEMPO_VERDE          = 3.0     # tempo que cada semáforo permanece VERDE (segundos)
 INTERVALO_TICK       = 0.3     # intervalo entre tentativas de liberar carro (segundos)
 PROBABILIDADE_LIB    = 0.2     # probabilidade de liberar um carro em cada tick (0.0 a 1.0)
 JANELA_COLISAO       = 0.3     # janela extra para considerar colisão (segundos)
+GUARDAR_TEMPOS       = False   # True: guarda cada instante de liberação em tempos_liberacao (memória cresce sem limite)
+SEMENTE              = None    # semente do gerador aleatório (None = aleatória)
+SAIDA_CONSOLE        = True    # imprime VERDE, VERMELHO, liberações e acidente durante a simulação
+RELATORIO            = True    # imprime o relatório final
+# Como cada semáforo espera a vez: 'polling' (confere a cada 0.01s) ou
+# 'evento' (bloqueia num threading.Event próprio até receber o VERDE).
+# Pode ser escolhido na linha de comando: python sem_controle.py evento
+MODO_ESPERA          = 'polling'
 
-# Variáveis de controle da simulação
-semaforo_verde_atual = 1                  # ID do semáforo que está com sinal VERDE
-evento_simulacao     = threading.Event()  # Evento para sinalizar término ou acidente
+PARAMETROS = (
+    'NUM_SEMAFOROS', 'TEMPO_SIMULACAO', 'TEMPO_VERDE', 'INTERVALO_TICK', 'PROBABILIDADE_LIB',
+    'JANELA_COLISAO', 'GUARDAR_TEMPOS', 'SEMENTE', 'SAIDA_CONSOLE', 'RELATORIO', 'MODO_ESPERA',
+)
 
-# Estruturas para coleta de estatísticas
-dicionario_valores = range(1, NUM_SEMAFOROS+1)
-carros_liberados     = {i: 0 for i in dicionario_valores}  # total de carros liberados por semáforo
-tempos_liberacao     = {i: [] for i in dicionario_valores}  # timestamps de cada liberação
-contagens_liberacao  = {i: 0 for i in dicionario_valores}  # contador sequencial de IDs de carros
-semaforos_acidente   = set()                                  # semáforos envolvidos em colisão
 
-# Lista de tuplas representando carros em travessia:
-# (id_carro, tempo_fim_travessia, momento_liberacao, id_semaforo)
-carros_atuais        = []
+def configuracao(config=None):
+    """Os padrões do módulo com as chaves de `config` por cima."""
+    cfg = mesclar(PARAMETROS, globals(), config)
+    if cfg['MODO_ESPERA'] not in ('polling', 'evento'):
+        raise ValueError(f"MODO_ESPERA inválido: {cfg['MODO_ESPERA']!r} (use 'polling' ou 'evento')")
+    return cfg
 
 
-def trabalhador_semaforo(id_semaforo):
+def _calado(*args, **kwargs):
+    pass
+
+
+class Simulacao:
     """
-    Função executada por cada thread de semáforo.
-    Espera sua vez de ficar VERDE, libera carros aleatoriamente,
-    detecta possíveis colisões e sinaliza fim da simulação.
+    Estado de uma execução sem controle. As threads continuam sem
+    sincronizar o acesso a carros_atuais, de propósito; só o estado deixou
+    de ser global, para que run() possa ser chamada mais de uma vez.
     """
-    global semaforo_verde_atual
-
-    # Loop principal: continua enquanto a simulação não terminar
-    while not evento_simulacao.is_set():
-        # Aguarda o semáforo ficar VERDE para este ID
-        while semaforo_verde_atual != id_semaforo and not evento_simulacao.is_set():
-            time.sleep(0.01)  # breve pausa para evitar busy-wait intenso
-        # Se a simulação foi sinalizada para encerrar, sai da thread
-        if evento_simulacao.is_set():
-            return
-
-        # Início do período VERDE deste semáforo
-        print(f"\n[S{id_semaforo}] — VERDE ({TEMPO_VERDE:.0f}s)")
-        inicio_verde = time.time()
-        fim_verde    = inicio_verde + TEMPO_VERDE
-
-        # Durante o tempo VERDE, a cada tick tenta liberar um carro
-        while time.time() < fim_verde and not evento_simulacao.is_set():
-            time.sleep(INTERVALO_TICK)
-            agora = time.time()
-            # Se acabou o tempo VERDE, interrompe o loop
-            if agora >= fim_verde:
-                break
-
-            # Decide aleatoriamente se libera um carro neste instante
-            if random.random() < PROBABILIDADE_LIB:
-                tempo_no_verde = agora - inicio_verde
-
-                # Atualiza contador e gera ID único pro carro
-                contagens_liberacao[id_semaforo] += 1
-                id_carro = f"carro{contagens_liberacao[id_semaforo]}_s{id_semaforo}"
-                carros_liberados[id_semaforo] += 1
-                tempos_liberacao[id_semaforo].append(agora)
-
-                # Calcula tempo de travessia e agenda remoção desse carro
-                tempo_travessia = NUM_SEMAFOROS - id_semaforo + 2  # ex: carros de semáforo 1 demoram mais
-                fim_travessia   = agora + tempo_travessia
-                carros_atuais.append((id_carro, fim_travessia, agora, id_semaforo))
-
-                # Imprime estado atual da rua após liberação
-                estados = [(c, f"{agora - tl:.2f}s") for c, _, tl, _ in carros_atuais]
-                print(f"  • S{id_semaforo} liberou {id_carro} em {tempo_no_verde:.2f}s do verde. Rua:", estados)
-
-                # Verifica colisão com o semáforo anterior
-                sema_ante = id_semaforo - 1
-                if sema_ante >= 1:
-                    envolvidos = []
-                    tempo_ate_anterior = 1 + abs(id_semaforo - sema_ante)
-                    # Percorre carros atuais buscando aqueles do semáforo anterior
-                    for c, _, tl, sid in carros_atuais:
-                        if sid == sema_ante:
-                            delta = agora - tl
-                            # Se estiver dentro da janela de colisão
-                            if tempo_ate_anterior <= delta <= tempo_ate_anterior + JANELA_COLISAO:
-                                envolvidos.append(c)
-                    # Se houve colisão, sinaliza e encerra simulação
-                    if envolvidos:
-                        envolvidos.append(id_carro)
-                        semaforos_acidente.update({sema_ante, id_semaforo})
-                        print("💥 ACIDENTE! Semáforos envolvidos:", sorted(semaforos_acidente))
-                        print("  • Carros envolvidos:", envolvidos)
-                        evento_simulacao.set()
-                        return
-
-        # Fim do periodo VERDE: imprime VERMELHO e passa a vez
-        print(f"[S{id_semaforo}] — VERMELHO")
-        semaforo_verde_atual = (id_semaforo % NUM_SEMAFOROS) + 1
-
-
-# === Inicialização das threads de semáforos ===
-threads = []
-for s in range(1, NUM_SEMAFOROS+1):
-    t = threading.Thread(target=trabalhador_semaforo, args=(s,), daemon=True)
-    t.start()
-    threads.append(t)
-
-# === Loop principal controla duração da simulação ===
-inicio_sim = time.time()
-while time.time() - inicio_sim < TEMPO_SIMULACAO and not evento_simulacao.is_set():
-    time.sleep(0.2)
-# Sinaliza término da simulação (tempo esgotado ou acidente)
-evento_simulacao.set()
-
-# Aguarda todas as threads de semáforo terminarem
-for t in threads:
-    t.join()
-
-# === Pós-simulação: esvaziamento final e relatório ===
-print("\nEsvaziando rua restante…")
-agora = time.time()
-for c, fim, _, _ in carros_atuais:
-    if fim > agora:
-        print(f"  • Carro {c} removido (tarde).")
-
-print("\n=== SIMULAÇÃO ENCERRADA ===")
-# Exibe quantos carros cada semáforo liberou
-for sid, cnt in carros_liberados.items():
-    print(f"  S{sid}: {cnt}")
-# Indica se houve acidente e quais semáforos foram afetados
-if semaforos_acidente:
-    print("Semáforos no acidente:", sorted(semaforos_acidente))
-else:
-    print("Nenhum acidente ocorreu.")
+
+    def __init__(self, config=None):
+        cfg = self.cfg = configuracao(config)
+        self.gerador = random.Random(cfg['SEMENTE'])
+        self.imprimir = print if cfg['SAIDA_CONSOLE'] else _calado
+
+        # Variáveis de controle da simulação
+        self.semaforo_verde_atual = 1                  # ID do semáforo que está com sinal VERDE
+        self.evento_simulacao     = threading.Event()  # Evento para sinalizar término ou acidente
+
+        # Estruturas para coleta de estatísticas
+        ids = range(1, cfg['NUM_SEMAFOROS'] + 1)
+        self.carros_liberados     = {i: 0 for i in ids}  # total de carros liberados por semáforo
+        self.tempos_liberacao     = ({i: [] for i in ids}  # timestamps de cada liberação
+                                     if cfg['GUARDAR_TEMPOS'] else None)
+        self.janela_vazao         = min(JANELA_VAZAO, cfg['TEMPO_SIMULACAO'])
+        self.vazao_liberacao      = {i: VazaoJanela(self.janela_vazao)
+                                     for i in ids}       # vazão recente, em memória constante
+        self.contagens_liberacao  = {i: 0 for i in ids}  # contador sequencial de IDs de carros
+        self.semaforos_acidente   = set()                # semáforos envolvidos em colisão
+
+        # Carros em travessia, indexados por semáforo e momento de liberação;
+        # itera tuplas (id_carro, tempo_fim_travessia, momento_liberacao, id_semaforo)
+        self.carros_atuais        = CarrosAtivos()
+
+        # Passagem de VERDE no modo 'evento': um Event por semáforo, sinalizado por
+        # quem entrega a vez. carros_atuais continua sem sincronização de propósito.
+        self.eventos_verde        = {i: threading.Event() for i in ids}
+
+        # Métricas de custo da espera
+        self.despertares          = {i: 0 for i in ids}  # vezes que cada thread acordou para conferir a vez
+        self.latencias_troca      = []    # segundos entre entregar o VERDE e o próximo semáforo assumir
+        self.instante_troca       = None  # perf_counter da última entrega de VERDE
+
+    def aguardar_vez(self, id_semaforo):
+        """
+        Bloqueia até o semáforo receber o VERDE ou a simulação terminar,
+        contando quantas vezes a thread acordou para conferir.
+        """
+        if self.cfg['MODO_ESPERA'] == 'evento':
+            evento = self.eventos_verde[id_semaforo]
+            while self.semaforo_verde_atual != id_semaforo and not self.evento_simulacao.is_set():
+                evento.wait()
+                evento.clear()
+                self.despertares[id_semaforo] += 1
+        else:
+            while self.semaforo_verde_atual != id_semaforo and not self.evento_simulacao.is_set():
+                time.sleep(0.01)  # breve pausa para evitar busy-wait intenso
+                self.despertares[id_semaforo] += 1
+
+    def passar_vez(self, id_semaforo):
+        """Entrega o VERDE ao próximo semáforo da sequência."""
+        proximo = (id_semaforo % self.cfg['NUM_SEMAFOROS']) + 1
+        self.instante_troca = time.perf_counter()
+        self.semaforo_verde_atual = proximo
+        if self.cfg['MODO_ESPERA'] == 'evento':
+            self.eventos_verde[proximo].set()
+
+    def trabalhador_semaforo(self, id_semaforo):
+        """
+        Função executada por cada thread de semáforo.
+        Espera sua vez de ficar VERDE, libera carros aleatoriamente,
+        detecta possíveis colisões e sinaliza fim da simulação.
+        """
+        cfg = self.cfg
+        imprimir = self.imprimir
+        carros_atuais = self.carros_atuais
+        evento_simulacao = self.evento_simulacao
+        # Loop principal: continua enquanto a simulação não terminar
+        while not evento_simulacao.is_set():
+            # Aguarda o semáforo ficar VERDE para este ID (polling ou evento)
+            self.aguardar_vez(id_semaforo)
+            # Se a simulação foi sinalizada para encerrar, sai da thread
+            if evento_simulacao.is_set():
+                return
+            if self.instante_troca is not None:
+                self.latencias_troca.append(time.perf_counter() - self.instante_troca)
+
+            # Início do período VERDE deste semáforo
+            imprimir(f"\n[S{id_semaforo}] — VERDE ({cfg['TEMPO_VERDE']:.0f}s)")
+            inicio_verde = time.time()
+            fim_verde    = inicio_verde + cfg['TEMPO_VERDE']
+
+            # Durante o tempo VERDE, a cada tick tenta liberar um carro
+            while time.time() < fim_verde and not evento_simulacao.is_set():
+                time.sleep(cfg['INTERVALO_TICK'])
+                agora = time.time()
+                # Se acabou o tempo VERDE, interrompe o loop
+                if agora >= fim_verde:
+                    break
+
+                # Decide aleatoriamente se libera um carro neste instante
+                if self.gerador.random() < cfg['PROBABILIDADE_LIB']:
+                    tempo_no_verde = agora - inicio_verde
+
+                    # Atualiza contador e gera ID único pro carro
+                    self.contagens_liberacao[id_semaforo] += 1
+                    id_carro = f"carro{self.contagens_liberacao[id_semaforo]}_s{id_semaforo}"
+                    self.carros_liberados[id_semaforo] += 1
+                    if self.tempos_liberacao is not None:
+                        self.tempos_liberacao[id_semaforo].append(agora)
+                    self.vazao_liberacao[id_semaforo].registrar(agora)
+
+                    # Calcula tempo de travessia e agenda remoção desse carro
+                    tempo_travessia = cfg['NUM_SEMAFOROS'] - id_semaforo + 2  # ex: carros de semáforo 1 demoram mais
+                    fim_travessia   = agora + tempo_travessia
+                    carros_atuais.adicionar(id_carro, fim_travessia, agora, id_semaforo)
+
+                    # Imprime estado atual da rua após liberação
+                    if cfg['SAIDA_CONSOLE']:
+                        estados = [(c, f"{agora - tl:.2f}s") for c, _, tl, _ in carros_atuais]
+                        imprimir(f"  • S{id_semaforo} liberou {id_carro} em {tempo_no_verde:.2f}s do verde. Rua:", estados)
+
+                    # Verifica colisão com o semáforo anterior
+                    sema_ante = id_semaforo - 1
+                    if sema_ante >= 1:
+                        tempo_ate_anterior = 1 + abs(id_semaforo - sema_ante)
+                        # Busca, só entre os carros do semáforo anterior, os que
+                        # estão dentro da janela de colisão
+                        envolvidos = carros_atuais.na_janela(
+                            sema_ante, agora, tempo_ate_anterior, tempo_ate_anterior + cfg['JANELA_COLISAO']
+                        )
+                        # Se houve colisão, sinaliza e encerra simulação
+                        if envolvidos:
+                            envolvidos.append(id_carro)
+                            self.semaforos_acidente.update({sema_ante, id_semaforo})
+                            imprimir("💥 ACIDENTE! Semáforos envolvidos:", sorted(self.semaforos_acidente))
+                            imprimir("  • Carros envolvidos:", envolvidos)
+                            evento_simulacao.set()
+                            return
+
+            # Fim do periodo VERDE: imprime VERMELHO e passa a vez
+            imprimir(f"[S{id_semaforo}] — VERMELHO")
+            self.passar_vez(id_semaforo)
+
+    def executar(self):
+        """
+        Roda a simulação até TEMPO_SIMULACAO ou até um acidente e imprime o
+        relatório (se RELATORIO).
+
+        Retorna:
+            dict: ver run().
+        """
+        # === Inicialização das threads de semáforos ===
+        cpu_inicio = time.process_time()
+        threads = []
+        for s in range(1, self.cfg['NUM_SEMAFOROS'] + 1):
+            t = threading.Thread(target=self.trabalhador_semaforo, args=(s,), daemon=True)
+            t.start()
+            threads.append(t)
+
+        # === Loop principal controla duração da simulação ===
+        inicio_sim = time.time()
+        while time.time() - inicio_sim < self.cfg['TEMPO_SIMULACAO'] and not self.evento_simulacao.is_set():
+            time.sleep(0.2)
+        # Sinaliza término da simulação (tempo esgotado ou acidente)
+        self.evento_simulacao.set()
+        # No modo 'evento', acorda quem está bloqueado esperando a vez
+        for evento in self.eventos_verde.values():
+            evento.set()
+
+        # Aguarda todas as threads de semáforo terminarem
+        for t in threads:
+            t.join()
+
+        agora = time.time()
+        resultados = {
+            'liberados': dict(self.carros_liberados),
+            'acidente': sorted(self.semaforos_acidente),
+            'duracao': agora - inicio_sim,
+            'cpu': time.process_time() - cpu_inicio,
+            # Carros que não completaram a travessia a tempo
+            'tarde': [c for c, fim, _, _ in self.carros_atuais if fim > agora],
+            'vazao': {sid: v.taxa(agora, inicio_sim) * 60 for sid, v in self.vazao_liberacao.items()},
+            'janela_vazao': min(self.janela_vazao, agora - inicio_sim),
+            'despertares': dict(self.despertares),
+            'latencias_troca': sorted(self.latencias_troca),
+            'tempos_liberacao': self.tempos_liberacao,
+        }
+        if self.cfg['RELATORIO']:
+            self.relatorio(resultados)
+        return resultados
+
+    def relatorio(self, r):
+        """Esvaziamento final, contagens e custo da espera pela vez."""
+        print("\nEsvaziando rua restante…")
+        for c in r['tarde']:
+            print(f"  • Carro {c} removido (tarde).")
+
+        print("\n=== SIMULAÇÃO ENCERRADA ===")
+        # Exibe quantos carros cada semáforo liberou
+        for sid, cnt in r['liberados'].items():
+            print(f"  S{sid}: {cnt}")
+        print(f"Vazão nos últimos {r['janela_vazao']:.1f}s (carros/min): "
+              + ", ".join(f"S{sid}: {v:.1f}" for sid, v in r['vazao'].items()))
+        # Indica se houve acidente e quais semáforos foram afetados
+        if r['acidente']:
+            print("Semáforos no acidente:", r['acidente'])
+        else:
+            print("Nenhum acidente ocorreu.")
+
+        # Custo da espera pela vez: CPU do processo, despertares e latência de troca
+        duracao, cpu = r['duracao'], r['cpu']
+        total_despertares = sum(r['despertares'].values())
+        print(f"\n=== CUSTO DA ESPERA ({self.cfg['MODO_ESPERA']}) ===")
+        print(f"  CPU do processo: {cpu:.3f}s em {duracao:.1f}s ({cpu / duracao * 100:.1f}%)")
+        print(f"  Despertares: {total_despertares} ({total_despertares / duracao:.1f}/s) — "
+              + ", ".join(f"S{sid}: {n}" for sid, n in r['despertares'].items()))
+        if r['latencias_troca']:
+            lat = r['latencias_troca']
+            print(f"  Latência de troca de VERDE: média {sum(lat) / len(lat) * 1e3:.3f}ms, "
+                  f"máx {lat[-1] * 1e3:.3f}ms ({len(lat)} trocas)")
+
+
+def run(config=None):
+    """
+    Executa uma simulação sem controle e devolve os resultados; pode ser
+    chamada várias vezes no mesmo processo.
+
+    Parâmetros:
+        config (dict): parâmetros a alterar, com os nomes das constantes do
+                       módulo (ex.: {'MODO_ESPERA': 'evento', 'SEMENTE': 3})
+
+    Retorna:
+        dict: 'liberados' por semáforo, semáforos do 'acidente' (vazia se
+              não houve), 'duracao' e 'cpu' em segundos, carros 'tarde',
+              'vazao' recente por semáforo (carros/min) sobre os últimos
+              'janela_vazao' segundos, 'despertares', 'latencias_troca'
+              (s, ordenadas) e 'tempos_liberacao' (se GUARDAR_TEMPOS).
+    """
+    return Simulacao(config).executar()
+
+
+def main(argv=None):
+    parser = analisador("Semáforos sem controle: threads sem sincronizar a rua.")
+    parser.add_argument('modo_espera', nargs='?', default=MODO_ESPERA, help="'polling' ou 'evento'")
+    args = parser.parse_args(argv)
+    executar(run, args, {'MODO_ESPERA': args.modo_espera})
+
+
+if __name__ == '__main__':
+    main()
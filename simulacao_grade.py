@@ -0,0 +1,240 @@
+"""
+Simulação de grades grandes de cruzamentos, particionada entre processos.
+
+Mesmo modelo de com_controle (fases VERDES em rodízio, um sorteio de
+liberação por tick, colisão quando um carro é liberado em u entre τ e
+τ + JANELA_COLISAO segundos depois de um carro de um vizinho v com aresta
+v -> u de tempo τ que ainda não terminou a travessia de v), mas passo a
+passo em ticks, sem threads nem relógio, para dezenas de milhares de
+cruzamentos. Como um único acidente encerraria uma grade grande logo no
+início, aqui os acidentes são contados e a simulação continua; o instante
+do primeiro é o de encerramento de com_controle. Os sorteios vêm de um
+gerador por nó, então só as execuções sem sorteio (PROBABILIDADE_LIB 1.0)
+coincidem carro a carro com com_controle (ver conferencia.py).
+
+Os nós são divididos em blocos contíguos (Topologia.particionar), um por
+processo. Uma liberação em v só afeta u a partir de τ segundos depois, então
+cada processo avança uma janela de até min(τ) das arestas entre blocos sem
+esperar ninguém e, ao fim dela, troca com os blocos vizinhos só as
+liberações dos nós de fronteira. Cada nó tem o próprio gerador aleatório,
+derivado da semente, e o resultado não depende do número de processos.
+
+Uso:
+    python simulacao_grade.py LINHAS COLUNAS [--processos P] [--duracao S] [--semente N]
+"""
+import math
+import time
+import random
+import bisect
+import argparse
+import multiprocessing
+
+from topologia import Topologia
+
+TEMPO_VERDE       = 3.0
+INTERVALO_TICK    = 0.3
+PROBABILIDADE_LIB = 0.2
+JANELA_COLISAO    = 0.3
+TOLERANCIA        = 1e-9
+
+
+class _Bloco:
+    """Estado de um bloco de nós: geradores, liberações recentes e contadores."""
+
+    def __init__(self, topologia, locais, parte_de, indice, semente, params):
+        self.topologia = topologia
+        self.params = params
+        self.locais = set(locais)
+        self.geradores = {u: random.Random(semente * 1_000_003 + u) for u in locais}
+        self.por_fase = [[u for u in fase if u in self.locais] for fase in topologia.fases]
+        self.liberados = {u: 0 for u in locais}
+        self.acidentes = 0
+        self.primeiro_acidente = None
+        # Instantes de liberação recentes dos nós locais e dos vizinhos remotos
+        self.liberacoes = {}
+        # Nó local de fronteira -> blocos que precisam das suas liberações
+        self.destinos = {}
+        for v in locais:
+            remotos = {parte_de[u] for u, _ in topologia.saidas[v]} - {indice}
+            if remotos:
+                self.destinos[v] = remotos
+        # Quanto tempo de histórico a checagem de colisão consulta
+        self.memoria = max((t for u in locais for _, t in topologia.entradas[u]), default=0.0) \
+            + params['janela_colisao'] + TOLERANCIA
+
+    def avancar(self, primeiro, ultimo):
+        """
+        Executa os ticks primeiro..ultimo (inclusive). Retorna {bloco: [(v, t), ...]}
+        com as liberações de fronteira a enviar.
+        """
+        p = self.params
+        tick = p['intervalo_tick']
+        janela = p['janela_colisao']
+        prob = p['probabilidade_lib']
+        por_verde = p['ticks_verde']
+        num_fases = len(self.por_fase)
+        entradas = self.topologia.entradas
+        travessia = self.topologia.travessia
+        liberacoes = self.liberacoes
+        enviar = {}
+        for g in range(primeiro, ultimo + 1):
+            # O primeiro tick de cada fase é a troca de VERDE: não libera
+            if g % por_verde == 0:
+                continue
+            agora = g * tick
+            for u in self.por_fase[(g // por_verde) % num_fases]:
+                if self.geradores[u].random() >= prob:
+                    continue
+                self.liberados[u] += 1
+                liberacoes.setdefault(u, []).append(agora)
+                for v, tempo in entradas[u]:
+                    tempos = liberacoes.get(v)
+                    if tempos:
+                        # Como CarrosAtivos: o carro de v sai da rua em
+                        # agora >= liberação + travessia[v]
+                        i = max(bisect.bisect_left(tempos, agora - tempo - janela - TOLERANCIA),
+                                bisect.bisect_right(tempos, agora - travessia[v] + TOLERANCIA))
+                        if i < len(tempos) and tempos[i] <= agora - tempo + TOLERANCIA:
+                            self.acidentes += 1
+                            if self.primeiro_acidente is None:
+                                self.primeiro_acidente = agora
+                            break
+                for q in self.destinos.get(u, ()):
+                    enviar.setdefault(q, []).append((u, agora))
+        return enviar
+
+    def receber(self, liberacoes_remotas):
+        for v, t in liberacoes_remotas:
+            self.liberacoes.setdefault(v, []).append(t)
+
+    def podar(self, agora):
+        """Descarta liberações antigas demais para qualquer checagem futura."""
+        limite = agora - self.memoria
+        for tempos in self.liberacoes.values():
+            i = bisect.bisect_left(tempos, limite)
+            if i:
+                del tempos[:i]
+
+    def resultado(self):
+        return {'liberados': self.liberados, 'acidentes': self.acidentes,
+                'primeiro_acidente': self.primeiro_acidente}
+
+
+def _parametros(tempo_verde, intervalo_tick, probabilidade_lib, janela_colisao):
+    return {
+        'intervalo_tick': intervalo_tick,
+        'probabilidade_lib': probabilidade_lib,
+        'janela_colisao': janela_colisao,
+        # VERDE dura ticks inteiros: o laço de com_controle só encerra no tick
+        # em que o fim do VERDE já passou
+        'ticks_verde': max(1, math.ceil(tempo_verde / intervalo_tick - TOLERANCIA)),
+    }
+
+
+def _janelas(total_ticks, ticks_janela):
+    """Faixas (primeiro, ultimo) de ticks a executar entre trocas."""
+    for inicio in range(1, total_ticks + 1, ticks_janela):
+        yield inicio, min(inicio + ticks_janela - 1, total_ticks)
+
+
+def _executar_bloco(topologia, parte_de, indice, semente, params, total_ticks, ticks_janela,
+                    caixas, resultados):
+    locais = [u for u in topologia.nos if parte_de[u] == indice]
+    bloco = _Bloco(topologia, locais, parte_de, indice, semente, params)
+    # Blocos de onde chegam liberações de fronteira, e para onde vão
+    origens = {parte_de[v] for u in locais for v, _ in topologia.entradas[u]} - {indice}
+    destinos = set().union(*bloco.destinos.values()) if bloco.destinos else set()
+    adiantadas = {}   # janela -> mensagens recebidas antes da hora
+    for numero, (primeiro, ultimo) in enumerate(_janelas(total_ticks, ticks_janela)):
+        enviar = bloco.avancar(primeiro, ultimo)
+        for q in destinos:
+            caixas[q].put((numero, enviar.get(q, [])))
+        pendentes = len(origens)
+        for dados in adiantadas.pop(numero, ()):
+            bloco.receber(dados)
+            pendentes -= 1
+        while pendentes:
+            janela, dados = caixas[indice].get()
+            if janela != numero:
+                adiantadas.setdefault(janela, []).append(dados)
+                continue
+            bloco.receber(dados)
+            pendentes -= 1
+        bloco.podar(ultimo * params['intervalo_tick'])
+    resultados.put((indice, bloco.resultado()))
+
+
+def simular_grade(topologia, duracao=30.0, semente=0, processos=1,
+                  tempo_verde=TEMPO_VERDE, intervalo_tick=INTERVALO_TICK,
+                  probabilidade_lib=PROBABILIDADE_LIB, janela_colisao=JANELA_COLISAO):
+    """
+    Simula `duracao` segundos da topologia em `processos` processos.
+
+    Retorna:
+        dict: 'liberados' por nó, total de 'acidentes', instante do
+              'primeiro_acidente' (None se não houve), 'ticks' e 'processos'.
+    """
+    params = _parametros(tempo_verde, intervalo_tick, probabilidade_lib, janela_colisao)
+    total_ticks = int(duracao / intervalo_tick + TOLERANCIA)
+    parte_de = topologia.particionar(processos)
+    processos = len(set(parte_de.values()))
+
+    # Maior janela sem troca: o menor tempo de trânsito entre blocos
+    cortes = [t for v in topologia.nos for u, t in topologia.saidas[v]
+              if parte_de[u] != parte_de[v]]
+    if cortes and min(cortes) < intervalo_tick:
+        raise ValueError("tempo de trânsito entre blocos menor que INTERVALO_TICK")
+    ticks_janela = (int(min(cortes) / intervalo_tick + TOLERANCIA) if cortes
+                    else max(total_ticks, 1))
+
+    if processos == 1:
+        bloco = _Bloco(topologia, topologia.nos, parte_de, 0, semente, params)
+        for primeiro, ultimo in _janelas(total_ticks, ticks_janela):
+            bloco.avancar(primeiro, ultimo)
+            bloco.podar(ultimo * intervalo_tick)
+        partes = [bloco.resultado()]
+    else:
+        ctx = multiprocessing.get_context()
+        caixas = [ctx.Queue() for _ in range(processos)]
+        resultados = ctx.Queue()
+        trabalhadores = [
+            ctx.Process(target=_executar_bloco,
+                        args=(topologia, parte_de, i, semente, params, total_ticks,
+                              ticks_janela, caixas, resultados))
+            for i in range(processos)
+        ]
+        for t in trabalhadores:
+            t.start()
+        partes = [r for _, r in sorted(resultados.get() for _ in trabalhadores)]
+        for t in trabalhadores:
+            t.join()
+
+    liberados = {}
+    for r in partes:
+        liberados.update(r['liberados'])
+    return {
+        'liberados': dict(sorted(liberados.items())),
+        'acidentes': sum(r['acidentes'] for r in partes),
+        'primeiro_acidente': min((r['primeiro_acidente'] for r in partes
+                                  if r['primeiro_acidente'] is not None), default=None),
+        'ticks': total_ticks,
+        'processos': processos,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('linhas', type=int)
+    parser.add_argument('colunas', type=int)
+    parser.add_argument('--processos', type=int, default=1)
+    parser.add_argument('--duracao', type=float, default=30.0, help="segundos simulados")
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    topologia = Topologia.grade(args.linhas, args.colunas, gerador=random.Random(args.semente))
+    inicio = time.perf_counter()
+    r = simular_grade(topologia, args.duracao, args.semente, args.processos)
+    decorrido = time.perf_counter() - inicio
+    print(f"{len(topologia.nos)} cruzamentos, {r['processos']} processo(s), {r['ticks']} ticks")
+    print(f"Carros liberados: {sum(r['liberados'].values())}  Acidentes: {r['acidentes']}")
+    print(f"{args.duracao / decorrido:.1f} s simulados por segundo real ({decorrido:.2f}s)")
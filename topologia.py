@@ -0,0 +1,110 @@
+"""
+Topologia dos cruzamentos como grafo dirigido.
+
+Cada nó é um semáforo (ids inteiros a partir de 1). Uma aresta v -> u com
+tempo τ diz que um carro liberado em v chega ao cruzamento de u após τ
+segundos; é por essas arestas que com_controle procura colisões. Os nós de
+uma mesma fase ficam VERDES juntos e as fases se revezam em ordem.
+
+- Topologia.linear(n): a rua original de com_controle (fases 1, 2, …, n).
+- Topologia.grade(linhas, colunas): grade N×M com arestas para leste e para
+  sul, tempos sorteados por aresta e fases que nunca deixam dois vizinhos
+  VERDES ao mesmo tempo.
+"""
+import random
+
+
+class Topologia:
+    """
+    Atributos:
+        nos:        lista ordenada dos ids
+        entradas:   {u: [(v, tempo), ...]} arestas que chegam em u
+        saidas:     {v: [(u, tempo), ...]} arestas que saem de v
+        travessia:  {u: segundos que um carro liberado em u leva para deixar a via}
+        fases:      lista de listas de ids VERDES ao mesmo tempo, na ordem do ciclo
+        fase_de:    {u: índice da fase de u}
+    """
+
+    def __init__(self, nos, arestas, travessia, fases=None):
+        self.nos = sorted(nos)
+        self.entradas = {u: [] for u in self.nos}
+        self.saidas = {u: [] for u in self.nos}
+        for v, u, tempo in arestas:
+            self.entradas[u].append((v, tempo))
+            self.saidas[v].append((u, tempo))
+        self.travessia = dict(travessia)
+        self.fases = [list(f) for f in fases] if fases is not None else self._colorir()
+        self.fase_de = {u: i for i, fase in enumerate(self.fases) for u in fase}
+
+    def vizinhos(self, u):
+        """Vizinhos de u ignorando o sentido das arestas."""
+        return {v for v, _ in self.entradas[u]} | {v for v, _ in self.saidas[u]}
+
+    def _colorir(self):
+        """
+        Coloração gulosa na ordem dos ids: cada cor vira uma fase, então
+        cruzamentos adjacentes nunca recebem VERDE juntos. Numa grade o
+        resultado é o tabuleiro de xadrez (duas fases).
+        """
+        cor = {}
+        for u in self.nos:
+            usadas = {cor[v] for v in self.vizinhos(u) if v in cor}
+            c = 0
+            while c in usadas:
+                c += 1
+            cor[u] = c
+        fases = [[] for _ in range(max(cor.values(), default=-1) + 1)]
+        for u in self.nos:
+            fases[cor[u]].append(u)
+        return fases
+
+    def particionar(self, partes):
+        """
+        Divide os nós em `partes` blocos contíguos de ids (na grade, faixas de
+        linhas), o que mantém pequeno o número de arestas entre blocos.
+
+        Retorna:
+            dict: {id: índice do bloco}
+        """
+        partes = max(1, min(partes, len(self.nos)))
+        tamanho, resto = divmod(len(self.nos), partes)
+        parte_de = {}
+        i = 0
+        for p in range(partes):
+            for u in self.nos[i:i + tamanho + (p < resto)]:
+                parte_de[u] = p
+            i += tamanho + (p < resto)
+        return parte_de
+
+    @classmethod
+    def linear(cls, n):
+        """
+        Rua de n semáforos como em com_controle: S(i-1) -> S(i) com 2 s de
+        trânsito, travessia de n - i + 2 s e VERDE passando de 1 a n.
+        """
+        nos = range(1, n + 1)
+        arestas = [(i - 1, i, 2) for i in range(2, n + 1)]
+        return cls(nos, arestas, {i: n - i + 2 for i in nos}, [[i] for i in nos])
+
+    @classmethod
+    def grade(cls, linhas, colunas, tempo_min=1.0, tempo_max=3.0, gerador=random):
+        """
+        Grade linhas×colunas, ids por linha (id = linha*colunas + coluna + 1).
+        Os carros seguem para leste e para sul; cada aresta recebe um tempo
+        de trânsito uniforme em [tempo_min, tempo_max]. A travessia de um
+        carro liberado na coluna c é o número de quadras até a borda leste
+        mais 2 s, como na rua linear.
+        """
+        def no(r, c):
+            return r * colunas + c + 1
+
+        arestas = []
+        travessia = {}
+        for r in range(linhas):
+            for c in range(colunas):
+                travessia[no(r, c)] = colunas - 1 - c + 2
+                if c + 1 < colunas:
+                    arestas.append((no(r, c), no(r, c + 1), gerador.uniform(tempo_min, tempo_max)))
+                if r + 1 < linhas:
+                    arestas.append((no(r, c), no(r + 1, c), gerador.uniform(tempo_min, tempo_max)))
+        return cls(travessia.keys(), arestas, travessia)
@@ -0,0 +1,221 @@
+"""
+Varredura de parâmetros de com_controle com cache em disco.
+
+Cada ponto da grade (combinação de TEMPO_VERDE, INTERVALO_TICK,
+PROBABILIDADE_LIB e JANELA_COLISAO) roda com várias sementes sobre o
+relógio virtual, distribuído entre processos como em replicacoes.py. Por
+ponto são relatados a vazão (carros/min até o fim ou até o acidente), a
+taxa de acidentes (fração das sementes que terminaram em colisão) e o
+tempo médio até o acidente.
+
+O resultado de cada (parâmetros, semente) é gravado num arquivo cujo nome
+é o hash SHA-256 de parâmetros, semente e versão do código (hash do
+conteúdo dos módulos da simulação). Repetir ou ampliar uma varredura só
+calcula os pontos novos; mudar o código invalida o cache sozinho.
+
+Uso:
+    python varredura.py --tempo-verde 2 3 4 --probabilidade-lib 0.1 0.2 --sementes 0 50
+"""
+import os
+import sys
+import ast
+import json
+import time
+import hashlib
+import argparse
+import itertools
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+
+import com_controle
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+DIRETORIO_CACHE = os.path.join(RAIZ, '.cache', 'varredura')
+# Módulo da simulação; ele e o que importa da raiz definem a versão do código
+MODULO = 'com_controle.py'
+VARIAVEIS = ('TEMPO_VERDE', 'INTERVALO_TICK', 'PROBABILIDADE_LIB', 'JANELA_COLISAO')
+DURACAO = 300.0
+
+
+def modulos_simulacao(inicio=MODULO):
+    """
+    Arquivos da raiz importados por `inicio`, direta ou indiretamente
+    (inclusive imports dentro de funções), lidos das próprias instruções
+    import: a lista acompanha o código e não precisa ser mantida à mão.
+    """
+    vistos, pendentes = set(), [inicio]
+    while pendentes:
+        nome = pendentes.pop()
+        if nome in vistos:
+            continue
+        vistos.add(nome)
+        with open(os.path.join(RAIZ, nome), encoding='utf-8') as f:
+            arvore = ast.parse(f.read(), nome)
+        for no in ast.walk(arvore):
+            if isinstance(no, ast.Import):
+                importados = [a.name for a in no.names]
+            elif isinstance(no, ast.ImportFrom) and not no.level and no.module:
+                importados = [no.module]
+            else:
+                continue
+            for modulo in importados:
+                arquivo = modulo.split('.')[0] + '.py'
+                if os.path.isfile(os.path.join(RAIZ, arquivo)):
+                    pendentes.append(arquivo)
+    return sorted(vistos)
+
+
+def versao_codigo():
+    """Hash do conteúdo dos módulos da simulação."""
+    h = hashlib.sha256()
+    for nome in modulos_simulacao():
+        with open(os.path.join(RAIZ, nome), 'rb') as f:
+            h.update(nome.encode() + b'\0' + f.read() + b'\0')
+    return h.hexdigest()
+
+
+def _normalizar(valor):
+    """Números como float (3 e 3.0 dão a mesma chave), também dentro de listas e dicts."""
+    if isinstance(valor, bool):
+        return valor
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    if isinstance(valor, (list, tuple)):
+        return [_normalizar(v) for v in valor]
+    if isinstance(valor, dict):
+        return {str(k): _normalizar(v) for k, v in valor.items()}
+    return valor
+
+
+def chave(parametros, semente, versao):
+    """Endereço no cache de um (parâmetros, semente, versão do código)."""
+    conteudo = json.dumps({'parametros': _normalizar(parametros), 'semente': semente,
+                           'versao': versao}, sort_keys=True)
+    return hashlib.sha256(conteudo.encode()).hexdigest()
+
+
+class Cache:
+    """Um arquivo JSON por chave, em subdiretórios pelos dois primeiros caracteres."""
+
+    def __init__(self, diretorio=DIRETORIO_CACHE):
+        self.diretorio = diretorio
+
+    def _caminho(self, k):
+        return os.path.join(self.diretorio, k[:2], k[2:] + '.json')
+
+    def ler(self, k):
+        try:
+            with open(self._caminho(k), encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def gravar(self, k, valor):
+        # Grava num temporário e renomeia: um processo interrompido nunca
+        # deixa um arquivo pela metade no lugar da chave
+        caminho = self._caminho(k)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(valor, f)
+        os.replace(temporario, caminho)
+
+
+def executar_ponto(tarefa):
+    """Roda com_controle para (parâmetros, semente) e resume o resultado."""
+    parametros, semente = tarefa
+    config = dict(parametros, SEMENTE=semente, TEMPO_VIRTUAL=True,
+                  SAIDA_CONSOLE=False, RELATORIO=False)
+    r = com_controle.run(config)
+    return {'liberados': sum(r['liberados'].values()), 'acidente': bool(r['acidente']),
+            'duracao': r['duracao']}
+
+
+def pontos(grade):
+    """Combinações da grade {NOME: [valores]} como dicts, na ordem dos valores."""
+    nomes = sorted(grade)
+    return [dict(zip(nomes, valores)) for valores in itertools.product(*(grade[n] for n in nomes))]
+
+
+def varrer(grade, sementes, duracao=DURACAO, processos=None, cache=None):
+    """
+    Executa todos os pontos de `grade` com cada semente, reaproveitando o cache.
+
+    Retorna:
+        tuple: (lista de resumos por ponto, nº de execuções calculadas, nº vindas do cache)
+    """
+    cache = cache or Cache()
+    versao = versao_codigo()
+    sementes = list(sementes)
+    tarefas = [(dict(p, TEMPO_SIMULACAO=duracao), s) for p in pontos(grade) for s in sementes]
+    chaves = [chave(p, s, versao) for p, s in tarefas]
+    resultados = [cache.ler(k) for k in chaves]
+    pendentes = [i for i, r in enumerate(resultados) if r is None]
+
+    if pendentes:
+        lote = [tarefas[i] for i in pendentes]
+        if processos == 1:
+            calculados = map(executar_ponto, lote)
+            executor = None
+        else:
+            processos = processos or os.cpu_count() or 1
+            executor = ProcessPoolExecutor(max_workers=processos)
+            calculados = executor.map(executar_ponto, lote,
+                                      chunksize=max(1, len(lote) // (processos * 16)))
+        try:
+            # Grava conforme chegam: uma varredura interrompida não perde o que já rodou
+            for i, r in zip(pendentes, calculados):
+                cache.gravar(chaves[i], r)
+                resultados[i] = r
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    resumos = []
+    for n, p in enumerate(pontos(grade)):
+        rs = resultados[n * len(sementes):(n + 1) * len(sementes)]
+        acidentes = [r for r in rs if r['acidente']]
+        duracao_total = sum(r['duracao'] for r in rs)
+        resumos.append({
+            'parametros': p,
+            'sementes': len(rs),
+            'vazao': sum(r['liberados'] for r in rs) * 60 / duracao_total if duracao_total else 0.0,
+            'taxa_acidentes': len(acidentes) / len(rs) if rs else 0.0,
+            'tempo_ate_acidente': (statistics.fmean(r['duracao'] for r in acidentes)
+                                   if acidentes else None),
+        })
+    return resumos, len(pendentes), len(tarefas) - len(pendentes)
+
+
+def imprimir_resumos(resumos):
+    nomes = [n for n in VARIAVEIS if n in resumos[0]['parametros']] if resumos else []
+    print(" ".join(f"{n:>17}" for n in nomes)
+          + f" {'carros/min':>10} {'acidentes':>9} {'t. acidente':>11}")
+    for r in resumos:
+        ate = r['tempo_ate_acidente']
+        print(" ".join(f"{r['parametros'][n]:17g}" for n in nomes)
+              + f" {r['vazao']:10.1f} {r['taxa_acidentes'] * 100:8.1f}% "
+              + (f"{ate:10.1f}s" if ate is not None else f"{'—':>11}"))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    for nome in VARIAVEIS:
+        parser.add_argument('--' + nome.lower().replace('_', '-'), type=float, nargs='+',
+                            default=[getattr(com_controle, nome)], metavar='V')
+    parser.add_argument('--sementes', type=int, nargs=2, default=[0, 20], metavar=('INICIO', 'FIM'),
+                        help='sementes INICIO..FIM-1')
+    parser.add_argument('--duracao', type=float, default=DURACAO, help='segundos simulados por execução')
+    parser.add_argument('--processos', type=int, default=None,
+                        help='número de processos (padrão: todos os núcleos)')
+    parser.add_argument('--cache', default=DIRETORIO_CACHE, help='diretório do cache')
+    args = parser.parse_args()
+
+    grade = {nome: getattr(args, nome.lower()) for nome in VARIAVEIS}
+    inicio = time.perf_counter()
+    resumos, calculados, reaproveitados = varrer(grade, range(*args.sementes), args.duracao,
+                                                 args.processos, Cache(args.cache))
+    decorrido = time.perf_counter() - inicio
+    imprimir_resumos(resumos)
+    print(f"{calculados} execuções calculadas, {reaproveitados} do cache, em {decorrido:.2f}s",
+          file=sys.stderr)